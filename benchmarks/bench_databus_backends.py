@@ -0,0 +1,101 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for writes to the mmap databus backend: one Modbus block
+written over and over while the databus holds a number of other blocks. The
+whole file variant rewrites all values on every write as the backend used to,
+the per key variant is the current MmapBackend.
+
+Usage: python benchmarks/bench_databus_backends.py [writes]
+"""
+
+import fcntl
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from conpot.core.databus_backends import MmapBackend
+
+SIZE = 4 * 1024 * 1024
+HEADER = struct.Struct("!QI")
+
+
+def block():
+    return array("H", range(100))
+
+
+def whole_file(path, keys, writes):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    os.ftruncate(fd, SIZE)
+    shared = mmap.mmap(fd, SIZE)
+    values = {"block_{}".format(i): block() for i in range(keys)}
+    data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+    shared[HEADER.size : HEADER.size + len(data)] = data
+    HEADER.pack_into(shared, 0, 0, len(data))
+    value = block()
+    for i in range(writes):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        version, length = HEADER.unpack_from(shared)
+        values = pickle.loads(shared[HEADER.size : HEADER.size + length])
+        values["block_0"] = value
+        data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+        shared[HEADER.size : HEADER.size + len(data)] = data
+        HEADER.pack_into(shared, 0, version + 1, len(data))
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    shared.close()
+    os.close(fd)
+
+
+def per_key(path, keys, writes):
+    backend = MmapBackend(path, create=True, size=SIZE, max_keys=max(keys, 1024))
+    for i in range(keys):
+        backend["block_{}".format(i)] = block()
+    value = block()
+    for i in range(writes):
+        backend["block_0"] = value
+    backend.close()
+
+
+def run(label, func, keys, writes):
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        func(os.path.join(tmp_dir, "databus"), keys, writes)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(tmp_dir)
+    print("{:<10} {:>5} keys {:>10.0f} writes/s".format(label, keys, writes / elapsed))
+    return elapsed
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for keys in (10, 1000):
+        before = run("whole file", whole_file, keys, writes)
+        after = run("per key", per_key, keys, writes)
+        print("speedup {:>30.1f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for Databus observer notifications: a burst of writes to a few
+observed keys, like a Modbus write multiple registers request, delivered with
+one greenlet per write versus the coalescing NotificationScheduler.
+
+Usage: python benchmarks/bench_databus_notify.py [bursts]
+"""
+
+import sys
+import time
+
+import gevent
+
+from conpot.core.databus import Databus
+
+KEYS = ["register_{}".format(i) for i in range(8)]
+WRITES_PER_KEY = 16
+
+
+def observer(key):
+    pass
+
+
+def spawn_per_write(bursts):
+    observers = {key: [observer] for key in KEYS}
+    data = {}
+
+    def notify(key):
+        for callback in observers[key]:
+            callback(key)
+
+    for _ in range(bursts):
+        for value in range(WRITES_PER_KEY):
+            for key in KEYS:
+                data[key] = value
+                gevent.spawn(notify, key)
+        gevent.sleep(0)
+    gevent.wait()
+
+
+def coalesced(bursts):
+    databus = Databus()
+    for key in KEYS:
+        databus.set_value(key, 0)
+        databus.observe_value(key, observer)
+    for _ in range(bursts):
+        for value in range(WRITES_PER_KEY):
+            for key in KEYS:
+                databus.set_value(key, value)
+        gevent.sleep(0)
+    gevent.wait()
+    return databus.notification_stats()
+
+
+def run(label, func, bursts):
+    start = time.perf_counter()
+    result = func(bursts)
+    elapsed = time.perf_counter() - start
+    writes = bursts * WRITES_PER_KEY * len(KEYS)
+    print("{:<20} {:>10.0f} writes/s".format(label, writes / elapsed))
+    return elapsed, result
+
+
+def main():
+    bursts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    before, _ = run("spawn per write", spawn_per_write, bursts)
+    after, stats = run("coalesced", coalesced, bursts)
+    print("speedup {:>23.1f}x".format(before / after))
+    print("issued {issued}, coalesced {coalesced}".format(**stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Connection benchmark for the HTTP server engines: one request per new connection
+against the threaded (ThreadingMixIn) and the gevent (StreamServer) engine.
+Reports connections/s and the p99 latency of a single connection.
+
+Usage: python benchmarks/bench_http_server.py [connections] [concurrency]
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import os
+import sys
+import time
+
+import gevent
+from gevent import socket
+from gevent.pool import Pool
+
+import conpot
+import conpot.core as conpot_core
+from conpot.protocols.http.command_responder import CommandResponder
+
+REQUEST = b"GET /tests/unittest_base.html HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+
+def fetch(port, latencies):
+    start = time.perf_counter()
+    sock = socket.create_connection(("127.0.0.1", port))
+    try:
+        sock.sendall(REQUEST)
+        while sock.recv(65536):
+            pass
+    finally:
+        sock.close()
+    latencies.append(time.perf_counter() - start)
+
+
+def run(engine, template, docpath, connections, concurrency):
+    responder = CommandResponder("127.0.0.1", 0, template, docpath, engine=engine)
+    server = gevent.spawn(responder.serve_forever)
+    gevent.sleep(0.5)
+    latencies = []
+    pool = Pool(concurrency)
+    start = time.perf_counter()
+    for _ in range(connections):
+        pool.spawn(fetch, responder.server_port, latencies)
+    pool.join()
+    elapsed = time.perf_counter() - start
+    responder.stop()
+    server.kill()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        "{:<10} {:>10.0f} connections/s   p99 {:>8.2f} ms".format(
+            engine, connections / elapsed, p99 * 1000
+        )
+    )
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    template_dir = os.path.join(
+        os.path.dirname(conpot.__file__), "templates", "default"
+    )
+    conpot_core.get_databus().initialize(os.path.join(template_dir, "template.xml"))
+    template = os.path.join(template_dir, "http", "http.xml")
+    docpath = os.path.join(template_dir, "http")
+
+    for engine in ("threaded", "gevent"):
+        run(engine, template, docpath, connections, concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for IEC 104 frame encoding and decoding: scapy packets from
+frames.py versus the struct based codec. The frames are an interrogation
+response with 20 single point objects and a double command.
+
+Usage: python benchmarks/bench_iec104_codec.py [iterations]
+"""
+
+import sys
+import time
+import warnings
+
+warnings.simplefilter("ignore")
+
+from conpot.protocols.IEC104 import codec, frames
+
+
+def scapy_interrogation():
+    packet = frames.i_frame(SendSeq=2, RecvSeq=4) / frames.asdu_head(
+        COT=20, NoO=20, COA=0x1E28
+    )
+    for ioa in range(20):
+        packet /= frames.asdu_infobj_1(IOA=ioa, SIQ=frames.SIQ(SPI=ioa & 1))
+    return packet.build()
+
+
+def codec_interrogation():
+    objects = [{"IOA": ioa, "SPI": ioa & 1} for ioa in range(20)]
+    asdu = codec.encode_asdu(1, objects, cot=20, coa=0x1E28)
+    return codec.encode_i_frame(asdu, 2, 4)
+
+
+COMMAND = (
+    frames.i_frame()
+    / frames.asdu_head(COT=6, COA=0x1E28)
+    / frames.asdu_infobj_46(IOA=0x141600, DCS=2)
+).build()
+
+
+def scapy_command():
+    container = frames.i_frame(COMMAND)
+    return container.getfieldval("IOA"), container.getfieldval("DCS")
+
+
+def codec_command():
+    obj = codec.decode_i_frame(COMMAND)["objects"][0]
+    return obj["IOA"], obj["DCS"]
+
+
+def run(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:>10.0f} frames/s".format(label, iterations / elapsed))
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    assert scapy_interrogation() == codec_interrogation()
+    assert scapy_command() == codec_command()
+
+    before = run("scapy build", scapy_interrogation, iterations)
+    after = run("codec encode", codec_interrogation, iterations)
+    print("speedup {:>27.0f}x".format(before / after))
+    before = run("scapy dissect", scapy_command, iterations)
+    after = run("codec decode", codec_command, iterations)
+    print("speedup {:>27.0f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
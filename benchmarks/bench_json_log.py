@@ -0,0 +1,98 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for the JSON event log: json.dump and flush() per event on the
+hub, as JsonLogger used to do, versus the pre-serialized constant fields and
+the buffered writer thread, including the final drain on close.
+
+Usage: python benchmarks/bench_json_log.py [events]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from conpot.core.loggers.helpers import json_default
+from conpot.core.loggers.json_log import JsonLogger
+
+EVENT = {
+    "timestamp": datetime.now(),
+    "id": uuid.uuid4(),
+    "remote": ("192.0.2.1", 40000),
+    "local": ("0.0.0.0", 502),
+    "data_type": "modbus",
+    "data": {"request": "0103000a0001", "response": "010302002a", "type": None},
+}
+
+
+def per_event(filename, events):
+    handle = open(filename, "a")
+    for _ in range(events):
+        data = {
+            "timestamp": EVENT["timestamp"].isoformat(),
+            "sensorid": "default",
+            "id": EVENT["id"],
+            "src_ip": EVENT["remote"][0],
+            "src_port": EVENT["remote"][1],
+            "dst_ip": EVENT["local"][0],
+            "dst_port": EVENT["local"][1],
+            "public_ip": "198.51.100.1",
+            "data_type": EVENT["data_type"],
+            "request": EVENT["data"].get("request"),
+            "response": EVENT["data"].get("response"),
+            "event_type": EVENT["data"].get("type"),
+        }
+        json.dump(data, handle, default=json_default)
+        handle.write("\n")
+        handle.flush()
+    handle.close()
+
+
+def buffered(filename, events):
+    json_logger = JsonLogger(filename, "default", "198.51.100.1")
+    for _ in range(events):
+        json_logger.log(EVENT)
+    json_logger.close()
+
+
+def run(label, func, events):
+    fd, filename = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        func(filename, events)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.remove(filename)
+    print("{:<12} {:>8.2f} us/event".format(label, elapsed / events * 1e6))
+    return elapsed
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    before = run("per event", per_event, events)
+    after = run("buffered", buffered, events)
+    print("speedup {:>15.1f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
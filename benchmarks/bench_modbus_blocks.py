@@ -0,0 +1,110 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for Modbus block access: maximum size reads and writes of
+registers and coils on a slave with many blocks, served by the per element
+code of modbus_tk versus the slice access and address index of MBSlave.
+
+Usage: python benchmarks/bench_modbus_blocks.py [requests]
+"""
+
+import struct
+import sys
+import time
+
+from modbus_tk import defines
+from modbus_tk.modbus import Slave
+
+import conpot.core as conpot_core
+from conpot.protocols.modbus.slave import MBSlave
+
+BLOCKS = 256
+SIZE = 250
+LAST = (BLOCKS - 1) * SIZE
+
+REQUESTS = {
+    "read registers": (
+        defines.READ_HOLDING_REGISTERS,
+        struct.pack(">BHH", 3, LAST, 125),
+    ),
+    "write registers": (
+        defines.WRITE_MULTIPLE_REGISTERS,
+        struct.pack(">BHHB", 16, LAST, 123, 246) + b"\x12\x34" * 123,
+    ),
+    "read coils": (defines.READ_COILS, struct.pack(">BHH", 1, LAST, 250)),
+    "write coils": (
+        defines.WRITE_MULTIPLE_COILS,
+        struct.pack(">BHHB", 15, LAST, 248, 31) + b"\xa5" * 31,
+    ),
+}
+
+
+def create_slave():
+    databus = conpot_core.get_databus()
+    slave = MBSlave(1, None)
+    for i in range(BLOCKS):
+        for block_type in (defines.HOLDING_REGISTERS, defines.COILS):
+            name = "block_{}_{}".format(block_type, i)
+            databus.set_value(name, [1] * SIZE)
+            slave.add_block(name, block_type, i * SIZE, SIZE)
+    return slave
+
+
+def stock(slave):
+    """the handlers of modbus_tk, called on the same slave"""
+    handlers = {
+        defines.READ_HOLDING_REGISTERS: Slave._read_holding_registers,
+        defines.WRITE_MULTIPLE_REGISTERS: Slave._write_multiple_registers,
+        defines.READ_COILS: Slave._read_coils,
+        defines.WRITE_MULTIPLE_COILS: Slave._write_multiple_coils,
+    }
+
+    def _get_block_and_offset(block_type, address, length):
+        return Slave._get_block_and_offset(slave, block_type, address, length)
+
+    slave._get_block_and_offset = _get_block_and_offset
+    slave._fn_code_map.update(
+        {code: handler.__get__(slave) for code, handler in handlers.items()}
+    )
+    return slave
+
+
+def run(slave, pdu, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        response = slave.handle_request(pdu)
+    elapsed = time.perf_counter() - start
+    assert response[0] < 0x80, response
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    before, after = stock(create_slave()), create_slave()
+    for label, (_, pdu) in REQUESTS.items():
+        old = run(before, pdu, count)
+        new = run(after, pdu, count)
+        print(
+            "{:<16} {:>9.0f} -> {:>9.0f} requests/s {:>6.1f}x".format(
+                label, old, new, new / old
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
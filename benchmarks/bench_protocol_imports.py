@@ -0,0 +1,66 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Startup cost of each protocol: time and peak RSS to import its server class,
+measured in a fresh interpreter on top of importing conpot.core, which every
+protocol needs anyway.
+
+Usage: python benchmarks/bench_protocol_imports.py [protocol ...]
+"""
+
+import json
+import subprocess
+import sys
+
+from conpot import protocols
+
+PROBE = """
+import json, resource, sys, time, warnings
+warnings.simplefilter("ignore")
+from gevent import monkey; monkey.patch_all()
+import conpot.core
+from conpot import protocols
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    protocols.get_server_class(name)
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss]))
+"""
+
+
+def measure(names):
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE] + names, stderr=subprocess.DEVNULL
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    names = sys.argv[1:] or sorted(protocols.name_mapping)
+    for name in names:
+        elapsed, rss = measure([name])
+        print(
+            "{:<20} {:>8.1f} ms {:>8.1f} MiB".format(name, elapsed * 1000, rss / 1024)
+        )
+    elapsed, rss = measure(names)
+    print("{:<20} {:>8.1f} ms {:>8.1f} MiB".format("all", elapsed * 1000, rss / 1024))
+
+
+if __name__ == "__main__":
+    main()
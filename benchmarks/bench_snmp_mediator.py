@@ -0,0 +1,82 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Micro-benchmark for dynamic SNMP responses: building a MibBuilder per request
+(the old DatabusMediator behaviour) versus the precomputed response table.
+
+Usage: python benchmarks/bench_snmp_mediator.py [iterations]
+"""
+
+import sys
+import time
+import warnings
+
+from pysnmp.smi import builder
+
+import conpot.core as conpot_core
+from conpot.protocols.snmp.databus_mediator import (
+    DatabusMediator,
+    RESPONSE_CLASS_SYMBOLS,
+)
+
+OID = (1, 3, 6, 1, 2, 1, 1, 1, 0)
+
+
+def uncached_get_response(databus, oid_map, reference_class, oid):
+    module, symbol = RESPONSE_CLASS_SYMBOLS[reference_class]
+    (response_class,) = builder.MibBuilder().import_symbols(module, symbol)
+    return response_class(databus.get_value(oid_map[oid]))
+
+
+def run(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print("{:<10} {:>12.0f} requests/s".format(label, iterations / elapsed))
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    warnings.simplefilter("ignore")
+
+    databus = conpot_core.get_databus()
+    databus.set_value("SystemDescription", "Siemens, SIMATIC, S7-200")
+    mediator = DatabusMediator({})
+    mediator.register(OID, "SystemDescription", "DisplayString")
+
+    before = run(
+        "before",
+        lambda: uncached_get_response(databus, mediator.oid_map, "DisplayString", OID),
+        iterations,
+    )
+    after = run(
+        "after",
+        lambda: mediator.get_response("DisplayString", OID),
+        iterations * 100,
+    )
+    print(
+        "speedup    {:>12.0f}x".format(
+            before / iterations / (after / (iterations * 100))
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
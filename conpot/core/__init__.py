@@ -17,15 +17,25 @@
 
 from typing import Tuple, Union, Optional
 
+from .admission import AdmissionControl
 from .databus import Databus
 from .internal_interface import Interface
+from .metrics import CoreCollector, ProtocolMetrics, Registry
+from .pools import Pools
 from .session_manager import SessionManager
+from .tarpit import Tarpit
 from .virtual_fs import VirtualFS, AbstractFS
 
 databus = Databus()
 sessionManager = SessionManager()
 virtualFS = VirtualFS()
 core_interface = Interface()
+tarpit = Tarpit()
+admission = AdmissionControl(tarpit)
+pools = Pools(tarpit)
+metrics = Registry()
+protocol_metrics = ProtocolMetrics(metrics)
+metrics.add_collector(CoreCollector(sessionManager, databus, admission, pools, tarpit))
 
 # databus related  --
 
@@ -46,6 +56,53 @@ def delete_session(*args, **kwargs):
     return sessionManager.delete_session(*args, **kwargs)
 
 
+# admission control related  --
+
+
+def get_admission():
+    return admission
+
+
+def admit(protocol, source_ip):
+    """Admission control for the servers not built on wrap_handler."""
+    if admission.admit(protocol, source_ip):
+        protocol_metrics.connections.labels(protocol).inc()
+        return True
+    return False
+
+
+def wrap_handler(protocol, handle):
+    """Admission control and metrics for the handle function of a protocol server."""
+    return admission.wrap_handler(
+        protocol, protocol_metrics.instrument(protocol, handle)
+    )
+
+
+# handler pools related  --
+
+
+def get_pools():
+    return pools
+
+
+def create_pool(protocol, size=None):
+    return pools.create(protocol, size)
+
+
+# tarpit related  --
+
+
+def get_tarpit():
+    return tarpit
+
+
+# metrics related  --
+
+
+def get_metrics():
+    return metrics
+
+
 # file-system related  --
 
 
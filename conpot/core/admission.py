@@ -0,0 +1,161 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Admission control for all protocols. Every new connection, or datagram for the
+udp protocols, takes a token from a bucket of its source ip and one from a bucket
+of its /24 (/64 for IPv6) before a session is looked up. Sources without tokens
+left are turned away, or handed to the tarpit, so a single scanner can not
+monopolize the hub.
+"""
+
+import ipaddress
+import logging
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+# tokens per second and bucket size for a source ip and for its subnet, 0 for no limit
+Limit = namedtuple("Limit", ["rate", "burst", "subnet_rate", "subnet_burst"])
+
+UNLIMITED = Limit(0, 0, 0, 0)
+
+
+def subnet_of(source_ip):
+    """
+    The /24 of an IPv4 address, the /64 of an IPv6 address. IPv4-mapped IPv6
+    addresses of dual-stack listeners count as the IPv4 address.
+    """
+    try:
+        address = ipaddress.ip_address(source_ip)
+    except ValueError:
+        return source_ip
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    if address.version == 4:
+        return str(address).rpartition(".")[0]
+    return str(ipaddress.ip_network((address, 64), strict=False))
+
+
+class AdmissionControl(object):
+    """
+    Token buckets per protocol and source, kept in an LRU of at most max_sources
+    buckets. An evicted source starts again with a full bucket.
+    """
+
+    def __init__(self, tarpit=None, default=UNLIMITED, max_sources=65536):
+        self.tarpit = tarpit
+        self.default = default
+        self.max_sources = max_sources
+        self.reject = "close"
+        self.limits = {}
+        # (protocol, source) -> [tokens, time of the last refill]
+        self._buckets = OrderedDict()
+        self._admitted = {}
+        self._rejected = {}
+
+    def configure(self, default=UNLIMITED, max_sources=65536, reject="close"):
+        """
+        :param default: Limit of the protocols the template sets none for
+        :param max_sources: buckets kept for source ips and subnets together
+        :param reject: close the connections turned away, or tarpit them
+        """
+        if reject not in ("close", "tarpit"):
+            raise ValueError("Unknown reject policy: {}".format(reject))
+        self.default = default
+        self.max_sources = max_sources
+        self.reject = reject
+
+    def load_template(self, dom):
+        """Read the limits per protocol from the limits section of the core template."""
+        for node in dom.xpath("//core/limits/protocol"):
+            self.limits[node.attrib["name"]] = Limit(
+                *(
+                    float(node.attrib.get(field, getattr(self.default, field)))
+                    for field in Limit._fields
+                )
+            )
+
+    def limit(self, protocol):
+        return self.limits.get(protocol, self.default)
+
+    def _bucket(self, key, rate, burst, now):
+        # a rate without a burst admits one at a time
+        burst = max(burst, 1)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            if len(self._buckets) > self.max_sources:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        return bucket
+
+    def admit(self, protocol, source_ip):
+        """Take a token for a connection or datagram, False if source_ip has none left."""
+        limit = self.limit(protocol)
+        now = time.monotonic()
+        buckets = []
+        if limit.rate:
+            buckets.append(
+                self._bucket((protocol, source_ip), limit.rate, limit.burst, now)
+            )
+        if limit.subnet_rate:
+            buckets.append(
+                self._bucket(
+                    (protocol, subnet_of(source_ip)),
+                    limit.subnet_rate,
+                    limit.subnet_burst,
+                    now,
+                )
+            )
+        if all(bucket[0] >= 1 for bucket in buckets):
+            for bucket in buckets:
+                bucket[0] -= 1
+            self._admitted[protocol] = self._admitted.get(protocol, 0) + 1
+            return True
+        self._rejected[protocol] = self._rejected.get(protocol, 0) + 1
+        logger.debug("%s: rate limit exceeded by %s", protocol, source_ip)
+        return False
+
+    def wrap_handler(self, protocol, handle):
+        """
+        Admission control for the handle function of a StreamServer or DatagramServer.
+        Connections turned away are closed or tarpitted, datagrams dropped.
+        """
+
+        def admitted(client, address, *args, **kwargs):
+            if self.admit(protocol, address[0]):
+                return handle(client, address, *args, **kwargs)
+            if isinstance(client, bytes):
+                return
+            if self.reject == "tarpit":
+                self.tarpit.park(client)
+            else:
+                client.close()
+
+        return admitted
+
+    def stats(self):
+        return {
+            "sources": len(self._buckets),
+            "admitted": dict(self._admitted),
+            "rejected": dict(self._rejected),
+        }
@@ -16,17 +16,122 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import logging
+import sys
 import uuid
+from collections import deque
 
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+EVENT_STORES = ("ring", "head_tail")
+LOG_MODES = ("event", "session", "hybrid")
+
+
+def truncate(value, limit):
+    """Shorten strings and bytes in value to at most limit characters."""
+    if isinstance(value, (str, bytes)) and len(value) > limit:
+        return value[:limit]
+    if isinstance(value, dict):
+        return {key: truncate(item, limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate(item, limit) for item in value]
+    return value
+
+
+def size_of(value):
+    """Approximate memory used by an event, its containers and their contents."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += size_of(key) + size_of(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += size_of(item)
+    return size
+
+
+class EventStore(object):
+    """
+    Keeps a bounded number of the events of a session, as (elapsed ms, event).
+    ``ring`` keeps the last max_events events, ``head_tail`` the first and the
+    last max_events // 2, which shows how a session started and how it ended.
+    All events are counted, memory is the approximate size of the kept ones.
+    """
+
+    def __init__(self, max_events=100, store="ring"):
+        if store not in EVENT_STORES:
+            raise ValueError("Unknown session event store: {}".format(store))
+        self.max_events = max_events
+        self.head_size = max_events // 2 if store == "head_tail" else 0
+        self._head = []
+        self._tail = deque()
+        self._sizes = deque()
+        self.count = 0
+        self.dropped = 0
+        self.memory = 0
+        self._last_ms = -1
+
+    def add(self, elapsed_ms, event):
+        """Store event, return the change of memory."""
+        if elapsed_ms <= self._last_ms:
+            # keep the keys unique and ordered
+            elapsed_ms = self._last_ms + 1
+        self._last_ms = elapsed_ms
+        self.count += 1
+        size = size_of(event)
+        if len(self._head) < self.head_size:
+            self._head.append((elapsed_ms, event))
+            self.memory += size
+            return size
+        delta = size
+        self._tail.append((elapsed_ms, event))
+        self._sizes.append(size)
+        if len(self._head) + len(self._tail) > self.max_events:
+            self._tail.popleft()
+            delta -= self._sizes.popleft()
+            self.dropped += 1
+        self.memory += delta
+        return delta
+
+    def clear(self):
+        """Drop the stored events, return the change of memory."""
+        delta = -self.memory
+        self.dropped += len(self)
+        self._head = []
+        self._tail.clear()
+        self._sizes.clear()
+        self.memory = 0
+        return delta
+
+    def reset(self):
+        """Drop the stored events and zero the counters, return the change of memory."""
+        delta = self.clear()
+        self.count = 0
+        self.dropped = 0
+        return delta
+
+    def items(self):
+        return self._head + list(self._tail)
+
+    def __len__(self):
+        return len(self._head) + len(self._tail)
+
 
 # one instance per connection
 
 
 class AttackSession(object):
+    """
+    Events of one protocol and source. With log_mode ``event`` every event is
+    logged right away. With ``session`` a single summary is logged when the
+    session ends; ``hybrid`` logs the summary too but also the events whose type
+    is in live_events right away.
+    """
+
+    # longest string kept for the events of a summary
+    summary_value_limit = 256
+
     def __init__(
         self,
         protocol,
@@ -35,7 +140,21 @@ class AttackSession(object):
         destination_ip,
         destination_port,
         log_queue,
+        max_events=100,
+        store="ring",
+        on_memory=None,
+        log_mode="event",
+        live_events=(),
+        on_event=None,
     ):
+        """
+        :param max_events: number of events kept in the session, see EventStore
+        :param on_memory: called with the session and the change of memory use
+        :param live_events: event types logged right away in hybrid mode
+        :param on_event: called with the session and the type of every event
+        """
+        if log_mode not in LOG_MODES:
+            raise ValueError("Unknown session log mode: {}".format(log_mode))
         self.log_queue = log_queue
         self.id = uuid.uuid4()
         logger.info("New %s session from %s (%s)", protocol, source_ip, self.id)
@@ -45,8 +164,16 @@ class AttackSession(object):
         self.destination_ip = destination_ip
         self.destination_port = destination_port
         self.timestamp = datetime.utcnow()
+        self.last_activity = self.timestamp
         self.public_ip = None
-        self.data = dict()
+        self.events = EventStore(max_events, store)
+        self.on_memory = on_memory
+        self.on_event = on_event
+        self.log_mode = log_mode
+        self.live_events = frozenset(live_events)
+        # counted since the last summary
+        self.event_types = {}
+        self.first_event = None
         self._ended = False
 
     def _dump_data(self, data):
@@ -65,16 +192,64 @@ class AttackSession(object):
         }
 
     def add_event(self, event_data):
-        sec_elapsed = (datetime.utcnow() - self.timestamp).total_seconds()
+        now = datetime.utcnow()
+        sec_elapsed = (now - self.timestamp).total_seconds()
         elapse_ms = int(sec_elapsed * 1000)
-        while elapse_ms in self.data:
-            elapse_ms += 1
-        self.data[elapse_ms] = event_data
-        # TODO: We should only log the session when it is finished
-        self.log_queue.put(self._dump_data(event_data))
+        delta = self.events.add(elapse_ms, event_data)
+        if self.on_memory:
+            self.on_memory(self, delta)
+        self.last_activity = now
+        event_type = event_data.get("type") or "REQUEST"
+        self.event_types[event_type] = self.event_types.get(event_type, 0) + 1
+        if self.on_event:
+            self.on_event(self, event_type)
+        if self.first_event is None:
+            self.first_event = now
+        if self.log_mode == "event" or (
+            self.log_mode == "hybrid" and event_type in self.live_events
+        ):
+            self.log_queue.put(self._dump_data(event_data))
+
+    @property
+    def data(self):
+        """the stored events, by ms elapsed since the start of the session"""
+        return dict(self.events.items())
+
+    @property
+    def memory(self):
+        return self.events.memory
 
     def dump(self):
         return self._dump_data(self.data)
 
+    def summary(self):
+        """The events since the last summary as one compact record."""
+        events = []
+        for elapsed_ms, event in self.events.items():
+            event = truncate(event, self.summary_value_limit)
+            event["elapsed_ms"] = elapsed_ms
+            events.append(event)
+        return self._dump_data(
+            {
+                "type": "SESSION_SUMMARY",
+                "session": {
+                    "first_event": self.first_event,
+                    "last_event": self.last_activity,
+                    "event_count": self.events.count,
+                    "events_dropped": self.events.dropped,
+                    "event_types": dict(self.event_types),
+                    "events": events,
+                },
+            }
+        )
+
     def set_ended(self):
         self._ended = True
+        if self.log_mode != "event" and self.events.count:
+            self.log_queue.put(self.summary())
+            # a later connection from the same source starts a new summary
+            delta = self.events.reset()
+            if self.on_memory:
+                self.on_memory(self, delta)
+            self.event_types = {}
+            self.first_event = None
@@ -23,17 +23,93 @@ import random
 
 import gevent
 import gevent.event
+import gevent.pool
 from lxml import etree
 
+from conpot.core.databus_backends import DictBackend
+
 logger = logging.getLogger(__name__)
 
 
+class NotificationScheduler(object):
+    """
+    Delivers observer callbacks for the Databus. Writes to a key are collected
+    until the next loop iteration, so a burst of writes to one key results in a
+    single callback. Callbacks run on a pool of at most pool_size greenlets.
+    """
+
+    def __init__(self, databus, pool_size=100):
+        self.databus = databus
+        self.pool = gevent.pool.Pool(pool_size)
+        # key -> value before the first write since the last flush
+        self._pending = {}
+        self._flush_greenlet = None
+        self.issued = 0
+        self.coalesced = 0
+
+    def schedule(self, key, old_value):
+        if key in self._pending:
+            self.coalesced += 1
+            return
+        self._pending[key] = old_value
+        if self._flush_greenlet is None:
+            self._flush_greenlet = gevent.spawn(self._flush)
+
+    def _flush(self):
+        databus = self.databus
+        pending, self._pending = self._pending, {}
+        self._flush_greenlet = None
+        deltas = {}
+        for key, old_value in pending.items():
+            for callback, wants_deltas in list(databus._observer_map.get(key, ())):
+                if wants_deltas:
+                    deltas.setdefault(callback, []).append(
+                        (key, old_value, databus._data.get(key))
+                    )
+                else:
+                    self.issued += 1
+                    self.pool.spawn(callback, key)
+        for callback, changes in deltas.items():
+            self.issued += 1
+            self.pool.spawn(callback, changes)
+
+    def clear(self):
+        self._pending.clear()
+        if self._flush_greenlet is not None:
+            self._flush_greenlet.kill()
+            self._flush_greenlet = None
+
+    def stats(self):
+        return {
+            "issued": self.issued,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+            "running": len(self.pool),
+        }
+
+
 class Databus(object):
-    def __init__(self):
-        self._data = {}
+    def __init__(self, pool_size=100, backend=None):
         self._observer_map = {}
+        self._change_hooks = []
+        self._notifier = NotificationScheduler(self, pool_size)
+        self.set_backend(DictBackend() if backend is None else backend)
         self.initialized = gevent.event.Event()
 
+    def set_backend(self, backend):
+        """Store the values in backend, see conpot.core.databus_backends."""
+        self._data = backend
+        backend.subscribe(self._on_remote_change)
+
+    @property
+    def shared(self):
+        """True if the values are shared with other processes."""
+        return self._data.shared
+
+    def _on_remote_change(self, key, old_value, value):
+        if key in self._observer_map:
+            self._notifier.schedule(key, old_value)
+
     # the idea here is that we can store both values and functions in the key value store
     # functions could be used if a profile wants to simulate a sensor, or the function
     # could interface with a real sensor
@@ -54,25 +130,52 @@ class Databus(object):
             logger.debug("(K, V): (%s, %s)" % (key, item))
             return item
 
+    def is_dynamic(self, key):
+        """True if the value of key is computed on every read, e.g. by a function."""
+        item = self._data.get(key)
+        return bool(getattr(item, "get_value", None)) or hasattr(item, "__call__")
+
     def set_value(self, key, value):
         logger.debug("DataBus: Storing key: [%s] value: [%s]", key, value)
+        old_value = self._data.get(key)
         self._data[key] = value
+        for hook in self._change_hooks:
+            hook(key, value)
         # notify observers
         if key in self._observer_map:
-            gevent.spawn(self.notify_observers, key)
+            self._notifier.schedule(key, old_value)
 
     def notify_observers(self, key):
-        for cb in self._observer_map[key]:
-            cb(key)
+        """Notify the observers of key as if it was written."""
+        self._notifier.schedule(key, self._data.get(key))
 
-    def observe_value(self, key, callback):
+    def observe_value(self, key, callback, deltas=False):
+        """
+        Call callback(key) after key was written. Writes within one loop
+        iteration are coalesced into one call.
+        :param deltas: call callback with a list of (key, old, new) tuples instead,
+        one list for all keys the callback observes that changed in the iteration
+        """
         assert hasattr(callback, "__call__")
         assert len(
             inspect.getfullargspec(callback)[0]
         )  # depreciated in py3.5, un-depreciated in py3.6
         if key not in self._observer_map:
             self._observer_map[key] = []
-        self._observer_map[key].append(callback)
+        self._observer_map[key].append((callback, deltas))
+
+    def notification_stats(self):
+        return self._notifier.stats()
+
+    def add_change_hook(self, callback):
+        """Call callback(key, value) synchronously on every set_value."""
+        self._change_hooks.append(callback)
+
+    def static_values(self):
+        """All keys holding plain values, e.g. to copy the state to another process."""
+        return {
+            key: value for key, value in self._data.items() if not self.is_dynamic(key)
+        }
 
     def initialize(self, config_file):
         self.reset()
@@ -84,7 +187,10 @@ class Databus(object):
             key = entry.attrib["name"]
             value = entry.xpath("./value/text()")[0].strip()
             value_type = str(entry.xpath("./value/@type")[0])
-            assert key not in self._data
+            if key in self._data:
+                # set by another process sharing the backend, keep its value
+                assert self.shared
+                continue
             logging.debug("Initializing %s with %s as a %s.", key, value, value_type)
             if value_type == "value":
                 self.set_value(key, eval(value))
@@ -113,4 +219,5 @@ class Databus(object):
 
         self._data.clear()
         self._observer_map.clear()
+        self._notifier.clear()
         self.initialized.clear()
@@ -0,0 +1,491 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Storage backends of the Databus. A backend is a mapping from keys to values or
+to objects computing them (sensors, simulators). DictBackend keeps everything in
+the process. The shared backends share the plain values with other processes on
+the same host and keep objects local, as every process runs them on its own.
+
+Shared values are exchanged as JSON, never pickled, and the files and sockets
+must belong to the user conpot runs as. By default they live in a private
+directory, see default_path.
+"""
+
+import base64
+import fcntl
+import json
+import logging
+import mmap
+import os
+import socket
+import stat
+import struct
+import tempfile
+from array import array
+from collections.abc import Mapping
+
+import gevent
+from gevent.server import StreamServer
+
+from conpot.core.prefork import Channel
+
+logger = logging.getLogger(__name__)
+
+
+def private_dir(path):
+    """Create the directory path, or check an existing one, accessible by this user only."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid():
+        raise PermissionError("{} is not a directory owned by this user".format(path))
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def default_path():
+    return os.path.join(
+        private_dir(
+            os.path.join(tempfile.gettempdir(), "conpot-{}".format(os.geteuid()))
+        ),
+        "databus",
+    )
+
+
+def _check_owner(path, st, file_type):
+    if not file_type(st.st_mode) or st.st_uid != os.geteuid():
+        raise PermissionError("{} is not owned by this user".format(path))
+    if stat.S_IMODE(st.st_mode) & 0o022:
+        raise PermissionError("{} is writable by others".format(path))
+
+
+def _check_peer(sock):
+    """Refuse peers running as another user, where the platform tells."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12)
+    _, uid, _ = struct.unpack("3i", creds)
+    if uid != os.geteuid():
+        raise PermissionError("Databus peer runs as uid {}".format(uid))
+
+
+def _encode_default(value):
+    if isinstance(value, bytearray):
+        return {"__bytearray__": base64.b64encode(value).decode()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    if isinstance(value, array):
+        return {"__array__": value.typecode, "items": value.tolist()}
+    raise TypeError(
+        "{} is not a plain value, it can not be shared".format(type(value).__name__)
+    )
+
+
+def _decode_object(obj):
+    if "__bytearray__" in obj:
+        return bytearray(base64.b64decode(obj["__bytearray__"]))
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    if "__array__" in obj:
+        return array(obj["__array__"], obj["items"])
+    return obj
+
+
+def dumps(value):
+    """Encode a plain value: JSON types, bytes, bytearray or array."""
+    return json.dumps(value, default=_encode_default, separators=(",", ":")).encode()
+
+
+def loads(data):
+    return json.loads(data, object_hook=_decode_object)
+
+
+class JsonChannel(Channel):
+    """Channel exchanging plain values only, for peers that are not our own children."""
+
+    def send(self, *message):
+        data = dumps(message)
+        with self._send_lock:
+            self.sock.sendall(struct.pack("!I", len(data)) + data)
+
+    def __iter__(self):
+        for frame in self._reader:
+            if len(frame) < 4:
+                return
+            yield tuple(loads(frame[4:]))
+
+
+def is_dynamic(value):
+    return bool(getattr(value, "get_value", None)) or hasattr(value, "__call__")
+
+
+class DictBackend(dict):
+    """Default backend, the values live in this process only."""
+
+    shared = False
+
+    def subscribe(self, callback):
+        pass
+
+    def close(self):
+        pass
+
+
+class SharedBackend(Mapping):
+    """
+    Base class of the shared backends. Plain values are kept in a local cache
+    which the subclass keeps up to date, objects never leave the process.
+    Subscribers are called with (key, old, new) for changes made by other processes.
+    """
+
+    shared = True
+
+    def __init__(self):
+        self._local = {}
+        self._cache = {}
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _changed(self, key, old, new):
+        for callback in self._subscribers:
+            callback(key, old, new)
+
+    def _refresh(self):
+        """Bring the cache up to date, called before reads."""
+
+    def _store(self, key, value):
+        raise NotImplementedError
+
+    def __getitem__(self, key):
+        if key in self._local:
+            return self._local[key]
+        self._refresh()
+        return self._cache[key]
+
+    def __setitem__(self, key, value):
+        if is_dynamic(value):
+            self._local[key] = value
+        else:
+            self._local.pop(key, None)
+            self._store(key, value)
+            self._cache[key] = value
+
+    def __iter__(self):
+        self._refresh()
+        keys = list(self._local)
+        keys.extend(key for key in self._cache if key not in self._local)
+        return iter(keys)
+
+    def __len__(self):
+        self._refresh()
+        return len(self._local.keys() | self._cache.keys())
+
+    def clear(self):
+        # shared values outlive this process, e.g. a restarted worker keeps them
+        self._local.clear()
+
+    def close(self):
+        pass
+
+
+class MmapBackend(SharedBackend):
+    """
+    Shares the plain values between the processes of one host through a memory
+    mapped file. Every key has a slot in a table with the place and version of its
+    value, so a write encodes just the one value and a read only decodes the
+    values changed since. A version counter in the header tells readers whether
+    anything changed at all, a poll greenlet notifies the subscribers of changes.
+    :param create: start with no values, else attach to the values in the file
+    :param size: size of the file
+    :param max_keys: number of slots in the table
+    """
+
+    # version, max_keys, number of keys, end of the used data region
+    HEADER = struct.Struct("!QIII")
+    # key, offset, capacity, length, version
+    ENTRY = struct.Struct("!128sIIIQ")
+
+    def __init__(
+        self, path, create=False, size=4 * 1024 * 1024, max_keys=1024, poll_interval=0.1
+    ):
+        super(MmapBackend, self).__init__()
+        self.path = path
+        flags = os.O_RDWR | os.O_NOFOLLOW | (os.O_CREAT if create else 0)
+        self._fd = os.open(path, flags, 0o600)
+        try:
+            _check_owner(path, os.fstat(self._fd), stat.S_ISREG)
+            if create:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+            self.size = os.fstat(self._fd).st_size
+            self._map = mmap.mmap(self._fd, self.size)
+        except Exception:
+            os.close(self._fd)
+            raise
+        if create:
+            self.HEADER.pack_into(self._map, 0, 0, max_keys, 0, 0)
+        self.max_keys = self.HEADER.unpack_from(self._map)[1]
+        self._table = self.HEADER.size
+        self._data_start = self._table + self.max_keys * self.ENTRY.size
+        if self._data_start > self.size:
+            raise ValueError("{} is too small for {} keys".format(path, self.max_keys))
+        self._version = 0
+        # key -> table slot, and version of the value in the cache
+        self._slots = {}
+        self._versions = {}
+        self._refresh()
+        self._poller = gevent.spawn(self._poll, poll_interval)
+
+    def _poll(self, interval):
+        while True:
+            gevent.sleep(interval)
+            self._refresh()
+
+    def _lock(self, operation):
+        # flock would block the hub while another process holds the lock
+        while True:
+            try:
+                fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                gevent.sleep(0.001)
+
+    def _unlock(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _entry(self, slot):
+        return self.ENTRY.unpack_from(self._map, self._table + slot * self.ENTRY.size)
+
+    def _scan_slots(self, count):
+        # slots are never freed, only new ones need to be read
+        for slot in range(len(self._slots), count):
+            key = self._entry(slot)[0].rstrip(b"\0").decode()
+            self._slots[key] = slot
+
+    def _refresh(self):
+        if self.HEADER.unpack_from(self._map)[0] == self._version:
+            return
+        changed = []
+        self._lock(fcntl.LOCK_SH)
+        try:
+            self._version, _, count, _ = self.HEADER.unpack_from(self._map)
+            self._scan_slots(count)
+            for key, slot in self._slots.items():
+                _, offset, _, length, version = self._entry(slot)
+                if self._versions.get(key) != version:
+                    self._versions[key] = version
+                    start = self._data_start + offset
+                    changed.append((key, loads(self._map[start : start + length])))
+        finally:
+            self._unlock()
+        for key, value in changed:
+            old = self._cache.get(key)
+            self._cache[key] = value
+            self._changed(key, old, value)
+
+    def _store(self, key, value):
+        name = key.encode()
+        if len(name) > self.ENTRY.size - 20:
+            raise ValueError("Databus key too long to share: {}".format(key))
+        data = dumps(value)
+        self._lock(fcntl.LOCK_EX)
+        try:
+            version, max_keys, count, data_end = self.HEADER.unpack_from(self._map)
+            self._scan_slots(count)
+            slot = self._slots.get(key)
+            if slot is None:
+                if count >= max_keys:
+                    raise ValueError("No slot left for {} in {}".format(key, self.path))
+                slot = count
+                count += 1
+                offset = capacity = 0
+            else:
+                _, offset, capacity, _, _ = self._entry(slot)
+            if len(data) > capacity:
+                # move to a new place with room to grow, the old one is lost
+                capacity = max(64, 2 * len(data))
+                offset = data_end
+                data_end += capacity
+                if self._data_start + data_end > self.size:
+                    raise ValueError(
+                        "Databus values exceed the {} bytes of {}".format(
+                            self.size, self.path
+                        )
+                    )
+            start = self._data_start + offset
+            self._map[start : start + len(data)] = data
+            version += 1
+            self.ENTRY.pack_into(
+                self._map,
+                self._table + slot * self.ENTRY.size,
+                name,
+                offset,
+                capacity,
+                len(data),
+                version,
+            )
+            self.HEADER.pack_into(self._map, 0, version, max_keys, count, data_end)
+            self._slots[key] = slot
+            # our own write, nothing to notify
+            self._versions[key] = version
+        finally:
+            self._unlock()
+
+    def close(self):
+        self._poller.kill()
+        self._map.close()
+        os.close(self._fd)
+
+
+class SocketBackend(SharedBackend):
+    """
+    Client of a DatabusServer listening on a unix socket. All reads are served
+    from the cache, which the server keeps current by pushing every change.
+    """
+
+    def __init__(self, path):
+        super(SocketBackend, self).__init__()
+        _check_owner(path, os.lstat(path), stat.S_ISSOCK)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        _check_peer(sock)
+        self.channel = JsonChannel(sock)
+        self._messages = iter(self.channel)
+        self.channel.send("subscribe")
+        kind, values = next(self._messages)
+        assert kind == "snapshot"
+        self._cache = values
+        self._receiver = gevent.spawn(self._receive)
+
+    def _receive(self):
+        try:
+            for kind, key, value in self._messages:
+                if kind == "changed":
+                    old = self._cache.get(key)
+                    self._cache[key] = value
+                    self._changed(key, old, value)
+        except OSError:
+            pass
+        logger.warning("Lost connection to the databus server.")
+
+    def _store(self, key, value):
+        self.channel.send("set", key, value)
+
+    def close(self):
+        self._receiver.kill()
+        self.channel.close()
+
+
+class DatabusServer(object):
+    """
+    Serves the plain values of a databus to SocketBackend clients. Changes
+    from a client or from this process are pushed to all other clients.
+    """
+
+    def __init__(self, path, databus):
+        if os.path.lexists(path):
+            # left over from an earlier run, but only if it is ours
+            _check_owner(path, os.lstat(path), stat.S_ISSOCK)
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(128)
+        self.server = StreamServer(listener, self.handle)
+        self.path = path
+        self.databus = databus
+        self.clients = set()
+        self._origin = None
+        databus.add_change_hook(self._broadcast)
+
+    def _broadcast(self, key, value):
+        if self.databus.is_dynamic(key):
+            return
+        for client in list(self.clients):
+            if client is not self._origin:
+                try:
+                    client.send("changed", key, value)
+                except OSError:
+                    self.clients.discard(client)
+
+    def handle(self, sock, address):
+        try:
+            _check_peer(sock)
+        except PermissionError as e:
+            logger.warning("Refused databus client: %s", e)
+            sock.close()
+            return
+        channel = JsonChannel(sock)
+        try:
+            for message in channel:
+                if message[0] == "subscribe":
+                    channel.send("snapshot", self.databus.static_values())
+                    self.clients.add(channel)
+                elif message[0] == "set":
+                    self._origin = channel
+                    try:
+                        self.databus.set_value(message[1], message[2])
+                    finally:
+                        self._origin = None
+        except (OSError, ValueError) as e:
+            logger.debug("Databus client gone: %s", e)
+        finally:
+            self.clients.discard(channel)
+            channel.close()
+
+    def start(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.stop()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def get_backend(config, owner=True):
+    """
+    Create the backend configured in the [databus] section.
+    :param owner: False if another process creates the shared values
+    :return: backend, or None for the default DictBackend
+    """
+    name = config.get("databus", "backend", fallback="dict")
+    if name == "dict":
+        return None
+    path = config.get("databus", "path", fallback=None) or default_path()
+    if name == "mmap":
+        return MmapBackend(path, create=owner)
+    if name == "socket":
+        # the owner serves the values from its own databus
+        return None if owner else SocketBackend(path)
+    raise ValueError("Unknown databus backend: {}".format(name))
+
+
+def serve_databus(config, databus):
+    """Create the DatabusServer if the socket backend is configured, else None."""
+    if config.get("databus", "backend", fallback="dict") != "socket":
+        return None
+    path = config.get("databus", "path", fallback=None) or default_path()
+    return DatabusServer(path, databus)
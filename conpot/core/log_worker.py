@@ -19,8 +19,6 @@ import json
 import logging
 import time
 
-from datetime import datetime
-
 import configparser
 from gevent.queue import Empty
 
@@ -29,13 +27,19 @@ from conpot.core.loggers.hpfriends import HPFriendsLogger
 from conpot.core.loggers.syslog import SysLogger
 from conpot.core.loggers.taxii_log import TaxiiLogger
 from conpot.core.loggers.json_log import JsonLogger
+from conpot.core.loggers.sink_worker import SinkWorker
+from conpot.core.metrics import MetricFamily, labelled
 from .loggers.helpers import json_default
 
 logger = logging.getLogger(__name__)
 
 
 class LogWorker(object):
-    def __init__(self, config, dom, session_manager, public_ip):
+    def __init__(self, config, dom, session_manager, public_ip, forward=None):
+        """
+        :param forward: callable(event), if set all events are passed to it instead
+        of the configured loggers, e.g. to the supervisor of a prefork worker
+        """
         self.config = config
         self.log_queue = session_manager.log_queue
         self.session_manager = session_manager
@@ -46,13 +50,37 @@ class LogWorker(object):
         self.public_ip = public_ip
         self.taxii_logger = None
 
+        # every sink gets its own queue so a slow or unreachable one only delays itself
+        self.sinks = []
+        if forward is not None:
+            self._add_sink("supervisor", forward)
+        else:
+            self._setup_loggers(config, dom, public_ip)
+
+        self.enabled = True
+
+    def _setup_loggers(self, config, dom, public_ip):
         if config.getboolean("sqlite", "enabled"):
-            self.sqlite_logger = SQLiteLogger()
+            batch_size = config.getint("sqlite", "batch_size", fallback=500)
+            max_latency = config.getfloat("sqlite", "max_latency", fallback=0.2)
+            self.sqlite_logger = SQLiteLogger(
+                batch_size=batch_size, max_latency=max_latency
+            )
 
         if config.getboolean("json", "enabled"):
             filename = config.get("json", "filename")
             sensorid = config.get("common", "sensorid")
-            self.json_logger = JsonLogger(filename, sensorid, public_ip)
+            self.json_logger = JsonLogger(
+                filename,
+                sensorid,
+                public_ip,
+                buffer_size=config.getint("json", "buffer_size", fallback=64 * 1024),
+                flush_interval=config.getfloat("json", "flush_interval", fallback=1.0),
+                fsync=config.get("json", "fsync", fallback="never"),
+                max_bytes=config.getint("json", "max_bytes", fallback=0),
+                rotate_interval=config.getint("json", "rotate_interval", fallback=0),
+                compress=config.getboolean("json", "compress", fallback=True),
+            )
 
         if config.getboolean("hpfriends", "enabled"):
             host = config.get("hpfriends", "host")
@@ -80,54 +108,143 @@ class LogWorker(object):
             # TODO: support for certificates
             self.taxii_logger = TaxiiLogger(config, dom)
 
-        self.enabled = True
+        if self.friends_feeder:
+            self._add_sink("hpfriends", self._log_hpfriends, "drop_oldest")
+        if self.sqlite_logger:
+            self._add_sink("sqlite", self.sqlite_logger.log)
+        if self.syslog_client:
+            self._add_sink("syslog", self.syslog_client.log)
+        if self.taxii_logger:
+            self._add_sink("taxii", self.taxii_logger.log, "drop_oldest")
+        if self.json_logger:
+            self._add_sink("json", self.json_logger.log)
+
+    def _add_sink(self, name, log_func, default_overflow="block"):
+        maxsize = self.config.getint(name, "queue_size", fallback=10000)
+        overflow = self.config.get(name, "overflow", fallback=default_overflow)
+        spill_dir = self.config.get(name, "spill_dir", fallback=None)
+        self.sinks.append(SinkWorker(name, log_func, maxsize, overflow, spill_dir))
+
+    def _log_hpfriends(self, event):
+        return self.friends_feeder.log(json.dumps(event, default=json_default))
+
+    def sink_stats(self):
+        return {sink.name: sink.stats() for sink in self.sinks}
+
+    def collect(self):
+        """The stats of the sinks and loggers as metrics, see Registry.add_collector."""
+        sinks = self.sink_stats()
+        families = [
+            labelled(
+                "conpot_sink_queue_depth",
+                "gauge",
+                "Events waiting for a sink, in memory or spilled",
+                "sink",
+                {name: stats["queue_depth"] for name, stats in sinks.items()},
+            ),
+            MetricFamily(
+                "conpot_sink_events_total",
+                "counter",
+                "Events of a sink by outcome",
+                [
+                    ({"sink": name, "outcome": outcome}, stats[outcome])
+                    for name, stats in sinks.items()
+                    for outcome in (
+                        "queued",
+                        "processed",
+                        "dropped",
+                        "spilled",
+                        "errors",
+                    )
+                ],
+            ),
+        ]
+        if self.sqlite_logger:
+            families.append(
+                MetricFamily(
+                    "conpot_sqlite_commits_total",
+                    "counter",
+                    "Transactions committed by the sqlite logger",
+                    [({}, self.sqlite_logger.commits)],
+                )
+            )
+            families.append(
+                MetricFamily(
+                    "conpot_sqlite_queue_depth",
+                    "gauge",
+                    "Events waiting for the next commit of the sqlite logger",
+                    [({}, self.sqlite_logger.queue_depth)],
+                )
+            )
+        if self.json_logger:
+            writer = self.json_logger.writer.stats()
+            families.append(
+                MetricFamily(
+                    "conpot_json_pending_bytes",
+                    "gauge",
+                    "Bytes not yet handed to the writer thread of the json logger",
+                    [({}, writer["queue_depth"])],
+                )
+            )
+            for name in ("lines_written", "batches", "rotations", "errors"):
+                families.append(
+                    MetricFamily(
+                        "conpot_json_{}_total".format(name),
+                        "counter",
+                        "{} of the json log file".format(
+                            name.capitalize().replace("_", " ")
+                        ),
+                        [({}, writer[name])],
+                    )
+                )
+        return families
 
     def _process_sessions(self):
-        sessions = self.session_manager._sessions
         try:
             session_timeout = self.config.get("session", "timeout")
         except (configparser.NoSectionError, configparser.NoOptionError):
             session_timeout = 5
-        for session in sessions:
-            if len(session.data) > 0:
-                sec_last_event = max(session.data) / 1000
-            else:
-                sec_last_event = 0
-            sec_session_start = time.mktime(session.timestamp.timetuple())
-            sec_now = time.mktime(datetime.utcnow().timetuple())
-            if (sec_now - (sec_session_start + sec_last_event)) >= float(
-                session_timeout
-            ):
-                # TODO: We need to close sockets in this case
-                logger.info("Session timed out: %s", session.id)
-                session.set_ended()
-                sessions.remove(session)
+        for session in self.session_manager.expire_sessions(float(session_timeout)):
+            # TODO: We need to close sockets in this case
+            logger.info("Session timed out: %s", session.id)
+
+    def _dispatch(self, event):
+        if self.public_ip:
+            event["public_ip"] = self.public_ip
+        for sink in self.sinks:
+            sink.put(event)
 
     def start(self):
         self.enabled = True
+        for sink in self.sinks:
+            sink.start()
+        last_session_check = time.monotonic()
         while self.enabled:
+            # expire sessions even when the queue never runs dry under load
+            if time.monotonic() - last_session_check >= 2:
+                self._process_sessions()
+                last_session_check = time.monotonic()
             try:
                 event = self.log_queue.get(timeout=2)
             except Empty:
                 self._process_sessions()
+                last_session_check = time.monotonic()
             else:
-                if self.public_ip:
-                    event["public_ip"] = self.public_ip
-
-                if self.friends_feeder:
-                    self.friends_feeder.log(json.dumps(event, default=json_default))
-
-                if self.sqlite_logger:
-                    self.sqlite_logger.log(event)
+                self._dispatch(event)
 
-                if self.syslog_client:
-                    self.syslog_client.log(event)
+        # sessions still open end now, so that their summaries get logged
+        self.session_manager.expire_sessions(0)
+        while not self.log_queue.empty():
+            self._dispatch(self.log_queue.get_nowait())
 
-                if self.taxii_logger:
-                    self.taxii_logger.log(event)
+        for sink in self.sinks:
+            sink.stop()
 
-                if self.json_logger:
-                    self.json_logger.log(event)
+        # make sure buffered events reach disk before we go away
+        if self.sqlite_logger:
+            self.sqlite_logger.close()
+        if self.json_logger:
+            self.json_logger.close()
 
     def stop(self):
         self.enabled = False
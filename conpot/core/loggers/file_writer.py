@@ -0,0 +1,191 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import gzip
+import logging
+import os
+import shutil
+import time
+
+import gevent
+import gevent.event
+import gevent.lock
+from gevent.threadpool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("never", "rotate", "always")
+
+
+class RotatingFileWriter(object):
+    """
+    Appends lines to a file from a dedicated writer thread, so disk I/O never
+    blocks the gevent hub.
+
+    Lines are collected in memory and handed to the thread as one batch once
+    ``buffer_size`` bytes are pending or every ``flush_interval`` seconds. At most
+    ``max_batches`` batches wait for the thread, beyond that write() blocks the
+    calling greenlet. ``fsync`` is ``never``, ``rotate`` (when a file is rotated
+    or closed) or ``always`` (after every batch).
+
+    The file is rotated when it grows beyond ``max_bytes`` or is older than
+    ``rotate_interval`` seconds, 0 disables either. Rotated segments are renamed
+    with a timestamp suffix and, with ``compress``, gzipped.
+    """
+
+    def __init__(
+        self,
+        filename,
+        buffer_size=64 * 1024,
+        flush_interval=1.0,
+        fsync="never",
+        max_bytes=0,
+        rotate_interval=0,
+        compress=True,
+        max_batches=16,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("Unknown fsync policy for {}: {}".format(filename, fsync))
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self._pending = []
+        self._pending_bytes = 0
+        self._slots = gevent.lock.BoundedSemaphore(max_batches)
+        self._writer = ThreadPool(1)
+        self._file = None
+        self._writer.apply(self._open)
+
+        # counters
+        self.lines_written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+        self.enabled = True
+        self._flusher = gevent.spawn(self._flush_loop)
+
+    @property
+    def queue_depth(self):
+        """bytes not yet handed to the writer thread"""
+        return self._pending_bytes
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "lines_written": self.lines_written,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
+
+    def write(self, line):
+        """Append line, bytes including the line terminator."""
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        if self._pending_bytes >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Hand all pending lines to the writer thread, without waiting for the write."""
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        self._slots.acquire()
+        result = self._writer.spawn(self._write, batch)
+        result.rawlink(lambda result: self._written(result, len(batch)))
+
+    def _written(self, result, lines):
+        self._slots.release()
+        if result.successful():
+            self.lines_written += lines
+            self.batches += 1
+        else:
+            self.errors += 1
+            logger.error(
+                "Failed to write %s lines to %s: %s",
+                lines,
+                self.filename,
+                result.exception,
+            )
+
+    def _flush_loop(self):
+        while self.enabled:
+            gevent.sleep(self.flush_interval)
+            self.flush()
+
+    # the methods below run on the writer thread
+
+    def _open(self):
+        self._file = open(self.filename, "ab")
+        self._size = self._file.tell()
+        self._opened = time.time()
+
+    def _write(self, batch):
+        if self._size and (
+            (self.max_bytes and self._size >= self.max_bytes)
+            or (
+                self.rotate_interval
+                and time.time() - self._opened >= self.rotate_interval
+            )
+        ):
+            self._rotate()
+        data = b"".join(batch)
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        if self.fsync == "always":
+            os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def _rotate(self):
+        self._close()
+        segment = "{}.{}".format(
+            self.filename, time.strftime("%Y%m%d-%H%M%S", time.localtime(self._opened))
+        )
+        suffix = ".gz" if self.compress else ""
+        name, counter = segment, 1
+        while os.path.exists(name + suffix):
+            name = "{}.{}".format(segment, counter)
+            counter += 1
+        os.rename(self.filename, name)
+        if self.compress:
+            with open(name, "rb") as source, gzip.open(name + suffix, "wb") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.remove(name)
+        self._open()
+        self.rotations += 1
+
+    def close(self):
+        """Stop the flusher, write everything still pending and close the file."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._flusher.kill()
+        self.flush()
+        self._writer.join()
+        self._writer.apply(self._close)
+        self._writer.kill()
@@ -17,35 +17,45 @@
 
 
 import json
+from .file_writer import RotatingFileWriter
 from .helpers import json_default
 
+encoder = json.JSONEncoder(default=json_default)
+
 
 class JsonLogger(object):
-    def __init__(self, filename, sensorid, public_ip):
-        self.fileHandle = open(filename, "a")
+    """
+    Writes one JSON object per event and line. Writer options, e.g. buffering
+    and rotation, are passed on to RotatingFileWriter.
+    """
+
+    def __init__(self, filename, sensorid, public_ip, **options):
+        self.writer = RotatingFileWriter(filename, **options)
         self.sensorid = sensorid
         self.public_ip = public_ip
+        # the constant fields are serialized once, each line starts with them
+        self._prefix = '{{"sensorid": {}, "public_ip": {}, '.format(
+            encoder.encode(sensorid), encoder.encode(public_ip)
+        )
 
     def log(self, event):
-        if self.public_ip is not None:
-            dst_ip = self.public_ip
-        else:
-            dst_ip = None
         data = {
             "timestamp": event["timestamp"].isoformat(),
-            "sensorid": self.sensorid,
             "id": event["id"],
             "src_ip": event["remote"][0],
             "src_port": event["remote"][1],
             "dst_ip": event["local"][0],
             "dst_port": event["local"][1],
-            "public_ip": dst_ip,
             "data_type": event["data_type"],
             "request": event["data"].get("request"),
             "response": event["data"].get("response"),
             "event_type": event["data"].get("type"),
         }
+        if "session" in event["data"]:
+            # a summary of the whole session
+            data["session"] = event["data"]["session"]
+        line = self._prefix + encoder.encode(data)[1:] + "\n"
+        self.writer.write(line.encode())
 
-        json.dump(data, self.fileHandle, default=json_default)
-        self.fileHandle.write("\n")
-        self.fileHandle.flush()
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,155 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import logging
+import os
+import pickle
+import tempfile
+
+import gevent
+from gevent.queue import Queue, Full, Empty
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+
+class SinkWorker(object):
+    """
+    Feeds events to a single log sink from its own bounded queue, so a slow sink
+    only ever delays itself.
+
+    When the queue is full the overflow policy decides what happens to new events:
+    ``block`` waits for room, ``drop_oldest`` discards the oldest queued event and
+    ``spill`` appends events to a file on disk that is replayed once the queue drains.
+    """
+
+    def __init__(self, name, log_func, maxsize=10000, overflow="block", spill_dir=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "Unknown overflow policy for {} sink: {}".format(name, overflow)
+            )
+        self.name = name
+        self.log_func = log_func
+        self.overflow = overflow
+        self.queue = Queue(maxsize)
+        self.greenlet = None
+        self.enabled = False
+
+        self.spill_path = None
+        self._spill_out = None
+        self._spill_in = None
+        self._spill_pending = 0
+        if overflow == "spill":
+            fd, self.spill_path = tempfile.mkstemp(
+                prefix="conpot-{}-".format(name), suffix=".spill", dir=spill_dir
+            )
+            self._spill_out = os.fdopen(fd, "wb")
+            self._spill_in = open(self.spill_path, "rb")
+
+        # counters
+        self.queued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.errors = 0
+
+    @property
+    def queue_depth(self):
+        return self.queue.qsize() + self._spill_pending
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "queued": self.queued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "errors": self.errors,
+        }
+
+    def put(self, event):
+        self.queued += 1
+        if self.overflow == "block":
+            self.queue.put(event)
+        elif self.overflow == "drop_oldest":
+            while True:
+                try:
+                    self.queue.put_nowait(event)
+                    return
+                except Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except Empty:
+                        pass
+        # once we started spilling keep doing so until the file is drained to preserve ordering
+        elif self._spill_pending or self.queue.full():
+            pickle.dump(event, self._spill_out, pickle.HIGHEST_PROTOCOL)
+            self._spill_pending += 1
+            self.spilled += 1
+        else:
+            self.queue.put_nowait(event)
+
+    def _next_event(self):
+        if self._spill_pending and self.queue.empty():
+            self._spill_out.flush()
+            event = pickle.load(self._spill_in)
+            self._spill_pending -= 1
+            if not self._spill_pending:
+                # caught up with the writer, reclaim the disk space
+                self._spill_out.seek(0)
+                self._spill_out.truncate()
+                self._spill_in.seek(0)
+            return event
+        return self.queue.get(timeout=1)
+
+    def _run(self):
+        while self.enabled or self.queue_depth:
+            try:
+                event = self._next_event()
+            except Empty:
+                continue
+            try:
+                self.log_func(event)
+            except Exception as e:
+                self.errors += 1
+                logger.exception("%s sink failed to log event: %s", self.name, e)
+            else:
+                self.processed += 1
+
+    def start(self):
+        self.enabled = True
+        self.greenlet = gevent.spawn(self._run)
+
+    def stop(self, timeout=10):
+        """Stop accepting events and give the sink up to timeout seconds to drain its queue."""
+        self.enabled = False
+        if self.greenlet:
+            self.greenlet.join(timeout)
+            self.greenlet.kill()
+        if self.queue_depth:
+            logger.warning(
+                "%s sink stopped with %s events still queued.",
+                self.name,
+                self.queue_depth,
+            )
+        if self.spill_path:
+            self._spill_out.close()
+            self._spill_in.close()
+            os.remove(self.spill_path)
+            self.spill_path = None
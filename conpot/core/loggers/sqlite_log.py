@@ -16,14 +16,33 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 
+import logging
 import sqlite3
 import pwd
 import os
 import platform
 import grp
+import time
+
+import gevent
+import gevent.event
+from gevent.threadpool import ThreadPool
+
+logger = logging.getLogger(__name__)
 
 
 class SQLiteLogger(object):
+    """
+    Event sink that writes to a SQLite database using group commit.
+
+    Events are collected in memory and written with a single ``executemany``
+    and ``commit`` once ``batch_size`` events are pending or the oldest pending
+    event is ``max_latency`` seconds old, whichever comes first. All SQLite calls
+    run on a dedicated writer thread so disk I/O never blocks the gevent hub.
+    A batch that fails to commit is retried once, then dropped and counted in
+    ``events_dropped``.
+    """
+
     def _chown_db(self, path, uid_name="nobody", gid_name="nogroup"):
         path = path.rpartition("/")[0]
         if not os.path.isdir(path):
@@ -37,13 +56,38 @@ class SQLiteLogger(object):
             wanted_gid = grp.getgrnam(gid_name)[2]
         os.chown(path, wanted_uid, wanted_gid)
 
-    def __init__(self, db_path="logs/conpot.db"):
+    def __init__(self, db_path="logs/conpot.db", batch_size=500, max_latency=0.2):
         self._chown_db(db_path)
-        self.conn = sqlite3.connect(db_path)
-        self._create_db()
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._pending = []
+        # monotonic time the oldest pending event was logged
+        self._oldest = 0.0
+        self._arrived = gevent.event.Event()
+        self._full = gevent.event.Event()
+        self._writer = ThreadPool(1)
+        self.conn = self._writer.apply(self._connect, (db_path,))
+
+        # counters
+        self.events_logged = 0
+        self.events_dropped = 0
+        self.commits = 0
+        self.last_commit_latency = 0.0
+        self.max_commit_latency = 0.0
+
+        self.enabled = True
+        self._flusher = gevent.spawn(self._flush_loop)
+
+    def _connect(self, db_path):
+        # runs on the writer thread
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_db(conn)
+        return conn
 
-    def _create_db(self):
-        cursor = self.conn.cursor()
+    def _create_db(self, conn):
+        cursor = conn.cursor()
         cursor.execute("""CREATE TABLE IF NOT EXISTS events
             (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,18 +98,90 @@ class SQLiteLogger(object):
                 request TEXT,
                 response TEXT
             )""")
+        conn.commit()
+
+    @property
+    def queue_depth(self):
+        return len(self._pending)
 
     def log(self, event):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO events(session, remote, protocol, request, response) VALUES (?, ?, ?, ?, ?)",
+        if not self._pending:
+            self._oldest = time.monotonic()
+            self._arrived.set()
+        self._pending.append(
             (
                 str(event["id"]),
                 str(event["remote"]),
                 event["data_type"],
                 str(event["data"].get("request")),
                 str(event["data"].get("response")),
-            ),
+            )
         )
-        self.conn.commit()
-        return cursor.lastrowid
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    def _write_rows(self, rows):
+        # runs on the writer thread
+        try:
+            self.conn.executemany(
+                "INSERT INTO events(session, remote, protocol, request, response) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def _flush_loop(self):
+        while self.enabled:
+            # the timer starts with the first pending event
+            self._arrived.wait()
+            self._full.wait(
+                timeout=max(0, self._oldest + self.max_latency - time.monotonic())
+            )
+            self._arrived.clear()
+            self._full.clear()
+            self.flush()
+
+    def flush(self):
+        """Commit all pending events, in chunks of at most batch_size rows."""
+        while self._pending:
+            rows = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            start = time.monotonic()
+            try:
+                self._commit(rows)
+            except sqlite3.Error as e:
+                logger.exception(
+                    "Failed to commit %s events to SQLite, dropping them: %s",
+                    len(rows),
+                    e,
+                )
+                self.events_dropped += len(rows)
+                continue
+            latency = time.monotonic() - start
+            self.commits += 1
+            self.events_logged += len(rows)
+            self.last_commit_latency = latency
+            self.max_commit_latency = max(self.max_commit_latency, latency)
+
+    def _commit(self, rows):
+        try:
+            self._writer.apply(self._write_rows, (rows,))
+        except sqlite3.Error as e:
+            logger.warning(
+                "Failed to commit %s events to SQLite, retrying: %s", len(rows), e
+            )
+            self._writer.apply(self._write_rows, (rows,))
+
+    def close(self):
+        """Stop the flusher, commit everything still pending and close the database."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._arrived.set()
+        self._full.set()
+        self._flusher.join()
+        self.flush()
+        self._writer.apply(self.conn.close)
+        self._writer.kill()
@@ -0,0 +1,499 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Metrics in the Prometheus text format. Counters, gauges and histograms are kept
+in a Registry and updated where things happen, e.g. by the handler wrapper of
+ProtocolMetrics every protocol server gets through conpot.core.wrap_handler.
+Counters kept elsewhere, like the stats() of the sinks, pools and tarpit, are
+read by collectors when the metrics are scraped. MetricsServer serves them on
+/metrics and measures the lag of the gevent hub.
+"""
+
+import bisect
+import logging
+import math
+import time
+from collections import namedtuple
+
+import gevent
+from gevent.pywsgi import WSGIServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds, handlers of stream servers run as long as their connection
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# what a collector returns, samples is a list of (labels dict, value)
+MetricFamily = namedtuple("MetricFamily", ["name", "kind", "help", "samples"])
+
+
+def labelled(name, kind, help, label, values):
+    """A MetricFamily of values, a dict of the label value to the sample value."""
+    return MetricFamily(
+        name, kind, help, [({label: key}, value) for key, value in values.items()]
+    )
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(int(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{{{}}}".format(
+        ",".join('{}="{}"'.format(key, _escape(value)) for key, value in labels)
+    )
+
+
+def _header(name, kind, help):
+    return [
+        "# HELP {} {}".format(name, help.replace("\\", "\\\\").replace("\n", "\\n")),
+        "# TYPE {} {}".format(name, kind),
+    ]
+
+
+class _Value(object):
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _Observations(object):
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # the last one counts those above all buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric(object):
+    """
+    Base of the metrics. Values are kept per tuple of label values, labels()
+    returns the one to update. A metric without labelnames is updated directly.
+    """
+
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                "{} takes the labels {}".format(self.name, ", ".join(self.labelnames))
+            )
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def value(self, *values):
+        child = self._children.get(values)
+        return 0 if child is None else child.value
+
+    def _samples(self):
+        for values, child in sorted(self._children.items()):
+            yield _format_labels(list(zip(self.labelnames, values))), child.value
+
+    def expose(self):
+        lines = _header(self.name, self.kind, self.help)
+        for labels, value in self._samples():
+            lines.append("{}{} {}".format(self.name, labels, _format_value(value)))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    """
+    :param buckets: ascending upper bounds of the buckets, without +Inf
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Observations(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def expose(self):
+        lines = _header(self.name, self.kind, self.help)
+        for values, child in sorted(self._children.items()):
+            labels = list(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                lines.append(
+                    "{}_bucket{} {}".format(
+                        self.name,
+                        _format_labels(labels + [("le", _format_value(float(bound)))]),
+                        cumulative,
+                    )
+                )
+            labels = _format_labels(labels)
+            lines.append("{}_sum{} {}".format(self.name, labels, repr(child.sum)))
+            lines.append("{}_count{} {}".format(self.name, labels, child.count))
+        return lines
+
+
+class Registry(object):
+    """The metrics of this process and the collectors reading the others."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric_class, name, *args):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = metric_class(name, *args)
+        elif not isinstance(metric, metric_class):
+            raise ValueError("{} is registered as a {}".format(name, metric.kind))
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def add_collector(self, collector):
+        """Call collector() on every scrape, it returns a list of MetricFamily."""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def exposition(self):
+        """All metrics in the Prometheus text format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].expose())
+        for collector in list(self._collectors):
+            try:
+                families = collector()
+            except Exception as e:
+                logger.exception("Metrics collector failed: %s", e)
+                continue
+            for family in families:
+                lines.extend(_header(family.name, family.kind, family.help))
+                for labels, value in family.samples:
+                    lines.append(
+                        "{}{} {}".format(
+                            family.name,
+                            _format_labels(sorted(labels.items())),
+                            _format_value(value),
+                        )
+                    )
+        lines.append("")
+        return "\n".join(lines)
+
+
+class ProtocolMetrics(object):
+    """Connections, errors and handler latency per protocol."""
+
+    def __init__(self, registry):
+        self.connections = registry.counter(
+            "conpot_connections_total",
+            "Connections, or datagrams, admitted per protocol",
+            ("protocol",),
+        )
+        self.active = registry.gauge(
+            "conpot_active_handlers",
+            "Handlers running per protocol",
+            ("protocol",),
+        )
+        self.errors = registry.counter(
+            "conpot_handler_errors_total",
+            "Handlers of a protocol that raised an exception",
+            ("protocol",),
+        )
+        self.latency = registry.histogram(
+            "conpot_handler_duration_seconds",
+            "Time a handler of the protocol ran, for stream servers the connection",
+            ("protocol",),
+        )
+
+    def instrument(self, protocol, handle):
+        """Count and time the calls of the handle function of a protocol server."""
+        connections = self.connections.labels(protocol)
+        active = self.active.labels(protocol)
+        errors = self.errors.labels(protocol)
+        latency = self.latency.labels(protocol)
+
+        def instrumented(*args, **kwargs):
+            connections.inc()
+            active.inc()
+            started = time.monotonic()
+            try:
+                return handle(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, gevent.GreenletExit):
+                    errors.inc()
+                raise
+            finally:
+                active.dec()
+                latency.observe(time.monotonic() - started)
+
+        return instrumented
+
+
+class CoreCollector(object):
+    """Reads the stats of the core components on every scrape."""
+
+    def __init__(self, session_manager, databus, admission, pools, tarpit):
+        self.session_manager = session_manager
+        self.databus = databus
+        self.admission = admission
+        self.pools = pools
+        self.tarpit = tarpit
+
+    def __call__(self):
+        session_manager = self.session_manager
+        notifications = self.databus.notification_stats()
+        admission = self.admission.stats()
+        pools = self.pools.stats()
+        tarpit = self.tarpit.stats()
+        return [
+            MetricFamily(
+                "conpot_log_queue_depth",
+                "gauge",
+                "Events waiting for the log worker",
+                [({}, session_manager.log_queue.qsize())],
+            ),
+            MetricFamily(
+                "conpot_sessions",
+                "gauge",
+                "Attack sessions kept",
+                [({}, len(session_manager))],
+            ),
+            MetricFamily(
+                "conpot_session_memory_bytes",
+                "gauge",
+                "Approximate memory of the events stored in the sessions",
+                [({}, session_manager.memory)],
+            ),
+            labelled(
+                "conpot_requests_total",
+                "counter",
+                "Session events per protocol, except those of connections",
+                "protocol",
+                session_manager.requests,
+            ),
+            MetricFamily(
+                "conpot_greenlets",
+                "gauge",
+                "Handler greenlets running in the pools of all protocols",
+                [({}, sum(stats["in_use"] for stats in pools.values()))],
+            ),
+            MetricFamily(
+                "conpot_databus_notifications_total",
+                "counter",
+                "Databus change notifications by outcome",
+                [
+                    ({"outcome": "issued"}, notifications["issued"]),
+                    ({"outcome": "coalesced"}, notifications["coalesced"]),
+                ],
+            ),
+            MetricFamily(
+                "conpot_databus_notifications_pending",
+                "gauge",
+                "Databus change notifications waiting",
+                [({}, notifications["pending"])],
+            ),
+            labelled(
+                "conpot_admission_admitted_total",
+                "counter",
+                "Connections, or datagrams, admitted by admission control",
+                "protocol",
+                admission["admitted"],
+            ),
+            labelled(
+                "conpot_admission_rejected_total",
+                "counter",
+                "Connections, or datagrams, turned away by admission control",
+                "protocol",
+                admission["rejected"],
+            ),
+            labelled(
+                "conpot_pool_in_use",
+                "gauge",
+                "Handler greenlets in use per protocol",
+                "protocol",
+                {protocol: stats["in_use"] for protocol, stats in pools.items()},
+            ),
+            labelled(
+                "conpot_pool_rejected_total",
+                "counter",
+                "Connections, or datagrams, arriving at a full pool and not queued",
+                "protocol",
+                {protocol: stats["rejected"] for protocol, stats in pools.items()},
+            ),
+            MetricFamily(
+                "conpot_tarpit_connections",
+                "gauge",
+                "Connections held in the tarpit",
+                [({}, tarpit["in_tarpit"])],
+            ),
+            MetricFamily(
+                "conpot_tarpit_events_total",
+                "counter",
+                "Connections parked in, refused by and closed by the tarpit",
+                [
+                    ({"event": event}, tarpit[event])
+                    for event in ("parked", "refused", "closed")
+                ],
+            ),
+            MetricFamily(
+                "conpot_tarpit_sent_bytes_total",
+                "counter",
+                "Bytes the tarpit sent",
+                [({}, tarpit["sent"])],
+            ),
+        ]
+
+
+class MetricsServer(object):
+    """
+    Serves the metrics of registry on /metrics, meant for a local address.
+    :param lag_interval: seconds between two measurements of the hub lag
+    """
+
+    def __init__(self, registry, host="127.0.0.1", port=9090, lag_interval=1):
+        self.registry = registry
+        self.lag_interval = lag_interval
+        self.hub_lag = registry.gauge(
+            "conpot_hub_lag_seconds",
+            "How late the hub last woke up a greenlet sleeping lag_interval seconds",
+        )
+        self.server = WSGIServer((host, port), self.application, log=None)
+        # bind right away, so the port is known before serve_forever()
+        self.server.init_socket()
+        self._lag_watcher = None
+
+    @property
+    def server_port(self):
+        return self.server.server_port
+
+    def application(self, environ, start_response):
+        if environ["PATH_INFO"] not in ("/", "/metrics"):
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Not Found\n"]
+        body = self.registry.exposition().encode()
+        start_response(
+            "200 OK",
+            [("Content-Type", CONTENT_TYPE), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+    def _watch_lag(self):
+        while True:
+            started = time.monotonic()
+            gevent.sleep(self.lag_interval)
+            self.hub_lag.set(max(0.0, time.monotonic() - started - self.lag_interval))
+
+    def start(self):
+        self._lag_watcher = gevent.spawn(self._watch_lag)
+        logger.info("Serving metrics on %s:%s", *self.server.address[:2])
+        self.server.serve_forever()
+
+    def stop(self):
+        if self._lag_watcher is not None:
+            self._lag_watcher.kill()
+            self._lag_watcher = None
+        self.server.stop()
+
+
+def serve_metrics(config, registry, offset=0):
+    """
+    Create the MetricsServer of the [metrics] section, None if disabled.
+    :param offset: added to the configured port, e.g. by workers of the supervisor
+    """
+    if not config.getboolean("metrics", "enabled", fallback=False):
+        return None
+    return MetricsServer(
+        registry,
+        config.get("metrics", "host", fallback="127.0.0.1"),
+        config.getint("metrics", "port", fallback=9090) + offset,
+        config.getfloat("metrics", "lag_interval", fallback=1),
+    )
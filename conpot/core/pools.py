@@ -0,0 +1,143 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Bounded pools of handler greenlets for the StreamServer and DatagramServer of
+each protocol, passed as their spawn argument. What happens to a connection
+arriving at a full pool is up to the overflow policy:
+
+refuse closes it, or drops the datagram.
+queue leaves it in the listen backlog of the kernel until a handler is done, the
+server does not accept while the pool is full.
+tarpit parks it in the tarpit for tarpit_hold seconds, see conpot.core.tarpit.
+"""
+
+import logging
+import weakref
+from collections import namedtuple
+
+from gevent.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("refuse", "queue", "tarpit")
+
+# greenlets per server, 0 for no limit, and the overflow policy
+PoolSettings = namedtuple("PoolSettings", ["size", "overflow"])
+
+
+class ProtocolPool(Pool):
+    """
+    :param size: greenlets handling connections at once, None for no limit
+    :param overflow: refuse, queue or tarpit
+    :param counters: dict shared by the pools of a protocol, counting the rejected
+    :param tarpit: Tarpit of the tarpit overflow policy
+    """
+
+    def __init__(
+        self,
+        size=None,
+        overflow="refuse",
+        tarpit_hold=60,
+        counters=None,
+        tarpit=None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: {}".format(overflow))
+        if overflow == "tarpit" and tarpit is None:
+            raise ValueError("The tarpit overflow policy needs a tarpit")
+        super(ProtocolPool, self).__init__(size)
+        self.overflow = overflow
+        self.tarpit_hold = tarpit_hold
+        self.tarpit = tarpit
+        self.counters = counters if counters is not None else {"rejected": 0}
+
+    def full(self):
+        # the server stops accepting while full, unless we deal with the overflow
+        return self.overflow == "queue" and super(ProtocolPool, self).full()
+
+    def spawn(self, *args, **kwargs):
+        if self.overflow != "queue" and super(ProtocolPool, self).full():
+            # the server passes the arguments of its handler last
+            self._overflow(args[-1][0])
+            return None
+        return super(ProtocolPool, self).spawn(*args, **kwargs)
+
+    def _overflow(self, client):
+        self.counters["rejected"] += 1
+        if isinstance(client, bytes):
+            return
+        if self.overflow == "tarpit":
+            self.tarpit.park(client, hold=self.tarpit_hold)
+        else:
+            client.close()
+
+
+class Pools(object):
+    """Creates the pools of the protocols and keeps count of them."""
+
+    def __init__(self, tarpit=None):
+        self.tarpit = tarpit
+        self.default = PoolSettings(0, "refuse")
+        self.tarpit_hold = 60
+        self.settings = {}
+        self._pools = {}
+        self._counters = {}
+
+    def configure(self, default=PoolSettings(0, "refuse"), tarpit_hold=60):
+        """
+        :param default: PoolSettings of the protocols the template sets none for
+        :param tarpit_hold: seconds the tarpit overflow policy holds connections
+        """
+        if default.overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: {}".format(default.overflow))
+        self.default = default
+        self.tarpit_hold = tarpit_hold
+
+    def load_template(self, dom):
+        """Read the pool settings per protocol from the limits section of the core template."""
+        for node in dom.xpath("//core/limits/protocol"):
+            self.settings[node.attrib["name"]] = PoolSettings(
+                int(node.attrib.get("concurrency", self.default.size)),
+                node.attrib.get("overflow", self.default.overflow),
+            )
+
+    def create(self, protocol, size=None):
+        """
+        A new pool for a server of protocol.
+        :param size: overrides the configured size
+        """
+        settings = self.settings.get(protocol, self.default)
+        pool = ProtocolPool(
+            size or settings.size or None,
+            settings.overflow,
+            self.tarpit_hold,
+            self._counters.setdefault(protocol, {"rejected": 0}),
+            self.tarpit,
+        )
+        self._pools.setdefault(protocol, weakref.WeakSet()).add(pool)
+        return pool
+
+    def stats(self):
+        """In-use greenlets and rejected connections per protocol."""
+        return {
+            protocol: {
+                "in_use": sum(len(pool) for pool in self._pools.get(protocol, ())),
+                "rejected": counters["rejected"],
+            }
+            for protocol, counters in self._counters.items()
+        }
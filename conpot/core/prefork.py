@@ -0,0 +1,298 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Multi-process mode. A Supervisor starts worker processes which each serve all
+enabled protocols on SO_REUSEPORT listeners, so the kernel spreads connections
+over the workers. Every worker is linked to the supervisor by a Channel over
+which it ships its events to the log pipeline of the supervisor, replicates
+databus changes and sends heartbeats.
+"""
+
+import logging
+import os
+import pickle
+import signal
+import socket
+import struct
+import time
+
+import gevent
+import gevent.lock
+from gevent import subprocess
+
+from conpot.utils.framing import FrameFormat, FrameReader
+
+logger = logging.getLogger(__name__)
+
+MESSAGE = FrameFormat(4, lambda header: 4 + int.from_bytes(header[:4], "big"))
+
+
+class Channel(object):
+    """Pickled messages, each a tuple, over a local stream socket."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._reader = FrameReader(sock, MESSAGE)
+        self._send_lock = gevent.lock.Semaphore()
+
+    def send(self, *message):
+        data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+        with self._send_lock:
+            self.sock.sendall(struct.pack("!I", len(data)) + data)
+
+    def __iter__(self):
+        for frame in self._reader:
+            if len(frame) < 4:
+                return
+            yield pickle.loads(frame[4:])
+
+    def close(self):
+        self.sock.close()
+
+
+def enable_reuse_port():
+    """Set SO_REUSEPORT on every TCP/UDP socket before it is bound."""
+    if getattr(socket.socket.bind, "reuse_port", False):
+        return
+    bind = socket.socket.bind
+
+    def bind_reuse_port(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6) and sock.type in (
+            socket.SOCK_STREAM,
+            socket.SOCK_DGRAM,
+        ):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        return bind(sock, address)
+
+    bind_reuse_port.reuse_port = True
+    socket.socket.bind = bind_reuse_port
+
+
+class WorkerLink(object):
+    """
+    Worker side of the channel to the supervisor.
+    :param fd: file descriptor of the channel socket, inherited from the supervisor
+    :param replicate: exchange databus changes with the supervisor, not needed
+    if the databus backend is shared already
+    """
+
+    def __init__(self, fd, databus, heartbeat_interval=2, replicate=True):
+        self.channel = Channel(socket.socket(fileno=fd))
+        self.databus = databus
+        self.heartbeat_interval = heartbeat_interval
+        self.replicate = replicate
+        self.running = False
+        self._applying = False
+        self._heartbeat_greenlet = None
+        if replicate:
+            databus.add_change_hook(self._on_change)
+
+    def _on_change(self, key, value):
+        if not self.running or self._applying or self.databus.is_dynamic(key):
+            return
+        self.channel.send("databus", key, value)
+
+    def _apply(self, values):
+        self._applying = True
+        try:
+            for key, value in values.items():
+                self.databus.set_value(key, value)
+        finally:
+            self._applying = False
+
+    def forward_event(self, event):
+        self.channel.send("event", event)
+
+    def _heartbeat(self):
+        try:
+            while True:
+                self.channel.send("heartbeat")
+                gevent.sleep(self.heartbeat_interval)
+        except OSError:
+            pass
+
+    def start(self):
+        self.running = True
+        self._heartbeat_greenlet = gevent.spawn(self._heartbeat)
+        try:
+            for message in self.channel:
+                if message[0] == "databus" and self.replicate:
+                    self._apply(message[1])
+        except OSError:
+            pass
+        if self.running:
+            logger.warning("Lost connection to the supervisor, shutting down.")
+            # stop like on Ctrl-C, bin/conpot then shuts down the servers
+            os.kill(os.getpid(), signal.SIGINT)
+
+    def stop(self):
+        self.running = False
+        self._heartbeat_greenlet.kill()
+        self.channel.close()
+
+
+class WorkerProcess(object):
+    def __init__(self, slot, process, channel):
+        self.slot = slot
+        self.process = process
+        self.channel = channel
+        self.started = time.monotonic()
+        # None until the worker is up, starting the protocols may take a while
+        self.last_heartbeat = None
+        self.reader = None
+
+
+class Supervisor(object):
+    """
+    Starts and watches worker processes.
+    :param command: argv of a worker, "--worker-id" and "--worker-fd" get appended
+    :param event_queue: queue of the log pipeline, receives the events of all workers
+    :param heartbeat_timeout: seconds without heartbeat after which a worker is restarted
+    :param startup_grace: seconds on top of heartbeat_timeout a new worker gets for its
+    first heartbeat, starting the protocols may take a while
+    """
+
+    def __init__(
+        self,
+        workers,
+        command,
+        databus,
+        event_queue,
+        heartbeat_timeout=15,
+        backoff=1,
+        startup_grace=60,
+    ):
+        self.workers = workers
+        self.command = command
+        self.databus = databus
+        self.event_queue = event_queue
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_grace = startup_grace
+        self.backoff = backoff
+        self.processes = {}
+        self.restarts = 0
+        self.running = False
+        self._restart_delay = {}
+
+    def _spawn(self, slot):
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            process = subprocess.Popen(
+                self.command
+                + ["--worker-id", str(slot), "--worker-fd", str(child_sock.fileno())],
+                pass_fds=[child_sock.fileno()],
+                # Ctrl-C only reaches the supervisor, which then stops the workers
+                start_new_session=True,
+            )
+        finally:
+            child_sock.close()
+        worker = WorkerProcess(slot, process, Channel(parent_sock))
+        # bring the worker up to date, it started from the template values
+        worker.channel.send("databus", self.databus.static_values())
+        worker.reader = gevent.spawn(self._receive, worker)
+        self.processes[slot] = worker
+        logger.info("Started worker %s (pid %s).", slot, process.pid)
+
+    def _receive(self, worker):
+        try:
+            for message in worker.channel:
+                kind = message[0]
+                if kind == "event":
+                    self.event_queue.put(message[1])
+                elif kind == "heartbeat":
+                    worker.last_heartbeat = time.monotonic()
+                elif kind == "databus":
+                    self._replicate(worker, message[1], message[2])
+        except OSError:
+            pass
+
+    def _replicate(self, source, key, value):
+        self.databus.set_value(key, value)
+        for worker in list(self.processes.values()):
+            if worker is not source:
+                try:
+                    worker.channel.send("databus", {key: value})
+                except OSError:
+                    pass
+
+    def _reap(self, worker, reason):
+        logger.warning(
+            "Worker %s (pid %s) %s, restarting.",
+            worker.slot,
+            worker.process.pid,
+            reason,
+        )
+        if worker.process.poll() is None:
+            worker.process.kill()
+            worker.process.wait()
+        worker.reader.kill()
+        worker.channel.close()
+        del self.processes[worker.slot]
+        self.restarts += 1
+        # back off when a worker dies right after its start
+        delay = self._restart_delay.get(worker.slot, 0)
+        if time.monotonic() - worker.started < 10:
+            delay = min(max(delay * 2, self.backoff), 60)
+        else:
+            delay = 0
+        self._restart_delay[worker.slot] = delay
+        gevent.spawn_later(delay, self._respawn, worker.slot)
+
+    def _respawn(self, slot):
+        if self.running and slot not in self.processes:
+            self._spawn(slot)
+
+    def check(self):
+        """Restart workers that exited or stopped sending heartbeats."""
+        now = time.monotonic()
+        for worker in list(self.processes.values()):
+            code = worker.process.poll()
+            if code is not None:
+                self._reap(worker, "exited with {}".format(code))
+            elif worker.last_heartbeat is None:
+                if now - worker.started > self.heartbeat_timeout + self.startup_grace:
+                    self._reap(worker, "sent no heartbeat since its start")
+            elif now - worker.last_heartbeat > self.heartbeat_timeout:
+                self._reap(worker, "missed its heartbeats")
+
+    def start(self):
+        self.running = True
+        for slot in range(self.workers):
+            self._spawn(slot)
+        while True:
+            gevent.sleep(1)
+            if not self.running:
+                break
+            self.check()
+
+    def stop(self, timeout=10):
+        self.running = False
+        workers = list(self.processes.values())
+        for worker in workers:
+            if worker.process.poll() is None:
+                worker.process.send_signal(signal.SIGINT)
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            try:
+                worker.process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+                worker.process.wait()
+            worker.reader.join(1)
+            worker.channel.close()
+        self.processes.clear()
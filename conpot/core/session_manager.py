@@ -15,23 +15,65 @@
 # Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
+import heapq
+import logging
+from datetime import datetime, timedelta
+
 from gevent.queue import Queue
 
 from conpot.core.attack_session import AttackSession
 
+logger = logging.getLogger(__name__)
+
 
 # one instance only
 class SessionManager:
     def __init__(self):
-        self._sessions = []
+        # (protocol, source_ip) -> session
+        self._sessions = {}
+        self._sessions_by_id = {}
+        # min-heap of (last_activity, session id). Entries go stale when a session sees new
+        # events or is deleted; they are fixed up lazily when they reach the top.
+        self._expiry_heap = []
         self.log_queue = Queue()
+        self.max_events = 100
+        self.event_store = "ring"
+        self.memory_budget = 0
+        self.log_mode = "event"
+        self.live_events = ()
+        # approximate memory of the events stored in all sessions
+        self.memory = 0
+        self.evicted = 0
+        # events per protocol, except those of connections coming and going
+        self.requests = {}
+
+    def configure(
+        self,
+        max_events=100,
+        event_store="ring",
+        memory_budget=0,
+        log_mode="event",
+        live_events=(),
+    ):
+        """
+        :param max_events: events kept per session, the others are only counted
+        :param event_store: ring or head_tail, see EventStore
+        :param memory_budget: bytes of events kept in all sessions, 0 for no limit.
+        The oldest sessions are evicted when it is exceeded.
+        :param log_mode: event, session or hybrid, see AttackSession
+        :param live_events: event types logged right away in hybrid mode
+        """
+        self.max_events = max_events
+        self.event_store = event_store
+        self.memory_budget = memory_budget
+        self.log_mode = log_mode
+        self.live_events = live_events
+
+    def __len__(self):
+        return len(self._sessions_by_id)
 
     def _find_sessions(self, protocol, source_ip):
-        for session in self._sessions:
-            if session.protocol == protocol:
-                if session.source_ip == source_ip:
-                    return session
-        return None
+        return self._sessions.get((protocol, source_ip))
 
     def get_session(
         self,
@@ -51,15 +93,98 @@ class SessionManager:
                 destination_ip,
                 destination_port,
                 self.log_queue,
+                self.max_events,
+                self.event_store,
+                self._account,
+                self.log_mode,
+                self.live_events,
+                self._count_request,
+            )
+            self._sessions[(protocol, source_ip)] = attack_session
+            self._sessions_by_id[attack_session.id] = attack_session
+            heapq.heappush(
+                self._expiry_heap, (attack_session.last_activity, attack_session.id)
             )
-            self._sessions.append(attack_session)
         return attack_session
 
+    def _account(self, session, delta):
+        self.memory += delta
+        if self.memory_budget and self.memory > self.memory_budget:
+            self._evict(session)
+
+    def _count_request(self, session, event_type):
+        event_type = str(event_type)
+        if event_type == "NEW_CONNECTION" or event_type.startswith("CONNECTION_"):
+            return
+        self.requests[session.protocol] = self.requests.get(session.protocol, 0) + 1
+
+    def _evict(self, keep):
+        heap = self._expiry_heap
+        kept = []
+        while self.memory > self.memory_budget and heap:
+            # the least recently active session first, entries are fixed up as
+            # in expire_sessions
+            last_activity, session_id = heapq.heappop(heap)
+            session = self._sessions_by_id.get(session_id)
+            if session is None:
+                continue
+            if session.last_activity > last_activity:
+                heapq.heappush(heap, (session.last_activity, session_id))
+                continue
+            if session is keep:
+                kept.append((last_activity, session_id))
+                continue
+            logger.info(
+                "Evicting %s session %s, session memory budget exceeded.",
+                session.protocol,
+                session.id,
+            )
+            self._remove(session)
+            session.set_ended()
+            session.events.clear()
+            self.evicted += 1
+        for entry in kept:
+            heapq.heappush(heap, entry)
+
+    def _remove(self, session):
+        # the events of a removed session no longer count, a handler holding on
+        # to it keeps adding to its own bounded store only
+        session.on_memory = None
+        self.memory -= session.memory
+        del self._sessions_by_id[session.id]
+        key = (session.protocol, session.source_ip)
+        if self._sessions.get(key) is session:
+            del self._sessions[key]
+
     def delete_session(self, id):
-        for i, session in enumerate(self._sessions):
-            if session.id == id:
-                del self._sessions[i]
-                break
+        session = self._sessions_by_id.get(id)
+        if session:
+            self._remove(session)
+            # log the summary of the events so far in session and hybrid mode
+            session.set_ended()
+
+    def expire_sessions(self, timeout):
+        """
+        End and remove all sessions without activity for at least timeout seconds.
+        :param timeout: idle time in seconds after which a session is considered finished
+        :return: list of the expired sessions
+        """
+        expired = []
+        deadline = datetime.utcnow() - timedelta(seconds=timeout)
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= deadline:
+            _, session_id = heapq.heappop(heap)
+            session = self._sessions_by_id.get(session_id)
+            if session is None:
+                # deleted in the meantime
+                continue
+            if session.last_activity > deadline:
+                heapq.heappush(heap, (session.last_activity, session_id))
+                continue
+            self._remove(session)
+            session.set_ended()
+            expired.append(session)
+        return expired
 
     def purge_sessions(self):
         # there is no native purge/clear mechanism for gevent queues, so...
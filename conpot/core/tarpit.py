@@ -0,0 +1,216 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Tarpit holding connections, and delaying responses, without a greenlet each.
+Parked sockets are taken over from gevent, shrunk to small buffers and put on a
+timer wheel which a single greenlet turns every tick. When an entry is due its
+pending bytes are sent, drip_size at a time if dripping, and the socket is closed
+once its hold time is over.
+"""
+
+import _socket
+import logging
+import math
+import random
+import socket
+import time
+
+import gevent
+
+logger = logging.getLogger(__name__)
+
+
+def delay_of(value):
+    """Seconds of a tarpit setting, either a single number or a random range "x;y"."""
+    lbound, _, ubound = (value or "").partition(";")
+    if not lbound:
+        return 0
+    if not ubound:
+        return float(lbound)
+    return random.uniform(float(lbound), float(ubound))
+
+
+class _Parked(object):
+    __slots__ = ("sock", "data", "drip_size", "closes", "rounds")
+
+    def __init__(self, sock, data, drip_size, closes):
+        self.sock = sock
+        self.data = data
+        self.drip_size = drip_size
+        self.closes = closes
+        self.rounds = 0
+
+
+class _Call(object):
+    __slots__ = ("func", "args", "rounds")
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.rounds = 0
+
+
+class Tarpit(object):
+    """
+    :param tick: seconds per slot of the wheel, the resolution of all delays
+    :param slots: slots of the wheel, later entries go round more than once
+    :param hold: seconds a parked connection is held once its data is sent
+    :param drip_size: bytes sent per drip_interval, 0 to send the data at once
+    :param max_connections: parked connections, more are closed right away
+    :param buffer_size: SO_RCVBUF of parked sockets, and SO_SNDBUF if dripping
+    :param after_requests: requests a protocol serves on a connection before it
+    hands it to the tarpit, 0 for never
+    """
+
+    def __init__(
+        self,
+        tick=0.1,
+        slots=512,
+        hold=0,
+        drip_size=0,
+        drip_interval=1,
+        max_connections=50000,
+        buffer_size=1024,
+        after_requests=0,
+    ):
+        self.tick = tick
+        self.hold = hold
+        self.drip_size = drip_size
+        self.drip_interval = drip_interval
+        self.max_connections = max_connections
+        self.buffer_size = buffer_size
+        self.after_requests = after_requests
+        self._wheel = [[] for _ in range(slots)]
+        self._position = 0
+        self._worker = None
+        self.parked = 0
+        self.counters = {"parked": 0, "refused": 0, "sent": 0, "closed": 0}
+
+    def configure(self, **settings):
+        """Change the settings of the constructor, except tick and slots."""
+        for name, value in settings.items():
+            if name in ("tick", "slots") or not hasattr(self, name):
+                raise TypeError("Unknown tarpit setting: {}".format(name))
+            setattr(self, name, value)
+
+    def should_hand_off(self, requests):
+        """True once a connection has served requests and should go to the tarpit."""
+        return 0 < self.after_requests <= requests
+
+    def _schedule(self, entry, delay):
+        # the current tick is partly over, so an entry is never due too early
+        ticks = math.ceil(delay / self.tick) + 1
+        entry.rounds, offset = divmod(ticks, len(self._wheel))
+        self._wheel[(self._position + offset) % len(self._wheel)].append(entry)
+        if self._worker is None:
+            self._worker = gevent.spawn(self._run)
+
+    def call_later(self, delay, func, *args):
+        """Call func(*args) from the tarpit greenlet after delay seconds."""
+        self._schedule(_Call(func, args), delay)
+
+    def park(self, sock, data=b"", delay=0, hold=None, drip_size=None):
+        """
+        Take over sock from its handler, which must not use or close it anymore.
+        :param data: bytes to send after delay seconds
+        :param hold: seconds the connection is held open once data is sent
+        :param drip_size: overrides the drip_size of the tarpit
+        """
+        if self.parked >= self.max_connections:
+            self.counters["refused"] += 1
+            sock.close()
+            return
+        drip_size = self.drip_size if drip_size is None else drip_size
+        # a plain socket without the gevent machinery, it is never waited for
+        raw = _socket.socket(fileno=sock.detach())
+        raw.setblocking(False)
+        try:
+            raw.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_size)
+            if drip_size:
+                raw.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_size)
+        except OSError:
+            pass
+        hold = self.hold if hold is None else hold
+        entry = _Parked(
+            raw, memoryview(bytes(data)), drip_size, time.monotonic() + delay + hold
+        )
+        self.parked += 1
+        self.counters["parked"] += 1
+        self._schedule(entry, delay)
+
+    def _run(self):
+        while True:
+            gevent.sleep(self.tick)
+            self._position = (self._position + 1) % len(self._wheel)
+            slot = self._wheel[self._position]
+            if not slot:
+                continue
+            self._wheel[self._position] = []
+            for entry in slot:
+                if entry.rounds:
+                    entry.rounds -= 1
+                    self._wheel[self._position].append(entry)
+                elif isinstance(entry, _Call):
+                    try:
+                        entry.func(*entry.args)
+                    except Exception as e:
+                        logger.exception("Tarpit call failed: %s", e)
+                else:
+                    self._due(entry)
+
+    def _due(self, entry):
+        if entry.data:
+            size = entry.drip_size or len(entry.data)
+            try:
+                sent = entry.sock.send(entry.data[:size])
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._close(entry)
+                return
+            self.counters["sent"] += sent
+            entry.data = entry.data[sent:]
+            if entry.data:
+                self._schedule(entry, self.drip_interval if entry.drip_size else 0)
+                return
+        remaining = entry.closes - time.monotonic()
+        if remaining > 0:
+            self._schedule(entry, remaining)
+        else:
+            self._close(entry)
+
+    def _close(self, entry):
+        entry.sock.close()
+        self.parked -= 1
+        self.counters["closed"] += 1
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["in_tarpit"] = self.parked
+        return stats
+
+    def close(self):
+        """Close all parked connections."""
+        if self._worker is not None:
+            self._worker.kill()
+            self._worker = None
+        for slot in self._wheel:
+            for entry in slot:
+                if isinstance(entry, _Parked):
+                    self._close(entry)
+            del slot[:]
@@ -0,0 +1,208 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Simulated analog sensors for the databus. No greenlet ticks in the background:
+every signal is computed from the time when it is read, so a template can hold
+hundreds of points at no cost until a client polls them. Stateful signals (random
+walk, drift) advance by the time elapsed since their last read in a single step.
+
+Use them as function values in a template, parameters are positional::
+
+    <key name="register_40001">
+        <value type="function" param="[20, 600, 230, 0, 0.5, 1]">conpot.emulators.sensors.signals.Sine</value>
+    </key>
+"""
+
+import math
+import random
+import time
+from collections import deque
+
+import conpot.core as conpot_core
+
+# wall clock, so all processes of a prefork setup agree on periodic signals
+clock = time.time
+
+
+class Signal(object):
+    """
+    Base class of the signals.
+    :param noise: standard deviation of gaussian noise added to every read
+    :param precision: number of decimals, 0 returns int, None leaves the float alone
+    """
+
+    def __init__(self, noise=0, precision=None):
+        self.noise = noise
+        self.precision = precision
+        self._random = random.Random()
+
+    def sample(self, now):
+        raise NotImplementedError
+
+    def get_value(self):
+        value = self.sample(clock())
+        if self.noise:
+            value += self._random.gauss(0, self.noise)
+        if self.precision is None:
+            return value
+        if self.precision == 0:
+            return int(round(value))
+        return round(value, self.precision)
+
+
+class Constant(Signal):
+    def __init__(self, value=0, noise=0, precision=None):
+        super(Constant, self).__init__(noise, precision)
+        self.value = value
+
+    def sample(self, now):
+        return self.value
+
+
+class Sine(Signal):
+    """offset + amplitude * sin(2 pi (t / period + phase))"""
+
+    def __init__(
+        self, amplitude=1, period=60, offset=0, phase=0, noise=0, precision=None
+    ):
+        super(Sine, self).__init__(noise, precision)
+        self.amplitude = amplitude
+        self.period = period
+        self.offset = offset
+        self.phase = phase
+
+    def sample(self, now):
+        angle = 2 * math.pi * (now / self.period + self.phase)
+        return self.offset + self.amplitude * math.sin(angle)
+
+
+class Ramp(Signal):
+    """
+    Rises by slope per second from start. With high set it wraps around to low,
+    e.g. a counter register or a sawtooth.
+    """
+
+    def __init__(self, slope=1, start=0, low=0, high=None, noise=0, precision=None):
+        super(Ramp, self).__init__(noise, precision)
+        self.slope = slope
+        self.start = start
+        self.low = low
+        self.high = high
+        self.started = clock()
+
+    def sample(self, now):
+        value = self.start + self.slope * (now - self.started)
+        if self.high is None:
+            return value
+        return self.low + (value - self.low) % (self.high - self.low)
+
+
+class Noise(Signal):
+    """Independent gaussian samples around mean."""
+
+    def __init__(self, mean=0, stddev=1, precision=None):
+        super(Noise, self).__init__(stddev, precision)
+        self.mean = mean
+
+    def sample(self, now):
+        return self.mean
+
+
+class RandomWalk(Signal):
+    """
+    Brownian motion with stddev per square root of a second, kept within
+    [low, high] by reflection. With reversion > 0 it drifts back to start, an
+    Ornstein-Uhlenbeck process, as most physical values do. Both are sampled
+    exactly for the time since the last read, however long it was.
+    """
+
+    def __init__(
+        self,
+        start=0,
+        stddev=1,
+        low=None,
+        high=None,
+        reversion=0,
+        noise=0,
+        precision=None,
+    ):
+        super(RandomWalk, self).__init__(noise, precision)
+        self.mean = start
+        self.stddev = stddev
+        self.low = low
+        self.high = high
+        self.reversion = reversion
+        self.value = start
+        self.updated = clock()
+
+    def sample(self, now):
+        elapsed = now - self.updated
+        if elapsed <= 0:
+            return self.value
+        self.updated = now
+        if self.reversion > 0:
+            decay = math.exp(-self.reversion * elapsed)
+            stddev = self.stddev * math.sqrt((1 - decay**2) / (2 * self.reversion))
+            value = self.mean + (self.value - self.mean) * decay
+        else:
+            stddev = self.stddev * math.sqrt(elapsed)
+            value = self.value
+        value += self._random.gauss(0, stddev)
+        self.value = self._reflect(value)
+        return self.value
+
+    def _reflect(self, value):
+        if self.low is None or self.high is None:
+            if self.low is not None and value < self.low:
+                return 2 * self.low - value
+            if self.high is not None and value > self.high:
+                return 2 * self.high - value
+            return value
+        span = self.high - self.low
+        if span <= 0:
+            return self.low
+        value = (value - self.low) % (2 * span)
+        return self.low + (value if value <= span else 2 * span - value)
+
+
+class Correlated(Signal):
+    """
+    Follows another databus key: offset + gain * value of key, e.g. a current
+    that follows the power, or a temperature that lags a heater by delay seconds.
+    """
+
+    def __init__(self, key, gain=1, offset=0, delay=0, noise=0, precision=None):
+        super(Correlated, self).__init__(noise, precision)
+        self.key = key
+        self.gain = gain
+        self.offset = offset
+        self.delay = delay
+        self._history = deque()
+
+    def _source(self, now):
+        value = conpot_core.get_databus().get_value(self.key)
+        if not self.delay:
+            return value
+        # (time, value) pairs of the last delay seconds
+        self._history.append((now, value))
+        while len(self._history) > 1 and self._history[1][0] <= now - self.delay:
+            self._history.popleft()
+        return self._history[0][1]
+
+    def sample(self, now):
+        return self.offset + self.gain * self._source(now)
@@ -17,6 +17,7 @@
 
 from lxml import etree
 from conpot.protocols.IEC104.frames import *
+from conpot.protocols.IEC104.codec import CODECS, IFrame
 import conpot.core as conpot_core
 from conpot.protocols.IEC104.register import IEC104Register
 
@@ -101,52 +102,29 @@ class DeviceDataController(object):
 # Builds response for a certain asdu type and returns list of responses with this type
 def inro_response(sorted_reg, asdu_type):
     resp_list = []
-    resp = i_frame() / asdu_head(SQ=0, COT=20)
     max_frame_size = conpot_core.get_databus().get_value("MaxFrameSize")
-    counter = 0
-    asdu_infobj_type = "asdu_infobj_" + str(asdu_type)
-    calls_dict = {
-        "asdu_infobj_1": asdu_infobj_1,
-        "asdu_infobj_3": asdu_infobj_3,
-        "asdu_infobj_5": asdu_infobj_5,
-        "asdu_infobj_7": asdu_infobj_7,
-        "asdu_infobj_9": asdu_infobj_9,
-        "asdu_infobj_11": asdu_infobj_11,
-        "asdu_infobj_13": asdu_infobj_13,
-    }
-    call = calls_dict[asdu_infobj_type]
+    # 12 is length i_frame = 6 + length asdu_head = 6
+    per_frame = int((max_frame_size - 12) / CODECS[asdu_type].size)
+    # field holding the value of the register, by type
+    value_field = {
+        1: "SPI",
+        3: "DPI",
+        5: "Value",
+        7: "BSI",
+        9: "NVA",
+        11: "SVA",
+        13: "FPNumber",
+    }[asdu_type]
+    objects = []
     for dev in sorted_reg:
         if dev[1].category_id == asdu_type:
-            # 12 is length i_frame = 6 + length asdu_head = 6
-            if counter >= int((max_frame_size - 12) / len(call())):
-                resp_list.append(resp)
-                counter = 0
-                resp = i_frame() / asdu_head(SQ=0, COT=20)
-            xaddr = addr_in_hex(dev[1].addr)
-
-            add_info_obj = call(IOA=xaddr)  # SQ = 0
-            val = dev[1].val
-            if asdu_type == 1:
-                add_info_obj.SIQ = SIQ(SPI=val)
-                # Other possibility for allocation (certain value for whole field)
-                # add_info_obj.SIQ = struct.pack("B", val)
-            elif asdu_type == 3:
-                add_info_obj.DIQ = DIQ(DPI=val)
-            elif asdu_type == 5:
-                add_info_obj.VTI = VTI(Value=val)
-            elif asdu_type == 7:
-                add_info_obj.BSI = val
-            elif asdu_type == 9:
-                add_info_obj.NVA = val
-            elif asdu_type == 11:
-                add_info_obj.SVA = val
-            elif asdu_type == 13:
-                add_info_obj.FPNumber = val
-            resp /= add_info_obj
-            counter += 1
-            resp.NoO = counter
-    if counter > 0:
-        resp_list.append(resp)
+            if len(objects) >= per_frame:
+                resp_list.append(IFrame(asdu_type, objects, cot=20))
+                objects = []
+            # SQ = 0
+            objects.append({"IOA": addr_in_hex(dev[1].addr), value_field: dev[1].val})
+    if objects:
+        resp_list.append(IFrame(asdu_type, objects, cot=20))
     return resp_list
 
 
@@ -20,6 +20,7 @@ from conpot.protocols.IEC104.DeviceDataController import addr_in_hex, inro_respo
 from conpot.protocols.IEC104.i_frames_check import *
 import conpot.core as conpot_core
 from .frames import *
+from .codec import IFrame, decode_apci, encode_s_frame, encode_u_frame, hex_string
 
 logger = logging.getLogger(__name__)
 
@@ -45,10 +46,9 @@ class IEC104(object):
 
     # === u_frame
     def handle_u_frame(self, frame):
-        container = u_frame(frame)
         try:
             # check if valid u_frame (length, rest bits)
-            if len(frame) == 6 and container.getfieldval("LenAPDU") == 4:
+            if len(frame) == 6 and frame[1] == 4:
                 if frame[3] == 0x00 and frame[4] == 0x00 and frame[5] == 0x00:
                     # check which type (Start, Stop, Test), only one active at same time
                     # STARTDT_act
@@ -145,12 +145,11 @@ class IEC104(object):
 
     # === s_frame
     def handle_s_frame(self, frame):
-        container = s_frame(frame)
         try:
             # check if valid u_frame (length, rest bits)
-            if len(frame) == 6 and container.getfieldval("LenAPDU") == 4:
+            if len(frame) == 6 and frame[1] == 4:
                 if frame[2] & 0x01 and frame[3] == 0x00:
-                    recv_snr = container.getfieldval("RecvSeq")
+                    recv_snr = decode_apci(frame)["RecvSeq"]
                     logger.info(
                         "%s ---> s_frame receive nr: %s. (%s)",
                         self.address,
@@ -190,10 +189,13 @@ class IEC104(object):
     def handle_i_frame(self, frame):
         container = i_frame(frame)
 
-        request_string = " ".join(hex(n) for n in frame)
-        logger.debug(
-            "%s ---> i_frame %s. (%s)", self.address, request_string, self.session_id
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s ---> i_frame %s. (%s)",
+                self.address,
+                hex_string(frame),
+                self.session_id,
+            )
         logger.info(
             "%s ---> i_frame %s  (%s)", self.address, container.payload, self.session_id
         )
@@ -284,17 +286,20 @@ class IEC104(object):
             if self.t2_caller:
                 gevent.kill(self.t2_caller)
             self.telegram_count = 0
-            response_string = " ".join(hex(n) for n in frame.build())
+            packet = encode_s_frame(self.rsn)
             logger.info(
                 "%s <--- s_frame %s  (%s)",
                 self.address,
-                response_string,
+                hex_string(packet),
                 self.session_id,
             )
-            return frame.build()
+            return packet
 
         # send i_frame
         elif frame.name == "i_frame":
+            if not isinstance(frame, IFrame):
+                # encoded by the codec, scapy only for what it does not cover
+                frame = IFrame.from_packet(frame) or frame
             if self.allow_DT:
                 if self.t2_caller:
                     gevent.kill(self.t2_caller)
@@ -306,20 +311,21 @@ class IEC104(object):
                 iframe = frame_object_with_timer(frame)
                 self.sentmsgs.append(iframe)
                 iframe.restart_t1()
-                response_string = " ".join(hex(n) for n in frame.build())
-                logger.debug(
-                    "%s <--- i_frame %s  (%s)",
-                    self.address,
-                    response_string,
-                    self.session_id,
-                )
+                packet = frame.build()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "%s <--- i_frame %s  (%s)",
+                        self.address,
+                        hex_string(packet),
+                        self.session_id,
+                    )
                 logger.info(
                     "%s <--- i_frame %s  (%s)",
                     self.address,
                     frame.payload,
                     self.session_id,
                 )
-                return frame.build()
+                return packet
 
             else:
                 logger.info("StartDT missing, buffer data. (%s)", self.session_id)
@@ -333,14 +339,14 @@ class IEC104(object):
                 uframe = frame_object_with_timer(frame)
                 self.sentmsgs.append(uframe)
                 uframe.restart_t1()
-            response_string = " ".join(hex(n) for n in frame.build())
+            packet = encode_u_frame(frame.getfieldval("Type"))
             logger.info(
                 "%s <--- u_frame %s  (%s)",
                 self.address,
-                response_string,
+                hex_string(packet),
                 self.session_id,
             )
-            return frame.build()
+            return packet
 
     def send_frame_imm(self, frame):
         # send s_frame
@@ -349,14 +355,14 @@ class IEC104(object):
             if self.t2_caller:
                 gevent.kill(self.t2_caller)
             self.telegram_count = 0
-            response_string = " ".join(hex(n) for n in frame.build())
+            packet = encode_s_frame(self.rsn)
             logger.info(
                 "%s <--- s_frame %s  (%s)",
                 self.address,
-                response_string,
+                hex_string(packet),
                 self.session_id,
             )
-            return self.sock.send(frame.build())
+            return self.sock.send(packet)
 
     def handle_single_command45(self, container):
         try:
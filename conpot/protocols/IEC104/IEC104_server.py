@@ -16,13 +16,14 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 from conpot.protocols.IEC104.DeviceDataController import DeviceDataController
 from conpot.protocols.IEC104.IEC104 import IEC104
-from .frames import struct, TESTFR_act, socket, errno
+from .frames import TESTFR_act, socket, errno
 import logging
 import conpot.core as conpot_core
 from gevent.server import StreamServer
 import gevent
 from .errors import Timeout_t3
 from conpot.core.protocol_wrapper import conpot_protocol
+from conpot.utils.framing import FrameReader, APCI
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,7 @@ class IEC104Server(object):
         )
         session.add_event({"type": "NEW_CONNECTION"})
         iec104_handler = IEC104(self.device_data_controller, sock, address, session.id)
+        reader = FrameReader(sock, APCI)
         try:
             while True:
                 timeout_t3 = gevent.Timeout(
@@ -62,22 +64,12 @@ class IEC104Server(object):
                 timeout_t3.start()
                 try:
                     try:
-                        request = sock.recv(6)
+                        request = reader.read_frame()
                         if not request:
                             logger.info("IEC104 Station disconnected. (%s)", session.id)
                             session.add_event({"type": "CONNECTION_LOST"})
                             iec104_handler.disconnect()
                             break
-                        while request and len(request) < 2:
-                            new_byte = sock.recv(1)
-                            request += new_byte
-
-                        _, length = struct.unpack(">BB", request[:2])
-                        while len(request) < (length + 2):
-                            new_byte = sock.recv(1)
-                            if not new_byte:
-                                break
-                            request += new_byte
 
                         # check if IEC 104 packet or for the first occurrence of the indication 0x68 for IEC 104
                         for elem in list(request):
@@ -143,7 +135,11 @@ class IEC104Server(object):
 
     def start(self, host, port):
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("IEC104", self.handle),
+            spawn=conpot_core.create_pool("IEC104"),
+        )
         logger.info("IEC 60870-5-104 protocol server started on: %s", connection)
         self.server.serve_forever()
 
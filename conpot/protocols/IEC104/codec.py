@@ -0,0 +1,408 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+struct based encoder/decoder for IEC 60870-5-104 APDUs. Produces the same bytes
+as the scapy packets in frames.py, field names follow frames.py as well, but
+information objects are flat dicts (e.g. "SPI" instead of SIQ.SPI).
+"""
+
+import struct
+
+# Start byte, length, control field. I-frames carry the raw sequence numbers,
+# like frames.i_frame does.
+I_FRAME = struct.Struct("<BBHH")
+U_FRAME = struct.Struct("<BBB3x")
+S_FRAME = struct.Struct("<BBBBH")
+# TypeID, SQ | NoO, T | PN | COT, OrigAddr, COA
+ASDU_HEAD = struct.Struct("<BBBBH")
+
+START = 0x68
+
+STARTDT_ACT = 0x07
+STARTDT_CON = 0x0B
+STOPDT_ACT = 0x13
+STOPDT_CON = 0x23
+TESTFR_ACT = 0x43
+TESTFR_CON = 0x83
+
+
+# Elements of information objects: (kind, name or bit fields, default)
+# kinds: "ioa" 24 bit little endian address, "be16" big endian word (CP*Time
+# milliseconds), "bits" one byte of MSB first bit fields, others are struct codes
+def _bits(*fields):
+    return [("bits", fields, None)]
+
+
+IOA = [("ioa", "IOA", 0x010000)]
+IOA_0 = [("ioa", "IOA", 0)]
+SIQ = _bits(("IV", 1), ("NT", 1), ("SB", 1), ("BL", 1), ("Padding", 3), ("SPI", 1))
+DIQ = _bits(("IV", 1), ("NT", 1), ("SB", 1), ("BL", 1), ("Padding", 2), ("DPI", 2))
+QDS = _bits(("IV", 1), ("NT", 1), ("SB", 1), ("BL", 1), ("Padding", 3), ("OV", 1))
+VTI = _bits(("T", 1), ("Value", 7))
+QOS = _bits(("seq", 1), ("QL", 7))
+BCR = [("i", "Value", 0)] + _bits(("IV", 1), ("CA", 1), ("CY", 1), ("SeqNr", 5))
+SCO = _bits(("QOC", 6), ("Padding", 1), ("SCS", 1))
+DCO = _bits(("QOC", 6), ("DCS", 2))
+RCO = _bits(("QOC", 6), ("RCS", 2))
+NVA = [("h", "NVA", 0x5000)]
+SVA = [("h", "SVA", 0x50)]
+BSI = [("I", "BSI", 0)]
+SCD = [("H", "Status", 0), ("H", "StatChaDet", 0)]
+CP24TIME = [("be16", "Ms", 0), ("B", "Min", 0)]
+CP56TIME = [
+    ("be16", "Ms", 0),
+    ("B", "Min", 0),
+    ("B", "Hour", 0),
+    ("B", "Day", 1),
+    ("B", "Month", 1),
+    ("B", "Year", 0x5B),
+]
+
+
+def _float(default):
+    return [("f", "FPNumber", default)]
+
+
+# information object layout by TypeID, see asdu_infobj_* in frames.py
+INFO_OBJECTS = {
+    1: IOA + SIQ,
+    2: IOA + SIQ + CP24TIME,
+    3: IOA + DIQ,
+    4: IOA + DIQ + CP24TIME,
+    5: IOA + VTI + QDS,
+    6: IOA + VTI + QDS + CP24TIME,
+    7: IOA + BSI + QDS,
+    8: IOA + BSI + QDS + CP24TIME,
+    9: IOA + NVA + QDS,
+    10: IOA + NVA + QDS + CP24TIME,
+    11: IOA + SVA + QDS,
+    12: IOA + SVA + QDS + CP24TIME,
+    13: IOA + _float(1) + QDS,
+    14: IOA + _float(0) + QDS + CP24TIME,
+    15: IOA + BCR,
+    16: IOA + BCR + CP24TIME,
+    20: IOA + SCD + QDS,
+    21: IOA + NVA,
+    30: IOA + SIQ + CP56TIME,
+    31: IOA + DIQ + CP56TIME,
+    32: IOA + VTI + QDS + CP56TIME,
+    33: IOA + BSI + QDS + CP56TIME,
+    34: IOA + NVA + QDS + CP56TIME,
+    35: IOA + SVA + QDS + CP56TIME,
+    36: IOA + _float(0) + QDS + CP56TIME,
+    37: IOA + BCR + CP56TIME,
+    45: IOA + SCO,
+    46: IOA + DCO,
+    47: IOA + RCO,
+    48: IOA + NVA + QOS,
+    49: IOA + SVA + QOS,
+    50: IOA + _float(0) + QOS,
+    51: IOA + BSI,
+    58: IOA + SCO + CP56TIME,
+    59: IOA + DCO + CP56TIME,
+    60: IOA + RCO + CP56TIME,
+    61: IOA + NVA + QOS + CP56TIME,
+    62: IOA + SVA + QOS + CP56TIME,
+    63: IOA + _float(0) + QOS + CP56TIME,
+    64: IOA + BSI + QOS + CP56TIME,
+    100: IOA_0 + [("B", "QOI", 0x14)],
+    101: IOA_0 + [("B", "QCC", 0x05)],
+    102: IOA_0,
+    103: IOA_0 + CP56TIME,
+}
+
+
+class InfoObjectCodec(object):
+    """Precompiled struct for one information object layout."""
+
+    def __init__(self, elements):
+        codes = []
+        # (kind, name) per struct slot, None for the high byte of an IOA
+        self.slots = []
+        self.defaults = {}
+        for kind, name, default in elements:
+            if kind == "ioa":
+                codes.append("HB")
+                self.slots.append(("ioa", name))
+                self.slots.append(None)
+                self.defaults[name] = default
+            elif kind == "bits":
+                codes.append("B")
+                self.slots.append(("bits", name))
+                for field, _ in name:
+                    self.defaults[field] = 0
+            else:
+                codes.append("H" if kind == "be16" else kind)
+                self.slots.append((kind, name))
+                self.defaults[name] = default
+        self.struct = struct.Struct("<" + "".join(codes))
+        self.size = self.struct.size
+
+    def values(self, obj):
+        values = []
+        for slot in self.slots:
+            if slot is None:
+                continue
+            kind, name = slot
+            if kind == "ioa":
+                ioa = obj.get(name, self.defaults[name])
+                values.append(ioa & 0xFFFF)
+                values.append(ioa >> 16)
+            elif kind == "bits":
+                byte = 0
+                for field, width in name:
+                    byte = (byte << width) | (obj.get(field, 0) & ((1 << width) - 1))
+                values.append(byte)
+            elif kind == "be16":
+                word = obj.get(name, self.defaults[name])
+                values.append(((word & 0xFF) << 8) | (word >> 8))
+            else:
+                values.append(obj.get(name, self.defaults[name]))
+        return values
+
+    def encode(self, obj):
+        return self.struct.pack(*self.values(obj))
+
+    def decode(self, data, offset=0):
+        raw = self.struct.unpack_from(data, offset)
+        obj = {}
+        for i, slot in enumerate(self.slots):
+            if slot is None:
+                continue
+            kind, name = slot
+            value = raw[i]
+            if kind == "ioa":
+                obj[name] = value | (raw[i + 1] << 16)
+            elif kind == "bits":
+                shift = 8
+                for field, width in name:
+                    shift -= width
+                    obj[field] = (value >> shift) & ((1 << width) - 1)
+            elif kind == "be16":
+                obj[name] = ((value & 0xFF) << 8) | (value >> 8)
+            else:
+                obj[name] = value
+        return obj
+
+
+CODECS = {type_id: InfoObjectCodec(layout) for type_id, layout in INFO_OBJECTS.items()}
+# SQ = 1: only the first object carries an address
+SEQUENCE_CODECS = {
+    type_id: InfoObjectCodec(layout[1:])
+    for type_id, layout in INFO_OBJECTS.items()
+    if layout[0][0] == "ioa" and len(layout) > 1
+}
+
+
+def encode_u_frame(frame_type):
+    return U_FRAME.pack(START, 4, frame_type)
+
+
+def encode_s_frame(recv_seq):
+    return S_FRAME.pack(START, 4, 0x01, 0x00, recv_seq)
+
+
+def encode_asdu(type_id, objects, sq=0, noo=None, t=0, pn=0, cot=6, orig_addr=0, coa=0):
+    """
+    :param objects: list of dicts with the fields of the information objects
+    :param noo: number of objects, defaults to len(objects)
+    """
+    if noo is None:
+        noo = len(objects)
+    head = ASDU_HEAD.pack(
+        type_id,
+        (sq << 7) | (noo & 0x7F),
+        (t << 7) | (pn << 6) | (cot & 0x3F),
+        orig_addr,
+        coa,
+    )
+    if not objects:
+        return head
+    if sq:
+        first = CODECS[type_id]
+        rest = SEQUENCE_CODECS[type_id]
+        return head + first.encode(objects[0]) + b"".join(map(rest.encode, objects[1:]))
+    codec = CODECS[type_id]
+    return head + b"".join(map(codec.encode, objects))
+
+
+def encode_i_frame(asdu, send_seq=0, recv_seq=0):
+    return I_FRAME.pack(START, len(asdu) + 4, send_seq, recv_seq) + asdu
+
+
+class IFrame(object):
+    """
+    Outgoing I-frame, encoded by this module. Stands in for the scapy packets of
+    frames.py in IEC104.send_104frame, which fills in the sequence numbers and COA.
+    """
+
+    name = "i_frame"
+
+    def __init__(
+        self, type_id, objects, sq=0, noo=None, t=0, pn=0, cot=6, orig_addr=0, coa=0
+    ):
+        self.TypeID = type_id
+        self.objects = objects
+        self.SQ = sq
+        self.NoO = len(objects) if noo is None else noo
+        self.T = t
+        self.PN = pn
+        self.COT = cot
+        self.OrigAddr = orig_addr
+        self.COA = coa
+        self.SendSeq = 0
+        self.RecvSeq = 0
+
+    @classmethod
+    def from_packet(cls, packet):
+        """
+        Take over the fields of a scapy i_frame / asdu_head / asdu_infobj_* packet.
+        :return: IFrame, or None for packets this module can not encode
+        """
+        head = packet.payload
+        type_id = head.getfieldval("TypeID")
+        if type_id not in CODECS or head.getfieldval("SQ"):
+            return None
+        objects = []
+        layer = head.payload
+        while type(layer).__name__.startswith("asdu_infobj"):
+            objects.append(_flatten(layer, {}))
+            layer = layer.payload
+        frame = cls(
+            type_id,
+            objects,
+            noo=head.getfieldval("NoO"),
+            t=head.getfieldval("T"),
+            pn=head.getfieldval("PN"),
+            cot=head.getfieldval("COT"),
+            orig_addr=head.getfieldval("OrigAddr"),
+            coa=head.getfieldval("COA"),
+        )
+        frame.SendSeq = packet.getfieldval("SendSeq")
+        frame.RecvSeq = packet.getfieldval("RecvSeq")
+        return frame
+
+    def getfieldval(self, name):
+        return getattr(self, name)
+
+    @property
+    def payload(self):
+        # for the log messages, like the scapy payload
+        return "asdu TypeID={} COT={} NoO={} COA={} {}".format(
+            self.TypeID, self.COT, self.NoO, self.COA, self.objects
+        )
+
+    def build(self):
+        asdu = encode_asdu(
+            self.TypeID,
+            self.objects,
+            self.SQ,
+            self.NoO,
+            self.T,
+            self.PN,
+            self.COT,
+            self.OrigAddr,
+            self.COA,
+        )
+        return encode_i_frame(asdu, self.SendSeq, self.RecvSeq)
+
+
+def _flatten(layer, obj):
+    for field in layer.fields_desc:
+        value = layer.getfieldval(field.name)
+        if hasattr(value, "fields_desc"):
+            _flatten(value, obj)
+        else:
+            obj[field.name] = value
+    return obj
+
+
+def decode_apci(frame):
+    """
+    Decode the control field of an APDU.
+    :return: dict with "format" "i", "s" or "u" and the fields of that format
+    """
+    start, length, control = frame[0], frame[1], frame[2]
+    if not control & 0x01:
+        _, _, send_seq, recv_seq = I_FRAME.unpack_from(frame)
+        return {
+            "format": "i",
+            "Start": start,
+            "LenAPDU": length,
+            "SendSeq": send_seq,
+            "RecvSeq": recv_seq,
+        }
+    if not control & 0x02:
+        _, _, frame_type, default, recv_seq = S_FRAME.unpack_from(frame)
+        return {
+            "format": "s",
+            "Start": start,
+            "LenAPDU": length,
+            "Type": frame_type,
+            "Default": default,
+            "RecvSeq": recv_seq,
+        }
+    return {
+        "format": "u",
+        "Start": start,
+        "LenAPDU": length,
+        "Type": control,
+        "Default": int.from_bytes(frame[3:6], "big"),
+    }
+
+
+def decode_asdu(data, offset=0):
+    """
+    Decode an ASDU.
+    :return: dict with the head fields and "objects", a list of dicts
+    """
+    type_id, sq_noo, cot, orig_addr, coa = ASDU_HEAD.unpack_from(data, offset)
+    asdu = {
+        "TypeID": type_id,
+        "SQ": sq_noo >> 7,
+        "NoO": sq_noo & 0x7F,
+        "T": cot >> 7,
+        "PN": (cot >> 6) & 0x01,
+        "COT": cot & 0x3F,
+        "OrigAddr": orig_addr,
+        "COA": coa,
+        "objects": [],
+    }
+    codec = CODECS.get(type_id)
+    if codec is None:
+        return asdu
+    offset += ASDU_HEAD.size
+    end = len(data)
+    while offset + codec.size <= end and len(asdu["objects"]) < asdu["NoO"]:
+        asdu["objects"].append(codec.decode(data, offset))
+        offset += codec.size
+        if asdu["SQ"] and type_id in SEQUENCE_CODECS:
+            codec = SEQUENCE_CODECS[type_id]
+    return asdu
+
+
+def decode_i_frame(frame):
+    """Decode an I-frame into its control fields and ASDU."""
+    apci = decode_apci(frame)
+    apci.update(decode_asdu(frame, I_FRAME.size))
+    return apci
+
+
+def hex_string(frame):
+    """Format a frame like the IEC104 log messages do."""
+    return " ".join(hex(n) for n in frame)
@@ -14,33 +14,29 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
-from .IEC104.IEC104_server import IEC104Server
-from .bacnet.bacnet_server import BacnetServer
-from .enip.enip_server import EnipServer
-from .ftp.ftp_server import FTPServer
-from .guardian_ast.guardian_ast_server import GuardianASTServer
-from .http.web_server import HTTPServer
-from .ipmi.ipmi_server import IpmiServer
-from .kamstrup_management.kamstrup_management_server import KamstrupManagementServer
-from .kamstrup_meter.kamstrup_server import KamstrupServer
-from .modbus.modbus_server import ModbusServer
-from .s7comm.s7_server import S7Server
-from .snmp.snmp_server import SNMPServer
-from .tftp.tftp_server import TftpServer
+import importlib
 
-# Defines protocol directory names inside template directories
+# Defines protocol directory names inside template directories and the server
+# class of each protocol. Classes are imported on demand by get_server_class(),
+# so only the dependencies of enabled protocols get loaded.
 name_mapping = {
-    "bacnet": BacnetServer,
-    "enip": EnipServer,
-    "ftp": FTPServer,
-    "guardian_ast": GuardianASTServer,
-    "http": HTTPServer,
-    "IEC104": IEC104Server,
-    "ipmi": IpmiServer,
-    "kamstrup_management": KamstrupManagementServer,
-    "kamstrup_meter": KamstrupServer,
-    "modbus": ModbusServer,
-    "s7comm": S7Server,
-    "snmp": SNMPServer,
-    "tftp": TftpServer,
+    "bacnet": "conpot.protocols.bacnet.bacnet_server.BacnetServer",
+    "enip": "conpot.protocols.enip.enip_server.EnipServer",
+    "ftp": "conpot.protocols.ftp.ftp_server.FTPServer",
+    "guardian_ast": "conpot.protocols.guardian_ast.guardian_ast_server.GuardianASTServer",
+    "http": "conpot.protocols.http.web_server.HTTPServer",
+    "IEC104": "conpot.protocols.IEC104.IEC104_server.IEC104Server",
+    "ipmi": "conpot.protocols.ipmi.ipmi_server.IpmiServer",
+    "kamstrup_management": "conpot.protocols.kamstrup_management.kamstrup_management_server.KamstrupManagementServer",
+    "kamstrup_meter": "conpot.protocols.kamstrup_meter.kamstrup_server.KamstrupServer",
+    "modbus": "conpot.protocols.modbus.modbus_server.ModbusServer",
+    "s7comm": "conpot.protocols.s7comm.s7_server.S7Server",
+    "snmp": "conpot.protocols.snmp.snmp_server.SNMPServer",
+    "tftp": "conpot.protocols.tftp.tftp_server.TftpServer",
 }
+
+
+def get_server_class(name):
+    """Import and return the server class of the protocol called name."""
+    module_name, class_name = name_mapping[name].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
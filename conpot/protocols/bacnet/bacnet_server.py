@@ -63,7 +63,7 @@ class BacnetServer(object):
             "bacnet",
             address[0],
             address[1],
-            get_interface_ip(address[0]),
+            get_interface_ip(address[0], self.host),
             self.server.server_port,
         )
         logger.info(
@@ -90,7 +90,11 @@ class BacnetServer(object):
 
     def start(self, host, port):
         connection = (host, port)
-        self.server = DatagramServer(connection, self.handle)
+        self.server = DatagramServer(
+            connection,
+            conpot_core.wrap_handler("bacnet", self.handle),
+            spawn=conpot_core.create_pool("bacnet"),
+        )
         # start to init the socket
         self.server.start()
         self.server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
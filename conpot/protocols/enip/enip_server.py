@@ -129,6 +129,10 @@ class EnipServer(object):
         """
         host, port = address if address else ("UDP", "UDP")
         name = "ENIP_%s" % port
+        # udp is served by one call for all sources
+        if address and not conpot_core.admit("enip", host):
+            conn.close()
+            return
         session = conpot_core.get_session(
             "enip", host, port, conn.getsockname()[0], conn.getsockname()[1]
         )
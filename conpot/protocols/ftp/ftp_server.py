@@ -307,7 +307,11 @@ class FTPServer(object):
     def start(self, host, port):
         self.handler.host, self.handler.port = host, port
         connection = (self.handler.host, self.handler.port)
-        self.server = StreamServer(connection, self.handler.stream_server_handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("ftp", self.handler.stream_server_handle),
+            spawn=conpot_core.create_pool("ftp"),
+        )
         logger.info("FTP server started on: {}".format(connection))
         self.server.serve_forever()
 
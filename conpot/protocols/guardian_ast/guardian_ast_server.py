@@ -511,7 +511,11 @@ class GuardianASTServer(object):
 
     def start(self, host, port):
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("guardian_ast", self.handle),
+            spawn=conpot_core.create_pool("guardian_ast"),
+        )
         logger.info("GuardianAST server started on: {0}".format(connection))
         self.server.serve_forever()
 
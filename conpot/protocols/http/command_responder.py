@@ -15,12 +15,12 @@
 # Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
+import io
 import logging
 import time
-import random
 import os
-import re
 
+from collections import namedtuple
 from datetime import datetime
 
 from html.parser import HTMLParser
@@ -30,13 +30,51 @@ import http.server
 import http.client
 from lxml import etree
 import conpot.core as conpot_core
+from conpot.core.tarpit import delay_of
+from conpot.protocols.http.content_cache import (
+    ContentCache,
+    content_length,
+    split_template,
+    render_segments,
+)
 from conpot.utils.networking import str_to_bytes
-import gevent
+from gevent import socket
+from gevent.server import StreamServer
 
 logger = logging.getLogger(__name__)
 
+# precompiled configuration of a htdocs node or status code, see SubHTTPServer.compile_route()
+HTTPRoute = namedtuple(
+    "HTTPRoute",
+    ["alias", "triggers", "proxy", "tarpit", "status", "headers", "trailers", "chunks"],
+)
+EMPTY_ROUTE = HTTPRoute(None, (), None, None, None, (), (), None)
+
 
 class HTTPServer(http.server.BaseHTTPRequestHandler):
+    def setup(self):
+        http.server.BaseHTTPRequestHandler.setup(self)
+        # responses are buffered, so the tarpit can take them over with the connection
+        self.socket_wfile = self.wfile
+        self.wfile = io.BytesIO()
+        self.requests = 0
+
+    def handle_one_request(self):
+        self.tarpit_delay = 0
+        http.server.BaseHTTPRequestHandler.handle_one_request(self)
+        response = self.wfile.getvalue()
+        if not response:
+            return
+        self.wfile.seek(0)
+        self.wfile.truncate()
+        self.requests += 1
+        tarpit = conpot_core.get_tarpit()
+        if self.tarpit_delay or tarpit.should_hand_off(self.requests):
+            tarpit.park(self.connection, response, delay=self.tarpit_delay)
+            self.close_connection = True
+        else:
+            self.socket_wfile.write(response)
+
     def log(self, version, request_type, addr, request, response=None):
         session = conpot_core.get_session(
             "http",
@@ -78,29 +116,12 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
 
         # FIXME: Proper logging
 
-    def get_entity_headers(self, rqfilename, headers, configuration):
-        xml_headers = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/headers/*'
-        )
-
-        if xml_headers:
-            # retrieve all headers assigned to this entity
-            for header in xml_headers:
-                headers.append((header.attrib["name"], header.text))
-
-        return headers
-
-    def get_trigger_appendix(self, rqfilename, rqparams, configuration):
-        xml_triggers = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/triggers/*'
-        )
-
-        if xml_triggers:
+    def get_trigger_appendix(self, route, rqparams):
+        if route.triggers:
             paramlist = rqparams.split("&")
 
             # retrieve all subselect triggers assigned to this entity
-            for triggers in xml_triggers:
-                triggerlist = triggers.text.split(";")
+            for triggerlist, appendix in route.triggers:
                 trigger_missed = False
 
                 for trigger in triggerlist:
@@ -108,48 +129,10 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
                         trigger_missed = True
 
                 if not trigger_missed:
-                    return triggers.attrib["appendix"]
+                    return appendix
 
         return None
 
-    def get_entity_trailers(self, rqfilename, configuration):
-        trailers = []
-        xml_trailers = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/trailers/*'
-        )
-
-        if xml_trailers:
-            # retrieve all headers assigned to this entity
-            for trailer in xml_trailers:
-                trailers.append((trailer.attrib["name"], trailer.text))
-
-        return trailers
-
-    def get_status_headers(self, status, headers, configuration):
-        xml_headers = configuration.xpath(
-            '//http/statuscodes/status[@name="' + str(status) + '"]/headers/*'
-        )
-
-        if xml_headers:
-            # retrieve all headers assigned to this status
-            for header in xml_headers:
-                headers.append((header.attrib["name"], header.text))
-
-        return headers
-
-    def get_status_trailers(self, status, configuration):
-        trailers = []
-        xml_trailers = configuration.xpath(
-            '//http/statuscodes/status[@name="' + str(status) + '"]/trailers/*'
-        )
-
-        if xml_trailers:
-            # retrieve all trailers assigned to this status
-            for trailer in xml_trailers:
-                trailers.append((trailer.attrib["name"], trailer.text))
-
-        return trailers
-
     def send_response(self, code, message=None):
         """Send the response header and log the response code.
         This function is overloaded to change the behaviour when
@@ -180,24 +163,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
     def substitute_template_fields(self, payload):
         if type(payload) == bytes:
             payload = payload.decode()
-        databus = conpot_core.get_databus()
-        pattern = r'<condata\s+source="([^"]+)"\s+key="([^"]+)"\s*/>'
-
-        def replacer(match):
-            source = match.group(1)
-            key = match.group(2)
-            if source == "databus":
-                result = databus.get_value(key)
-                return str(result) if result is not None else match.group(0)
-            elif source == "eval":
-                try:
-                    return str(eval(key))
-                except Exception as e:
-                    logger.exception(e)
-                    return match.group(0)
-            return match.group(0)
-
-        return re.sub(pattern, replacer, payload)
+        return render_segments(split_template(payload))
 
     def load_status(
         self,
@@ -205,7 +171,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         requeststring,
         requestheaders,
         headers,
-        configuration,
         docpath,
         method="GET",
         body=None,
@@ -215,82 +180,67 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         request to a remote system. If not available, generate
         a minimal response"""
 
-        # handle PROXY tag
-        entity_proxy = configuration.xpath(
-            '//http/statuscodes/status[@name="' + str(status) + '"]/proxy'
-        )
+        route = self.server.status_routes.get(int(status), EMPTY_ROUTE)
 
-        if entity_proxy:
+        # handle PROXY tag
+        if route.proxy:
             source = "proxy"
-            target = entity_proxy[0].xpath("./text()")[0]
+            target = route.proxy
         else:
             source = "filesystem"
 
         # handle TARPIT tag
-        entity_tarpit = configuration.xpath(
-            '//http/statuscodes/status[@name="' + str(status) + '"]/tarpit'
-        )
-
-        if entity_tarpit:
-            tarpit = self.server.config_sanitize_tarpit(
-                entity_tarpit[0].xpath("./text()")[0]
-            )
-        else:
-            tarpit = None
+        tarpit = route.tarpit
 
         # check if we have to delay further actions due to global or local TARPIT configuration
         if tarpit is not None:
             # this node has its own delay configuration
-            self.server.do_tarpit(tarpit)
+            self.tarpit_delay += delay_of(tarpit)
         else:
             # no delay configuration for this node. check for global latency
             if self.server.tarpit is not None:
                 # fall back to the globally configured latency
-                self.server.do_tarpit(self.server.tarpit)
+                self.tarpit_delay += delay_of(self.server.tarpit)
 
         # If the requested resource resides on our filesystem,
         # we try retrieve all metadata and the resource itself from there.
         if source == "filesystem":
             # retrieve headers from entities configuration block
-            headers = self.get_status_headers(status, headers, configuration)
+            headers.extend(route.headers)
 
-            # retrieve headers from entities configuration block
-            trailers = self.get_status_trailers(status, configuration)
+            # retrieve trailers from entities configuration block
+            trailers = list(route.trailers)
 
-            # retrieve payload directly from filesystem, if possible.
+            # retrieve payload from the content cache, if possible.
             # If this is not possible, return an empty, zero sized string.
-            try:
-                if not isinstance(status, int):
-                    status = status.value
-                with open(
-                    os.path.join(docpath, "statuscodes", str(int(status)) + ".status"),
-                    "rb",
-                ) as f:
-                    payload = f.read()
-
-            except IOError as e:
-                logger.exception("%s", e)
-                payload = ""
+            if not isinstance(status, int):
+                status = status.value
+            cached = self.server.content_cache.get(
+                os.path.join("statuscodes", str(int(status)) + ".status")
+            )
 
             # there might be template data that can be substituted within the
             # payload. We only substitute data that is going to be displayed
             # by the browser:
 
             # perform template substitution on payload
-            payload = self.substitute_template_fields(payload)
+            if cached is not None:
+                payload = cached.render()
+            else:
+                payload = ""
 
             # How do we transport the content?
-            chunked_transfer = configuration.xpath(
-                '//http/htdocs/node[@name="' + str(status) + '"]/chunks'
-            )
+            chunked_transfer = self.server.htdocs_routes.get(
+                str(status), EMPTY_ROUTE
+            ).chunks
 
             if chunked_transfer:
                 # Append a chunked transfer encoding header
                 headers.append(("Transfer-Encoding", "chunked"))
-                chunks = str(chunked_transfer[0].xpath("./text()")[0])
+                chunks = chunked_transfer
             else:
                 # Calculate and append a content length header
-                headers.append(("Content-Length", payload.__len__()))
+                headers.append(("Content-Length", content_length(cached, payload)))
                 chunks = "0"
 
             return status, headers, trailers, payload, chunks
@@ -350,7 +300,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
                         requeststring,
                         self.headers,
                         headers,
-                        configuration,
                         docpath,
                     )
 
@@ -364,7 +313,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
 
             return status, headers, trailers, payload, chunks
 
-    def load_entity(self, requeststring, headers, configuration, docpath):
+    def load_entity(self, requeststring, headers, docpath):
         """
         Retrieves status, headers and payload for a given entity, that
         can be stored either local or on a remote system
@@ -374,85 +323,66 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         rqfilename = requeststring.partition("?")[0]
         rqparams = requeststring.partition("?")[2]
 
+        routes = self.server.htdocs_routes
+        route = routes.get(rqfilename, EMPTY_ROUTE)
+
         # handle ALIAS tag
-        entity_alias = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/alias'
-        )
-        if entity_alias:
-            rqfilename = entity_alias[0].xpath("./text()")[0]
+        if route.alias:
+            rqfilename = route.alias
+            route = routes.get(rqfilename, EMPTY_ROUTE)
 
         # handle SUBSELECT tag
-        rqfilename_appendix = self.get_trigger_appendix(
-            rqfilename, rqparams, configuration
-        )
+        rqfilename_appendix = self.get_trigger_appendix(route, rqparams)
         if rqfilename_appendix:
             rqfilename += "_" + rqfilename_appendix
+            route = routes.get(rqfilename, EMPTY_ROUTE)
 
         # handle PROXY tag
-        entity_proxy = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/proxy'
-        )
-        if entity_proxy:
+        if route.proxy:
             source = "proxy"
-            target = entity_proxy[0].xpath("./text()")[0]
+            target = route.proxy
         else:
             source = "filesystem"
 
         # handle TARPIT tag
-        entity_tarpit = configuration.xpath(
-            '//http/htdocs/node[@name="' + rqfilename + '"]/tarpit'
-        )
-        if entity_tarpit:
-            tarpit = self.server.config_sanitize_tarpit(
-                entity_tarpit[0].xpath("./text()")[0]
-            )
-        else:
-            tarpit = None
+        tarpit = route.tarpit
 
         # check if we have to delay further actions due to global or local TARPIT configuration
         if tarpit is not None:
             # this node has its own delay configuration
-            self.server.do_tarpit(tarpit)
+            self.tarpit_delay += delay_of(tarpit)
         else:
             # no delay configuration for this node. check for global latency
             if self.server.tarpit is not None:
                 # fall back to the globally configured latency
-                self.server.do_tarpit(self.server.tarpit)
+                self.tarpit_delay += delay_of(self.server.tarpit)
 
         # If the requested resource resides on our filesystem,
         # we try retrieve all metadata and the resource itself from there.
         if source == "filesystem":
             # handle STATUS tag
             # ( filesystem only, since proxied requests come with their own status )
-            entity_status = configuration.xpath(
-                '//http/htdocs/node[@name="' + rqfilename + '"]/status'
-            )
-            if entity_status:
-                status = int(entity_status[0].xpath("./text()")[0])
+            if route.status is not None:
+                status = route.status
             else:
                 status = 200
 
             # retrieve headers from entities configuration block
-            headers = self.get_entity_headers(rqfilename, headers, configuration)
+            headers.extend(route.headers)
 
             # retrieve trailers from entities configuration block
-            trailers = self.get_entity_trailers(rqfilename, configuration)
+            trailers = list(route.trailers)
 
-            # retrieve payload directly from filesystem, if possible.
+            # retrieve payload from the content cache, if possible.
             # If this is not possible, return an empty, zero sized string.
             if os.path.isabs(rqfilename):
                 relrqfilename = rqfilename[1:]
             else:
                 relrqfilename = rqfilename
 
-            try:
-                with open(os.path.join(docpath, "htdocs", relrqfilename), "rb") as f:
-                    payload = f.read()
-
-            except IOError as e:
-                if not os.path.isdir(os.path.join(docpath, "htdocs", relrqfilename)):
-                    logger.error("Failed to get template content: %s", e)
-                payload = ""
+            cached = self.server.content_cache.get(
+                os.path.join("htdocs", relrqfilename)
+            )
 
             # there might be template data that can be substituted within the
             # payload. We only substitute data that is going to be displayed
@@ -466,22 +396,22 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
                 ):
                     templated = True
 
-            if templated:
+            if cached is None:
+                payload = ""
+            elif templated:
                 # perform template substitution on payload
-                payload = self.substitute_template_fields(payload)
+                payload = cached.render()
+            else:
+                payload = cached.payload
 
             # How do we transport the content?
-            chunked_transfer = configuration.xpath(
-                '//http/htdocs/node[@name="' + rqfilename + '"]/chunks'
-            )
-
-            if chunked_transfer:
+            if route.chunks:
                 # Calculate and append a chunked transfer encoding header
                 headers.append(("Transfer-Encoding", "chunked"))
-                chunks = str(chunked_transfer[0].xpath("./text()")[0])
+                chunks = route.chunks
             else:
                 # Calculate and append a content length header
-                headers.append(("Content-Length", payload.__len__()))
+                headers.append(("Content-Length", content_length(cached, payload)))
                 chunks = "0"
 
             return status, headers, trailers, payload, chunks
@@ -510,7 +440,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             except:
                 status = 503
                 status, headers, trailers, payload, chunks = self.load_status(
-                    status, requeststring, self.headers, headers, configuration, docpath
+                    status, requeststring, self.headers, headers, docpath
                 )
 
             return status, headers, trailers, payload, chunks
@@ -554,7 +484,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
 
         headers = []
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         if not hasattr(self, "headers"):
@@ -582,7 +511,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             requeststring.partition("?")[0],
             self.headers,
             headers,
-            configuration,
             docpath,
         )
 
@@ -598,7 +526,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # decide upon sending content as a whole or chunked
         if chunks == "0":
             # send payload as a whole to the client
-            if type(payload) != bytes:
+            if isinstance(payload, str):
                 payload = payload.encode()
             self.wfile.write(payload)
         else:
@@ -620,7 +548,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # fetch configuration dependent variables from server instance
         headers = []
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         # retrieve TRACE body data
@@ -639,7 +566,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             # Method disabled by configuration. Fall back to 501.
             status = 501
             status, headers, _, payload, _ = self.load_status(
-                status, self.path, self.headers, headers, configuration, docpath
+                status, self.path, self.headers, headers, docpath
             )
 
         else:
@@ -683,7 +610,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # fetch configuration dependent variables from server instance
         headers = list()
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         # retrieve HEAD body data
@@ -702,34 +628,20 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             # Method disabled by configuration. Fall back to 501.
             status = 501
             status, headers, _, _, _ = self.load_status(
-                status, self.path, self.headers, headers, configuration, docpath
+                status, self.path, self.headers, headers, docpath
             )
 
         else:
             # try to find a configuration item for this HEAD request
-            try:
-                entity_xml = configuration.xpath(
-                    '//http/htdocs/node[@name="' + self.path.partition("?")[0] + '"]'
-                )
-            except etree.XPathEvalError:
-                entity_xml = None
-                logger.debug(
-                    "Malformed HTTP:HEAD URN. Failed to handle <{}>. (Client: {})".format(
-                        self.path, self.client_address
-                    )
-                )
-
-            if entity_xml:
+            if self.path.partition("?")[0] in self.server.htdocs_routes:
                 # A config item exists for this entity. Handle it..
-                status, headers, _, _, _ = self.load_entity(
-                    self.path, headers, configuration, docpath
-                )
+                status, headers, _, _, _ = self.load_entity(self.path, headers, docpath)
 
             else:
                 # No config item could be found. Fall back to a standard 404..
                 status = 404
                 status, headers, _, _, _ = self.load_status(
-                    status, self.path, self.headers, headers, configuration, docpath
+                    status, self.path, self.headers, headers, docpath
                 )
 
         # send initial HTTP status line to client
@@ -756,7 +668,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # fetch configuration dependent variables from server instance
         headers = []
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         # retrieve OPTIONS body data
@@ -775,7 +686,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             # Method disabled by configuration. Fall back to 501.
             status = 501
             status, headers, _, payload, _ = self.load_status(
-                status, self.path, self.headers, headers, configuration, docpath
+                status, self.path, self.headers, headers, docpath
             )
 
         else:
@@ -797,7 +708,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             headers.append(("Allow", allowed_methods))
 
             # Calculate and append a content length header
-            headers.append(("Content-Length", payload.__len__()))
+            headers.append(("Content-Length", len(payload.encode())))
 
             # Append CC header
             headers.append(("Connection", "close"))
@@ -829,7 +740,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # fetch configuration dependent variables from server instance
         headers = []
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         # retrieve GET body data
@@ -844,29 +754,17 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             get_data = self.rfile.read(int(get_data_length))
 
         # try to find a configuration item for this GET request
-        try:
-            entity_xml = configuration.xpath(
-                '//http/htdocs/node[@name="' + self.path.partition("?")[0] + '"]'
-            )
-        except etree.XPathEvalError:
-            entity_xml = None
-            logger.debug(
-                "Malformed HTTP:GET URN. Failed to handle <{}>. (Client: {})".format(
-                    self.path, self.client_address
-                )
-            )
-
-        if entity_xml:
+        if self.path.partition("?")[0] in self.server.htdocs_routes:
             # A config item exists for this entity. Handle it..
             status, headers, trailers, payload, chunks = self.load_entity(
-                self.path, headers, configuration, docpath
+                self.path, headers, docpath
             )
 
         else:
             # No config item could be found. Fall back to a standard 404..
             status = 404
             status, headers, trailers, payload, chunks = self.load_status(
-                status, self.path, self.headers, headers, configuration, docpath, "GET"
+                status, self.path, self.headers, headers, docpath, "GET"
             )
 
         # send initial HTTP status line to client
@@ -881,7 +779,9 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # decide upon sending content as a whole or chunked
         if chunks == "0":
             # send payload as a whole to the client
-            self.wfile.write(str_to_bytes(payload))
+            if isinstance(payload, str):
+                payload = payload.encode()
+            self.wfile.write(payload)
         else:
             # send payload in chunks to the client
             self.send_chunked(chunks, payload, trailers)
@@ -901,7 +801,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # fetch configuration dependent variables from server instance
         headers = list()
         headers.extend(self.server.global_headers)
-        configuration = self.server.configuration
         docpath = self.server.docpath
 
         # retrieve POST data ( important to flush request buffers )
@@ -912,22 +811,10 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
             post_data = self.rfile.read(int(post_data_length))
 
         # try to find a configuration item for this POST request
-        try:
-            entity_xml = configuration.xpath(
-                '//http/htdocs/node[@name="' + self.path.partition("?")[0] + '"]'
-            )
-        except etree.XPathEvalError:
-            entity_xml = None
-            logger.debug(
-                "Malformed HTTP:POST URN. Failed to handle <{}>. (Client: {})".format(
-                    self.path, self.client_address
-                )
-            )
-
-        if entity_xml:
+        if self.path.partition("?")[0] in self.server.htdocs_routes:
             # A config item exists for this entity. Handle it..
             status, headers, trailers, payload, chunks = self.load_entity(
-                self.path, headers, configuration, docpath
+                self.path, headers, docpath
             )
 
         else:
@@ -938,7 +825,6 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
                 self.path,
                 self.headers,
                 headers,
-                configuration,
                 docpath,
                 "POST",
                 post_data,
@@ -956,7 +842,7 @@ class HTTPServer(http.server.BaseHTTPRequestHandler):
         # decide upon sending content as a whole or chunked
         if chunks == "0":
             # send payload as a whole to the client
-            if type(payload) != bytes:
+            if isinstance(payload, str):
                 payload = payload.encode()
             self.wfile.write(payload)
         else:
@@ -1038,15 +924,11 @@ class ThreadedHTTPServer(ThreadingMixIn, http.server.HTTPServer):
     """Handle requests in a separate thread."""
 
 
-class SubHTTPServer(ThreadedHTTPServer):
-    """this class is necessary to allow passing custom request handler into
-    the RequestHandlerClass"""
-
-    daemon_threads = True
-
-    def __init__(self, server_address, RequestHandlerClass, template, docpath):
-        http.server.HTTPServer.__init__(self, server_address, RequestHandlerClass)
+class HTTPTemplateMixin(object):
+    """loads global configuration, routes and content of a http template.
+    Shared by the threaded and the gevent based server"""
 
+    def load_template(self, template, docpath, RequestHandlerClass):
         self.docpath = docpath
 
         # default configuration
@@ -1055,6 +937,9 @@ class SubHTTPServer(ThreadedHTTPServer):
         self.disable_method_trace = False
         self.disable_method_options = False
         self.tarpit = "0"
+        self.htdocs_reload_interval = None
+        self.max_connections = None
+        self.keepalive_timeout = 15
 
         # load the configuration from template and parse it
         # for the first time in order to reduce further handling..
@@ -1103,6 +988,21 @@ class SubHTTPServer(ThreadedHTTPServer):
                     if entity.text:
                         self.tarpit = self.config_sanitize_tarpit(entity.text)
 
+                elif entity.attrib["name"] == "htdocs_reload_interval":
+                    if entity.text and float(entity.text) > 0:
+                        # check served files for changes every n seconds
+                        self.htdocs_reload_interval = float(entity.text)
+
+                elif entity.attrib["name"] == "max_connections":
+                    if entity.text and int(entity.text) > 0:
+                        # number of concurrently handled connections (gevent engine only)
+                        self.max_connections = int(entity.text)
+
+                elif entity.attrib["name"] == "keepalive_timeout":
+                    if entity.text:
+                        # idle seconds before a keep-alive connection is closed (gevent engine only)
+                        self.keepalive_timeout = float(entity.text)
+
         # load global headers from XML
         self.global_headers = []
         xml_headers = self.configuration.xpath("//http/global/headers/*")
@@ -1124,6 +1024,55 @@ class SubHTTPServer(ThreadedHTTPServer):
                 else:
                     self.global_headers.append((header.attrib["name"], header.text))
 
+        # htdocs and status code payloads are kept in memory
+        self.content_cache = ContentCache(docpath, self.htdocs_reload_interval)
+
+        # compile htdocs nodes and status codes once, so requests only need a dict lookup
+        self.htdocs_routes = {}
+        for node in self.configuration.xpath("//http/htdocs/node"):
+            self.htdocs_routes.setdefault(node.attrib["name"], self.compile_route(node))
+
+        self.status_routes = {}
+        for node in self.configuration.xpath("//http/statuscodes/status"):
+            self.status_routes.setdefault(
+                int(node.attrib["name"]), self.compile_route(node)
+            )
+
+    def compile_route(self, node):
+        def text(tag):
+            element = node.find(tag)
+            if element is None:
+                return None
+            return element.text
+
+        tarpit = None
+        if node.find("tarpit") is not None:
+            tarpit = self.config_sanitize_tarpit(text("tarpit"))
+
+        status = text("status")
+        if status is not None:
+            status = int(status)
+
+        return HTTPRoute(
+            alias=text("alias"),
+            triggers=tuple(
+                (tuple(trigger.text.split(";")), trigger.attrib["appendix"])
+                for trigger in node.xpath("./triggers/*")
+            ),
+            proxy=text("proxy"),
+            tarpit=tarpit,
+            status=status,
+            headers=tuple(
+                (header.attrib["name"], header.text)
+                for header in node.xpath("./headers/*")
+            ),
+            trailers=tuple(
+                (trailer.attrib["name"], trailer.text)
+                for trailer in node.xpath("./trailers/*")
+            ),
+            chunks=text("chunks"),
+        )
+
     def config_sanitize_tarpit(self, value):
         # checks tarpit value for being either a single int or float,
         # or a series of two concatenated integers and/or floats seperated by semicolon and returns
@@ -1150,27 +1099,68 @@ class SubHTTPServer(ThreadedHTTPServer):
         else:
             return "0;0"
 
-    def do_tarpit(self, delay):
-        # sleeps the thread for $delay ( should be either 1 float to apply a static period of time to sleep,
-        # or 2 floats seperated by semicolon to sleep a randomized period of time determined by ( rand[x;y] )
 
-        lbound, _, ubound = delay.partition(";")
+class SubHTTPServer(HTTPTemplateMixin, ThreadedHTTPServer):
+    """this class is necessary to allow passing custom request handler into
+    the RequestHandlerClass"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, RequestHandlerClass, template, docpath):
+        http.server.HTTPServer.__init__(self, server_address, RequestHandlerClass)
+        self.load_template(template, docpath, RequestHandlerClass)
+
+    def verify_request(self, request, client_address):
+        return conpot_core.admit("http", client_address[0])
+
+
+class GeventHTTPServer(HTTPTemplateMixin, StreamServer):
+    """Serves the same request handler as SubHTTPServer from a gevent StreamServer.
+    Connections are handled by a pool of greenlets, bounded by max_connections
+    or else the pool size configured for http"""
+
+    def __init__(self, server_address, RequestHandlerClass, template, docpath):
+        self.load_template(template, docpath, RequestHandlerClass)
+        self.RequestHandlerClass = RequestHandlerClass
+        StreamServer.__init__(
+            self,
+            server_address,
+            conpot_core.wrap_handler("http", self.handle),
+            spawn=conpot_core.create_pool("http", self.max_connections),
+        )
+        # bind right away, so the port is known before serve_forever()
+        self.init_socket()
 
-        if not lbound or lbound is None:
-            # no lower boundary found. Assume zero latency
+    def handle(self, sock, address):
+        # idle keep-alive connections time out in handle_one_request()
+        sock.settimeout(self.keepalive_timeout)
+        try:
+            self.RequestHandlerClass(sock, address, self)
+        except (ConnectionError, socket.timeout):
             pass
-        elif not ubound or ubound is None:
-            # no upper boundary found. Assume static latency
-            gevent.sleep(float(lbound))
-        else:
-            # both boundaries found. Assume random latency between lbound and ubound
-            gevent.sleep(random.uniform(float(lbound), float(ubound)))
+        finally:
+            sock.close()
+
+
+def get_engine(template):
+    engine = etree.parse(template).xpath(
+        '//http/global/config/entity[@name="engine"]/text()'
+    )
+    if engine:
+        return engine[0].strip().lower()
+    return "gevent"
 
 
 class CommandResponder(object):
-    def __init__(self, host, port, template, docpath):
+    def __init__(self, host, port, template, docpath, engine=None):
+        if engine is None:
+            engine = get_engine(template)
+
         # Create HTTP server class
-        self.httpd = SubHTTPServer((host, port), HTTPServer, template, docpath)
+        if engine == "threaded":
+            self.httpd = SubHTTPServer((host, port), HTTPServer, template, docpath)
+        else:
+            self.httpd = GeventHTTPServer((host, port), HTTPServer, template, docpath)
         self.server_port = self.httpd.server_port
 
     def serve_forever(self):
@@ -1180,4 +1170,7 @@ class CommandResponder(object):
         logging.info(
             "HTTP server will shut down gracefully as soon as all connections are closed."
         )
-        self.httpd.shutdown()
+        if isinstance(self.httpd, StreamServer):
+            self.httpd.stop()
+        else:
+            self.httpd.shutdown()
@@ -0,0 +1,153 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import logging
+import os
+import re
+import time
+
+import conpot.core as conpot_core
+
+logger = logging.getLogger(__name__)
+
+CONDATA_PATTERN = re.compile(r'<condata\s+source="([^"]+)"\s+key="([^"]+)"\s*/>')
+
+
+def split_template(text):
+    """
+    Split a template into literal text and <condata /> slots.
+    :return: list of either str (literal text) or (source, key, tag) tuples
+    """
+    segments = []
+    position = 0
+    for match in CONDATA_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position : match.start()])
+        segments.append((match.group(1), match.group(2), match.group(0)))
+        position = match.end()
+    if position < len(text):
+        segments.append(text[position:])
+    return segments
+
+
+def render_segments(segments):
+    databus = conpot_core.get_databus()
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
+        source, key, tag = segment
+        if source == "databus":
+            result = databus.get_value(key)
+            parts.append(str(result) if result is not None else tag)
+        elif source == "eval":
+            try:
+                parts.append(str(eval(key)))
+            except Exception as e:
+                logger.exception(e)
+                parts.append(tag)
+        else:
+            parts.append(tag)
+    return "".join(parts)
+
+
+class CachedFile(object):
+    def __init__(self, payload, mtime):
+        self.payload = payload
+        # Content-Length of the payload as it is, or rendered without <condata /> tags
+        self.length = len(payload)
+        self.mtime = mtime
+        self.checked = time.monotonic()
+        self._segments = None
+
+    def _split(self):
+        if self._segments is None:
+            self._segments = split_template(self.payload.decode())
+        return self._segments
+
+    @property
+    def static(self):
+        """True if the payload has no <condata /> tags to substitute."""
+        return all(isinstance(segment, str) for segment in self._split())
+
+    def render(self):
+        """Payload as str with all <condata /> tags substituted."""
+        return render_segments(self._split())
+
+
+def content_length(cached, payload):
+    """Content-Length in bytes of payload, the content of cached as it is or rendered."""
+    if cached is None:
+        return 0
+    if isinstance(payload, bytes) or cached.static:
+        return cached.length
+    return len(payload.encode())
+
+
+class ContentCache(object):
+    """
+    Keeps the files below a template directory in memory. If reload_interval is
+    set, a file is re-read when its mtime changed, checked at most once per
+    interval. Files that can not be read are tried again on every request.
+    """
+
+    def __init__(self, root, reload_interval=None):
+        self.root = root
+        self.reload_interval = reload_interval
+        self._files = {}
+
+    def _load(self, path):
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                payload = f.read()
+        except IOError as e:
+            if not os.path.isdir(path):
+                logger.error("Failed to get template content: %s", e)
+            return None
+        return CachedFile(payload, stat.st_mtime)
+
+    def get(self, relpath):
+        """
+        Get a file relative to the cache root.
+        :return: CachedFile or None if the file can not be read
+        """
+        cached = self._files.get(relpath)
+        if cached is not None:
+            if not self.reload_interval:
+                return cached
+            now = time.monotonic()
+            if now - cached.checked < self.reload_interval:
+                return cached
+            cached.checked = now
+            try:
+                if os.stat(os.path.join(self.root, relpath)).st_mtime == cached.mtime:
+                    return cached
+            except OSError:
+                pass
+            logger.info("Reloading changed template content: %s", relpath)
+
+        cached = self._load(os.path.join(self.root, relpath))
+        if cached is None:
+            self._files.pop(relpath, None)
+        else:
+            self._files[relpath] = cached
+        return cached
+
+    def clear(self):
+        self._files.clear()
@@ -553,7 +553,11 @@ class IpmiServer(object):
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.sock.setblocking(True)
         self.sock.bind(connection)
-        self.server = DatagramServer(self.sock, self.handle)
+        self.server = DatagramServer(
+            self.sock,
+            conpot_core.wrap_handler("ipmi", self.handle),
+            spawn=conpot_core.create_pool("ipmi"),
+        )
         self.server.start()
         logger.info("IPMI server started on: %s", (host, self.server.server_port))
         self.server.serve_forever()
@@ -95,7 +95,11 @@ class KamstrupManagementServer(object):
         self.host = host
         self.port = port
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("kamstrup_management", self.handle),
+            spawn=conpot_core.create_pool("kamstrup_management"),
+        )
         logger.info("Kamstrup management protocol server started on: %s", connection)
         self.server.serve_forever()
 
@@ -120,7 +120,11 @@ class KamstrupServer(object):
         self.host = host
         self.port = port
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("kamstrup_meter", self.handle),
+            spawn=conpot_core.create_pool("kamstrup_meter"),
+        )
         logger.info("Kamstrup protocol server started on: %s", connection)
         self.server.serve_forever()
 
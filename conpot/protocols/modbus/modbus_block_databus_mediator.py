@@ -1,18 +1,57 @@
+import sys
+from array import array
+
+from modbus_tk import defines
 from modbus_tk.hooks import call_hooks
 import conpot.core as conpot_core
 
+BIT_BLOCKS = (defines.COILS, defines.DISCRETE_INPUTS)
+
 
 class ModbusBlockDatabusMediator(object):
-    """This class represents the values for a range of addresses"""
+    """
+    This class represents the values for a range of addresses. They are kept in
+    an array('H') for registers or a bytearray of 0/1 for coils and discrete
+    inputs, which is stored in the databus under databus_key. Writes go to the
+    array and are announced with set_value, so they stay observable. If the key
+    is set to something else, e.g. a list or a function, the block follows it.
+    """
 
-    def __init__(self, databus_key, starting_address):
+    def __init__(self, databus_key, starting_address, block_type=None):
         """
         Constructor: defines the address range and creates the array of values
         """
         self.starting_address = starting_address
-        # self._data = [0]*size
         self.databus_key = databus_key
-        self.size = len(conpot_core.get_databus().get_value(self.databus_key))
+        self.bits = block_type in BIT_BLOCKS
+        self._values = None
+        self.size = len(self._sync())
+
+    def _sync(self):
+        """Return the array of values, converted again if the databus value changed."""
+        databus = conpot_core.get_databus()
+        source = databus.get_value(self.databus_key)
+        if source is self._values:
+            return source
+        if databus.is_dynamic(self.databus_key):
+            # computed on every read, writes have nowhere to go
+            self._values = None
+            return self._convert(source)
+        if not self._is_native(source):
+            source = self._convert(source)
+            databus.set_value(self.databus_key, source)
+        self._values = source
+        return source
+
+    def _convert(self, values):
+        if self.bits:
+            return bytearray(1 if v else 0 for v in values)
+        return array("H", (int(v) & 0xFFFF for v in values))
+
+    def _is_native(self, values):
+        if self.bits:
+            return isinstance(values, bytearray)
+        return isinstance(values, array) and values.typecode == "H"
 
     def is_in(self, starting_address, size):
         """
@@ -27,10 +66,45 @@ class ModbusBlockDatabusMediator(object):
 
     def __getitem__(self, r):
         """"""
-        return conpot_core.get_databus().get_value(self.databus_key).__getitem__(r)
+        return self._sync()[r]
 
     def __setitem__(self, r, v):
         """"""
         call_hooks("modbus.ModbusBlock.setitem", (self, r, v))
-        obj = conpot_core.get_databus().get_value(self.databus_key)
-        return obj.__setitem__(r, v)
+        values = self._sync()
+        if not isinstance(r, slice):
+            v = (1 if v else 0) if self.bits else int(v) & 0xFFFF
+        elif not self._is_native(v):
+            v = self._convert(v)
+        values[r] = v
+        if values is self._values:
+            conpot_core.get_databus().set_value(self.databus_key, values)
+
+    def read_registers(self, offset, count):
+        """Big endian bytes of count registers starting at offset."""
+        values = self._sync()[offset : offset + count]
+        if sys.byteorder == "little":
+            values.byteswap()
+        return values.tobytes()
+
+    def write_registers(self, offset, data):
+        """Store big endian register values from data starting at offset."""
+        values = array("H")
+        values.frombytes(data)
+        if sys.byteorder == "little":
+            values.byteswap()
+        self[offset : offset + len(values)] = values
+
+    def read_bits(self, offset, count):
+        """count bits starting at offset, packed LSB first as in Modbus responses."""
+        values = self._sync()[offset : offset + count]
+        packed = bytearray((count + 7) // 8)
+        for i, bit in enumerate(values):
+            if bit:
+                packed[i >> 3] |= 1 << (i & 7)
+        return bytes(packed)
+
+    def write_bits(self, offset, count, data):
+        """Store count bits packed LSB first in data starting at offset."""
+        bits = bytearray((data[i >> 3] >> (i & 7)) & 1 for i in range(count))
+        self[offset : offset + count] = bits
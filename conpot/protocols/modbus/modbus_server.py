@@ -1,6 +1,5 @@
 # modified by Sooky Peter <xsooky00@stud.fit.vutbr.cz>
 # Brno University of Technology, Faculty of Information Technology
-import struct
 import socket
 import time
 import logging
@@ -17,6 +16,7 @@ import modbus_tk.defines as mdef
 from conpot.core.protocol_wrapper import conpot_protocol
 from conpot.protocols.modbus import slave_db
 import conpot.core as conpot_core
+from conpot.utils.framing import FrameReader, MBAP
 
 logger = logging.getLogger(__name__)
 
@@ -107,11 +107,14 @@ class ModbusServer(modbus.Server):
         )
         session.add_event({"type": "NEW_CONNECTION"})
 
+        reader = FrameReader(sock, MBAP)
+        tarpit = conpot_core.get_tarpit()
+        requests = 0
         try:
             while True:
                 request = None
                 try:
-                    request = sock.recv(7)
+                    request = reader.read_frame()
                 except Exception as e:
                     logger.error(
                         "Exception occurred in ModbusServer.handle() "
@@ -133,13 +136,6 @@ class ModbusServer(modbus.Server):
                     )
                     session.add_event({"type": "CONNECTION_TERMINATED"})
                     break
-                _, _, length = struct.unpack(">HHH", request[:6])
-                while len(request) < (length + 6):
-                    try:
-                        new_byte = sock.recv(1)
-                        request += new_byte
-                    except Exception:
-                        break
                 query = modbus_tcp.TcpQuery()
 
                 # logdata is a dictionary containing request, slave_id,
@@ -157,6 +153,16 @@ class ModbusServer(modbus.Server):
                 if response:
                     sock.sendall(response)
                     logger.info("Modbus response sent to %s", address[0])
+                    requests += 1
+                    if tarpit.should_hand_off(requests):
+                        logger.info(
+                            "Modbus client %s moved to the tarpit. (%s)",
+                            address[0],
+                            session.id,
+                        )
+                        session.add_event({"type": "CONNECTION_TARPITTED"})
+                        tarpit.park(sock)
+                        break
                 else:
                     # TODO:
                     # response could be None under several different cases
@@ -191,7 +197,11 @@ class ModbusServer(modbus.Server):
         self.host = host
         self.port = port
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("modbus", self.handle),
+            spawn=conpot_core.create_pool("modbus"),
+        )
         logger.info("Modbus server started on: %s", connection)
         self.server.serve_forever()
 
@@ -1,5 +1,6 @@
 import struct
 import logging
+from bisect import bisect_right
 
 from modbus_tk.modbus import (
     Slave,
@@ -11,6 +12,7 @@ from modbus_tk.modbus import (
     OverlapModbusBlockError,
 )
 from modbus_tk import defines, utils
+from modbus_tk.hooks import call_hooks
 from conpot.utils.networking import str_to_bytes
 from .modbus_block_databus_mediator import ModbusBlockDatabusMediator
 
@@ -36,6 +38,8 @@ class MBSlave(Slave):
             defines.DEVICE_INFO: self._device_info,
             defines.REPORT_SLAVE_ID: self._report_slave_id,
         }
+        # starting addresses of the blocks in _memory, per type and sorted
+        self._starts = {block_type: [] for block_type in self._memory}
         self.dom = dom
         logger.debug("Modbus slave (ID: %d) created" % self._id)
 
@@ -148,21 +152,134 @@ class MBSlave(Slave):
             # check that the new block doesn't overlap an existing block
             # it means that only 1 block per type must correspond to a given address
             # for example: it must not have 2 holding registers at address 100
-            index = 0
-            for i in range(len(self._memory[block_type])):
-                block = self._memory[block_type][i]
+            starts = self._starts[block_type]
+            blocks = self._memory[block_type]
+            index = bisect_right(starts, starting_address)
+            # only the neighbours can overlap, the blocks are sorted and disjoint
+            for block in blocks[max(index - 1, 0) : index + 1]:
                 if block.is_in(starting_address, size):
                     raise OverlapModbusBlockError(
                         "Overlap block at %d size %d"
                         % (block.starting_address, block.size)
                     )
-                if block.starting_address > starting_address:
-                    index = i
-                    break
 
+            block = ModbusBlockDatabusMediator(block_name, starting_address, block_type)
             # if the block is ok: register it
             self._blocks[block_name] = (block_type, starting_address)
             # add it in the 'per type' shortcut
-            self._memory[block_type].insert(
-                index, ModbusBlockDatabusMediator(block_name, starting_address)
-            )
+            blocks.insert(index, block)
+            starts.insert(index, starting_address)
+
+    def remove_block(self, block_name):
+        """
+        Remove the block with the given name.
+        Raise an exception if not found
+        """
+        with self._data_lock:  # thread-safe
+            block = self._get_block(block_name)
+            block_type = self._blocks.pop(block_name)[0]
+            index = self._memory[block_type].index(block)
+            del self._memory[block_type][index]
+            del self._starts[block_type][index]
+
+    def remove_all_blocks(self):
+        """
+        Remove all the blocks
+        """
+        with self._data_lock:  # thread-safe
+            self._blocks.clear()
+            for block_type in self._memory:
+                self._memory[block_type] = []
+                self._starts[block_type] = []
+
+    def _get_block_and_offset(self, block_type, address, length):
+        """returns the block and offset corresponding to the given address"""
+        index = bisect_right(self._starts[block_type], address) - 1
+        if index >= 0:
+            block = self._memory[block_type][index]
+            offset = address - block.starting_address
+            if block.size >= offset + length:
+                return block, offset
+        raise ModbusError(defines.ILLEGAL_DATA_ADDRESS)
+
+    def _read_digital(self, block_type, request_pdu):
+        """read the value of coils and discrete inputs"""
+        starting_address, quantity_of_x = struct.unpack(">HH", request_pdu[1:5])
+
+        if (quantity_of_x <= 0) or (quantity_of_x > 2000):
+            # maximum allowed size is 2000 bits in one reading
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+
+        block, offset = self._get_block_and_offset(
+            block_type, starting_address, quantity_of_x
+        )
+        values = block.read_bits(offset, quantity_of_x)
+        return struct.pack(">B", len(values)) + values
+
+    def _read_registers(self, block_type, request_pdu):
+        """read the value of holding and input registers"""
+        starting_address, quantity_of_x = struct.unpack(">HH", request_pdu[1:5])
+
+        if (quantity_of_x <= 0) or (quantity_of_x > 125):
+            # maximum allowed size is 125 registers in one reading
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+
+        block, offset = self._get_block_and_offset(
+            block_type, starting_address, quantity_of_x
+        )
+        return struct.pack(">B", 2 * quantity_of_x) + block.read_registers(
+            offset, quantity_of_x
+        )
+
+    def _write_multiple_registers(self, request_pdu):
+        """execute modbus function 16"""
+        call_hooks(
+            "modbus.Slave.handle_write_multiple_registers_request", (self, request_pdu)
+        )
+        starting_address, quantity_of_x, byte_count = struct.unpack(
+            ">HHB", request_pdu[1:6]
+        )
+
+        if (
+            (quantity_of_x <= 0)
+            or (quantity_of_x > 123)
+            or (byte_count != (quantity_of_x * 2))
+        ):
+            # maximum allowed size is 123 registers in one reading
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+
+        block, offset = self._get_block_and_offset(
+            defines.HOLDING_REGISTERS, starting_address, quantity_of_x
+        )
+        data = request_pdu[6 : 6 + byte_count]
+        if len(data) != byte_count:
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+        block.write_registers(offset, data)
+        return struct.pack(">HH", starting_address, quantity_of_x)
+
+    def _write_multiple_coils(self, request_pdu):
+        """execute modbus function 15"""
+        call_hooks(
+            "modbus.Slave.handle_write_multiple_coils_request", (self, request_pdu)
+        )
+        starting_address, quantity_of_x, byte_count = struct.unpack(
+            ">HHB", request_pdu[1:6]
+        )
+
+        expected_byte_count = (quantity_of_x + 7) // 8
+        if (
+            (quantity_of_x <= 0)
+            or (quantity_of_x > 1968)
+            or (byte_count != expected_byte_count)
+        ):
+            # maximum allowed size is 1968 coils
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+
+        block, offset = self._get_block_and_offset(
+            defines.COILS, starting_address, quantity_of_x
+        )
+        data = request_pdu[6 : 6 + byte_count]
+        if len(data) != byte_count:
+            raise ModbusError(defines.ILLEGAL_DATA_VALUE)
+        block.write_bits(offset, quantity_of_x, data)
+        return struct.pack(">HH", starting_address, quantity_of_x)
@@ -70,10 +70,18 @@ class Proxy(object):
         connection = (host, port)
         if self.keyfile and self.certfile:
             server = StreamServer(
-                connection, self.handle, keyfile=self.keyfile, certfile=self.certfile
+                connection,
+                conpot_core.wrap_handler("proxy", self.handle),
+                spawn=conpot_core.create_pool("proxy"),
+                keyfile=self.keyfile,
+                certfile=self.certfile,
             )
         else:
-            server = StreamServer(connection, self.handle)
+            server = StreamServer(
+                connection,
+                conpot_core.wrap_handler("proxy", self.handle),
+                spawn=conpot_core.create_pool("proxy"),
+            )
         self.port = server.server_port
         logger.info(
             "%s proxy server started, listening on %s, proxy for: (%s, %s) using %s decoder.",
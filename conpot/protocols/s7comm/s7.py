@@ -3,6 +3,7 @@
 #             https://code.google.com/p/plcscan/source/browse/trunk/s7.py
 
 
+from collections import OrderedDict
 from struct import pack, unpack
 
 import struct
@@ -13,10 +14,64 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# SSL/SZL ids answered by the honeypot and the system status list holding their databus keys
+SSL_LIST_NAMES = {17: "W#16#xy11", 28: "W#16#xy1C"}
+
+
+class SZLCache(object):
+    """
+    Encoded read-SZL responses keyed by (SSL id, index). Entries are dropped when
+    one of the databus keys of their system status list changes. SSL ids with
+    keys backed by functions are never cached. The index comes from the client,
+    so only the max_entries most recently used responses are kept.
+    """
+
+    def __init__(self, ssl_lists, databus, max_entries=256):
+        self.max_entries = max_entries
+        self._responses = OrderedDict()
+        self._dynamic = set()
+        self._ssl_ids_by_key = {}
+        for ssl_id, list_name in SSL_LIST_NAMES.items():
+            for key in ssl_lists.get(list_name, {}).values():
+                if not key:
+                    continue
+                if databus.is_dynamic(key):
+                    self._dynamic.add(ssl_id)
+                if key not in self._ssl_ids_by_key:
+                    self._ssl_ids_by_key[key] = set()
+                    databus.observe_value(key, self.invalidate)
+                self._ssl_ids_by_key[key].add(ssl_id)
+
+    def get(self, ssl_id, ssl_index, build):
+        """
+        :param build: callable returning (params, data) for a cache miss
+        """
+        if ssl_id in self._dynamic:
+            return build()
+        cache_key = (ssl_id, ssl_index)
+        try:
+            self._responses.move_to_end(cache_key)
+            return self._responses[cache_key]
+        except KeyError:
+            response = self._responses[cache_key] = build()
+            if len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+            return response
+
+    def invalidate(self, key):
+        ssl_ids = self._ssl_ids_by_key.get(key, ())
+        for cached in [c for c in self._responses if c[0] in ssl_ids]:
+            del self._responses[cached]
+
+    def __len__(self):
+        return len(self._responses)
+
 
 # S7 packet
 class S7(object):
     ssl_lists = {}
+    # set up by the server, see SZLCache
+    szl_cache = None
 
     def __init__(
         self,
@@ -207,10 +262,15 @@ class S7(object):
                 pass
 
             # map request ssl to method
-            if hasattr(self, "request_ssl_{0}".format(data_ssl_id)):
-                m = getattr(self, "request_ssl_{0}".format(data_ssl_id))
-                _, params, data = m(data_ssl_index)
-                return params, data
+            handler = self.ssl_handlers.get(data_ssl_id)
+            if handler:
+                if self.szl_cache is None:
+                    return handler(self, data_ssl_index)[1:]
+                return self.szl_cache.get(
+                    data_ssl_id,
+                    data_ssl_index,
+                    lambda: handler(self, data_ssl_index)[1:],
+                )
 
             chunk = chunk[4 + data_next_bytes :]
             chunk_id += 1
@@ -423,3 +483,6 @@ class S7(object):
         )  # sequence ( = sequence + 1 )
 
         return "", ssl_resp_params, ssl_resp_packet
+
+    # dispatch table for read-SZL requests, by SSL id
+    ssl_handlers = {17: request_ssl_17, 28: request_ssl_28}
@@ -21,11 +21,11 @@ from gevent.server import StreamServer
 import codecs
 import socket
 from struct import unpack
-from conpot.protocols.s7comm.tpkt import TPKT
+from conpot.protocols.s7comm.tpkt import TPKT, TPKTReader
 from conpot.protocols.s7comm.cotp import COTP as COTP_BASE_packet
 from conpot.protocols.s7comm.cotp import COTP_ConnectionRequest
 from conpot.protocols.s7comm.cotp import COTP_ConnectionConfirm
-from conpot.protocols.s7comm.s7 import S7
+from conpot.protocols.s7comm.s7 import S7, SZLCache
 import conpot.core as conpot_core
 from conpot.core.protocol_wrapper import conpot_protocol
 from lxml import etree
@@ -64,6 +64,7 @@ class S7Server(object):
                 ssl_dict[item_id] = databus_key
 
         logger.debug("Conpot debug info: S7 SSL/SZL: {0}".format(self.ssl_lists))
+        S7.szl_cache = SZLCache(self.ssl_lists, conpot_core.get_databus())
         logger.info("Conpot S7Comm initialized")
 
     def handle(self, sock, address):
@@ -83,20 +84,19 @@ class S7Server(object):
         )
         session.add_event({"type": "NEW_CONNECTION"})
 
+        reader = TPKTReader(sock)
         try:
             while True:
-                data = sock.recv(4, socket.MSG_WAITALL)
+                data = reader.read_frame()
                 if len(data) == 0:
                     session.add_event({"type": "CONNECTION_LOST"})
                     break
 
-                _, _, length = unpack("!BBH", data[:4])
                 # check for length
-                if length <= 4:
+                if len(data) < 4 or unpack("!BBH", data[:4])[2] <= 4:
                     logger.info("S7 error: Invalid length")
                     session.add_event({"error": "S7 error: Invalid length"})
                     break
-                data += sock.recv(length - 4, socket.MSG_WAITALL)
 
                 tpkt_packet = TPKT().parse(cleanse_byte_string(data))
                 cotp_base_packet = COTP_BASE_packet().parse(tpkt_packet.payload)
@@ -141,7 +141,7 @@ class S7Server(object):
                         }
                     )
 
-                    data = sock.recv(1024)
+                    data = reader.read_frame()
 
                     # another round of parsing payloads
                     tpkt_packet = TPKT().parse(data)
@@ -197,7 +197,7 @@ class S7Server(object):
                                 )
 
                                 # handshake done, give some more data.
-                                data = sock.recv(1024)
+                                data = reader.read_frame()
 
                                 while data:
                                     tpkt_packet = TPKT().parse(data)
@@ -249,7 +249,7 @@ class S7Server(object):
                                             }
                                         )
 
-                                    data = sock.recv(1024)
+                                    data = reader.read_frame()
                     else:
                         logger.info(
                             "Received unknown COTP TPDU after handshake: {0}".format(
@@ -300,7 +300,11 @@ class S7Server(object):
         self.host = host
         self.port = port
         connection = (host, port)
-        self.server = StreamServer(connection, self.handle)
+        self.server = StreamServer(
+            connection,
+            conpot_core.wrap_handler("s7comm", self.handle),
+            spawn=conpot_core.create_pool("s7comm"),
+        )
         logger.info("S7Comm server started on: {0}".format(connection))
         self.server.serve_forever()
 
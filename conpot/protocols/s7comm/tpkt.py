@@ -1,6 +1,7 @@
 from struct import pack, unpack
 import struct
 from conpot.protocols.s7comm.exceptions import ParseException
+from conpot.utils.framing import FrameReader, TPKT as TPKT_FRAME
 from conpot.utils.networking import str_to_bytes
 
 
@@ -37,3 +38,14 @@ class TPKT:
         self.packet_length = header[2]
         self.payload = packet[4 : 4 + header[2]]
         return self
+
+
+class TPKTReader(FrameReader):
+    """
+    Reassembles TPKT packets from a stream socket using their length field.
+    Several packets received in one segment are returned one at a time, a
+    partial packet stays buffered until the rest of it has arrived.
+    """
+
+    def __init__(self, sock, bufsize=4096):
+        super().__init__(sock, TPKT_FRAME, bufsize)
@@ -139,7 +139,9 @@ class CommandResponder(object):
         s = self._get_mibSymbol(mibname, symbolname)
 
         if s:
-            self.oid_mapping[s.name + instance] = profile_map_name
+            self.databus_mediator.register(
+                s.name + instance, profile_map_name, s.syntax.__class__.__name__
+            )
 
             (MibScalarInstance,) = mib.import_symbols("SNMPv2-SMI", "MibScalarInstance")
             x = MibScalarInstance(s.name, instance, s.syntax.clone(value))
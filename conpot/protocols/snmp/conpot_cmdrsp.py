@@ -1,13 +1,12 @@
 import logging
-import random
 
 from pysnmp.entity.rfc3413 import cmdrsp
 from pysnmp.proto import error
 from pysnmp.proto.api import v2c
 import pysnmp.smi.error
 from pysnmp import debug
-import gevent
 import conpot.core as conpot_core
+from conpot.core.tarpit import delay_of
 from conpot.utils.networking import get_interface_ip
 
 logger = logging.getLogger(__name__)
@@ -39,8 +38,9 @@ class conpot_extension(object):
         return addr, snmp_version
 
     def log(self, version, msg_type, addr, req_varBinds, res_varBinds=None, sock=None):
+        local_ip, local_port = sock.getsockname()[:2]
         session = conpot_core.get_session(
-            "snmp", addr[0], addr[1], get_interface_ip(addr[0]), sock.getsockname()[1]
+            "snmp", addr[0], addr[1], get_interface_ip(addr[0], local_ip), local_port
         )
         req_oid = req_varBinds[0][0]
         req_val = req_varBinds[0][1]
@@ -60,17 +60,13 @@ class conpot_extension(object):
             {"type": event_type, "request": request, "response": response}
         )
 
-    def do_tarpit(self, delay):
-        lbound, _, ubound = delay.partition(";")
-
-        if not lbound or lbound is None:
-            pass
-        elif not ubound or ubound is None:
-            gevent.sleep(float(lbound))
-        else:
-            gevent.sleep(random.uniform(float(lbound), float(ubound)))
+    def do_tarpit(self, snmpEngine, addr, delay):
+        # the tarpit sends the response later, the dispatcher does not wait for it
+        snmpEngine.transport_dispatcher.delay_response(addr, delay_of(delay))
 
     def check_evasive(self, state, threshold, addr, cmd):
+        if not conpot_core.admit("snmp", addr[0]):
+            return True
         state_individual, state_overall = state
         threshold_individual, _, threshold_overall = threshold.partition(";")
 
@@ -135,7 +131,7 @@ class c_GetCommandResponder(cmdrsp.GetCommandResponder, conpot_extension):
             self.log(snmp_version, "Get", addr, var_binds, rsp_var_binds, sock)
 
         if _tarpit_active(self.tarpit):
-            self.do_tarpit(self.tarpit)
+            self.do_tarpit(snmpEngine, addr, self.tarpit)
 
         self.send_varbinds(snmpEngine, stateReference, 0, 0, rsp_var_binds)
         self.release_state_information(stateReference)
@@ -176,7 +172,7 @@ class c_NextCommandResponder(cmdrsp.NextCommandResponder, conpot_extension):
                     rsp_var_binds = [(tuple(rsp_var_binds[0][0]), response)]
 
                 if _tarpit_active(self.tarpit):
-                    self.do_tarpit(self.tarpit)
+                    self.do_tarpit(snmpEngine, addr, self.tarpit)
 
                 try:
                     self.send_varbinds(snmpEngine, stateReference, 0, 0, rsp_var_binds)
@@ -203,6 +199,14 @@ class c_BulkCommandResponder(cmdrsp.BulkCommandResponder, conpot_extension):
         cmdrsp.BulkCommandResponder.__init__(self, snmpEngine, snmpContext)
         conpot_extension.__init__(self)
 
+    def _dynamic_varbind(self, oid, val):
+        response = self.databus_mediator.get_response(
+            val.__class__.__name__, tuple(oid)
+        )
+        if response is None or response is False:
+            return oid, val
+        return tuple(oid), response
+
     def handle_management_operation(self, snmpEngine, stateReference, contextName, PDU):
         non_repeaters = v2c.apiBulkPDU.get_non_repeaters(PDU)
         if non_repeaters < 0:
@@ -244,12 +248,15 @@ class c_BulkCommandResponder(cmdrsp.BulkCommandResponder, conpot_extension):
                 rsp_var_binds.extend(mgmt_fun(*var_binds, **ctx))
                 var_binds = rsp_var_binds[-R:]
                 M -= 1
+            rsp_var_binds = [
+                self._dynamic_varbind(oid, val) for oid, val in rsp_var_binds
+            ]
         finally:
             sock = snmpEngine.transport_dispatcher.socket
             self.log(snmp_version, "Bulk", addr, var_binds, rsp_var_binds, sock)
 
         if _tarpit_active(self.tarpit):
-            self.do_tarpit(self.tarpit)
+            self.do_tarpit(snmpEngine, addr, self.tarpit)
 
         if len(rsp_var_binds):
             self.send_varbinds(snmpEngine, stateReference, 0, 0, rsp_var_binds)
@@ -282,7 +289,7 @@ class c_SetCommandResponder(cmdrsp.SetCommandResponder, conpot_extension):
 
         rsp_var_binds = None
         if _tarpit_active(self.tarpit):
-            self.do_tarpit(self.tarpit)
+            self.do_tarpit(snmpEngine, addr, self.tarpit)
 
         ctx = dict(snmpEngine=snmpEngine, acFun=self.verify_access, cbCtx=self.cbCtx)
         instrum_error = None
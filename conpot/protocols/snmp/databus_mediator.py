@@ -23,6 +23,26 @@ from pysnmp.smi import builder
 from datetime import datetime
 import conpot.core as conpot_core
 
+# ASN.1 classes we can build dynamic responses for, by class name
+RESPONSE_CLASS_SYMBOLS = {
+    "DisplayString": ("SNMPv2-TC", "DisplayString"),
+    "OctetString": ("ASN1", "OctetString"),
+    "Integer32": ("SNMPv2-SMI", "Integer32"),
+    "Counter32": ("SNMPv2-SMI", "Counter32"),
+    "Gauge32": ("SNMPv2-SMI", "Gauge32"),
+    "TimeTicks": ("SNMPv2-SMI", "TimeTicks"),
+    "DateAndTime": ("SNMPv2-TC", "DateAndTime"),
+}
+# TODO: All mode classes - or autodetect'ish?
+
+
+def _load_response_classes():
+    mib_builder = builder.MibBuilder()
+    return {
+        name: mib_builder.import_symbols(module, symbol)[0]
+        for name, (module, symbol) in RESPONSE_CLASS_SYMBOLS.items()
+    }
+
 
 class DatabusMediator(object):
     def __init__(self, oid_mappings):
@@ -32,51 +52,29 @@ class DatabusMediator(object):
         self.start_time = datetime.now()
         self.oid_map = oid_mappings  # mapping between OIDs and databus keys
         self.databus = conpot_core.get_databus()
+        # resolving symbols through a MibBuilder is expensive, so do it once
+        self.response_classes = _load_response_classes()
+        # OID -> (response class, databus key), response class is None if unsupported
+        self._responses = {}
+
+    def register(self, OID, databus_key, reference_class):
+        """map OID to a databus key, resolving its response class up front"""
+        self.oid_map[OID] = databus_key
+        self._responses[OID] = (self.response_classes.get(reference_class), databus_key)
 
     def get_response(self, reference_class, OID):
-        if OID in self.oid_map:
-            if reference_class == "DisplayString":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-TC", "DisplayString"
-                )
-
-            elif reference_class == "OctetString":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "ASN1", "OctetString"
-                )
-
-            elif reference_class == "Integer32":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-SMI", "Integer32"
-                )
-
-            elif reference_class == "Counter32":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-SMI", "Counter32"
-                )
-
-            elif reference_class == "Gauge32":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-SMI", "Gauge32"
-                )
-
-            elif reference_class == "TimeTicks":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-SMI", "TimeTicks"
-                )
-
-            elif reference_class == "DateAndTime":
-                (response_class,) = builder.MibBuilder().importSymbols(
-                    "SNMPv2-TC", "DateAndTime"
-                )
-            # TODO: All mode classes - or autodetect'ish?
-            else:
-                # dynamic responses are not supported for this class (yet)
-                return False
-            response_value = self.databus.get_value(self.oid_map[OID])
-            return response_class(response_value)
-        else:
-            return None
+        entry = self._responses.get(OID)
+        if entry is None:
+            if OID not in self.oid_map:
+                return None
+            # mapped without register(), resolve once and remember
+            entry = (self.response_classes.get(reference_class), self.oid_map[OID])
+            self._responses[OID] = entry
+        response_class, databus_key = entry
+        if response_class is None:
+            # dynamic responses are not supported for this class (yet)
+            return False
+        return response_class(self.databus.get_value(databus_key))
 
     def set_value(self, OID, value):
         # TODO: Access control. The profile shold indicate which OIDs are writable
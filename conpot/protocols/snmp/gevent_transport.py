@@ -1,6 +1,7 @@
 # Gevent UDP transport + dispatcher for PySNMP 7.x (asyncio is default; conpot uses gevent).
 import socket
 
+import conpot.core as conpot_core
 from pysnmp.carrier.asyncio.dgram.udp import UdpTransportAddress
 from pysnmp.carrier.base import AbstractTransport, AbstractTransportDispatcher
 
@@ -34,7 +35,13 @@ class GeventDispatcher(AbstractTransportDispatcher):
                 msg, addr = sock.recvfrom(65507)
             except OSError:
                 break
-            self._callback_function(self._udp_transport, UdpTransportAddress(addr), msg)
+            try:
+                self._callback_function(
+                    self._udp_transport, UdpTransportAddress(addr), msg
+                )
+            finally:
+                # a request that got no response leaves no delay for the next one
+                self._udp_transport.delays.pop(tuple(addr[:2]), None)
 
     def close_dispatcher(self):
         self._running = False
@@ -43,6 +50,10 @@ class GeventDispatcher(AbstractTransportDispatcher):
     def serve_forever(self):
         self.run_dispatcher()
 
+    def delay_response(self, address, delay):
+        """Hold back the response to the request from address being handled."""
+        self._udp_transport.delays[tuple(address[:2])] = delay
+
     def stop(self):
         self._running = False
         if self.socket:
@@ -80,15 +91,20 @@ class GeventUdpTransport(AbstractTransport):
     def __init__(self, sock: socket.socket):
         super().__init__()
         self.sock = sock
+        # seconds the response to an address is held back, see delay_response
+        self.delays = {}
 
     def open_server_mode(self, iface=None, sock=None):
         return self
 
     def send_message(self, outgoingMessage, transportAddress):
-        if isinstance(transportAddress, UdpTransportAddress):
-            addr = tuple(transportAddress[:2])
-        else:
-            addr = tuple(transportAddress[:2])
+        addr = tuple(transportAddress[:2])
+        delay = self.delays.pop(addr, 0)
+        if delay:
+            conpot_core.get_tarpit().call_later(
+                delay, self.sock.sendto, outgoingMessage, addr
+            )
+            return
         self.sock.sendto(outgoingMessage, addr)
 
     def close_transport(self):
@@ -108,7 +108,7 @@ class TftpServer(object):
             "tftp",
             client_addr[0],
             client_addr[1],
-            get_interface_ip(client_addr[0]),
+            get_interface_ip(client_addr[0], self.server._socket.getsockname()[0]),
             self.server._socket.getsockname()[1],
         )
         logger.info(
@@ -174,7 +174,11 @@ class TftpServer(object):
         )
         self.listener.bind(conn)
         self.listener.settimeout(self.timeout)
-        self.server = DatagramServer(self.listener, self.handle)
+        self.server = DatagramServer(
+            self.listener,
+            conpot_core.wrap_handler("tftp", self.handle),
+            spawn=conpot_core.create_pool("tftp"),
+        )
         logger.info("Starting TFTP server at {}".format(conn))
         self.server.serve_forever()
 
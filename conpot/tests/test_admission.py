@@ -0,0 +1,91 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from unittest import mock
+
+from lxml import etree
+
+from conpot.core.admission import AdmissionControl, Limit, subnet_of
+
+
+def test_token_bucket_refills():
+    admission = AdmissionControl(default=Limit(1, 2, 0, 0))
+    with mock.patch("time.monotonic", return_value=100.0) as monotonic:
+        assert admission.admit("modbus", "1.2.3.4")
+        assert admission.admit("modbus", "1.2.3.4")
+        assert not admission.admit("modbus", "1.2.3.4")
+        # other sources and protocols have buckets of their own
+        assert admission.admit("modbus", "1.2.3.5")
+        assert admission.admit("s7comm", "1.2.3.4")
+
+        monotonic.return_value = 101.0
+        assert admission.admit("modbus", "1.2.3.4")
+        assert not admission.admit("modbus", "1.2.3.4")
+    assert admission.stats()["rejected"] == {"modbus": 2}
+
+
+def test_subnet_limit():
+    admission = AdmissionControl(default=Limit(0, 0, 1, 3))
+    with mock.patch("time.monotonic", return_value=100.0):
+        for host in range(3):
+            assert admission.admit("modbus", "10.0.0.{}".format(host))
+        assert not admission.admit("modbus", "10.0.0.200")
+        assert admission.admit("modbus", "10.0.1.1")
+
+
+def test_subnet_of():
+    assert subnet_of("10.1.2.3") == "10.1.2"
+    assert subnet_of("2001:db8::1") == "2001:db8::/64"
+    # IPv4 clients of a dual-stack listener do not share the /64 of ::ffff:0:0
+    assert subnet_of("::ffff:10.1.2.3") == "10.1.2"
+    assert subnet_of("::ffff:10.1.2.3") == subnet_of("::ffff:10.1.2.200")
+    assert subnet_of("::ffff:10.1.2.3") != subnet_of("::ffff:10.1.9.9")
+
+
+def test_buckets_are_bounded():
+    admission = AdmissionControl(default=Limit(1, 1, 0, 0), max_sources=2)
+    with mock.patch("time.monotonic", return_value=100.0):
+        assert admission.admit("modbus", "1.1.1.1")
+        for host in range(10):
+            admission.admit("modbus", "2.2.2.{}".format(host))
+        assert admission.stats()["sources"] == 2
+        # evicted, the source starts over with a full bucket
+        assert admission.admit("modbus", "1.1.1.1")
+
+
+def test_template_limits():
+    dom = etree.fromstring(
+        b'<core><limits><protocol name="modbus" rate="5" burst="10"/></limits></core>'
+    )
+    admission = AdmissionControl(default=Limit(1, 1, 2, 2))
+    admission.load_template(etree.ElementTree(dom))
+    assert admission.limit("modbus") == Limit(5, 10, 2, 2)
+    assert admission.limit("s7comm") == Limit(1, 1, 2, 2)
+
+
+def test_wrap_handler():
+    admission = AdmissionControl(default=Limit(1, 1, 0, 0))
+    handled = []
+    handle = admission.wrap_handler("modbus", lambda *args: handled.append(args))
+    sock = mock.Mock()
+    with mock.patch("time.monotonic", return_value=100.0):
+        handle(sock, ("1.2.3.4", 1000))
+        handle(sock, ("1.2.3.4", 1001))
+        # datagrams are dropped
+        handle(b"data", ("1.2.3.4", 1002))
+    assert handled == [(sock, ("1.2.3.4", 1000))]
+    assert sock.close.call_count == 1
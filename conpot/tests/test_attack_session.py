@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 
 from freezegun import freeze_time
 
-from conpot.core.attack_session import AttackSession
+from conpot.core.attack_session import AttackSession, EventStore, size_of
 
 
 class LogQueueFake:
@@ -159,3 +159,114 @@ def test_dump_collects_events():
 
     # TODO should this even include public_ip if it's always None?
     assert dump["public_ip"] is None
+
+
+def test_event_store_ring():
+    store = EventStore(max_events=3)
+    for i in range(5):
+        store.add(i, {"n": i})
+
+    assert [event["n"] for _, event in store.items()] == [2, 3, 4]
+    assert (store.count, store.dropped, len(store)) == (5, 2, 3)
+    assert store.memory == sum(size_of(event) for _, event in store.items())
+
+
+def test_event_store_head_tail():
+    store = EventStore(max_events=4, store="head_tail")
+    for i in range(10):
+        store.add(0, {"n": i})
+
+    assert [event["n"] for _, event in store.items()] == [0, 1, 8, 9]
+    # colliding timestamps still get unique, ordered keys
+    assert [ms for ms, _ in store.items()] == [0, 1, 8, 9]
+    assert store.clear() < 0
+    assert (store.memory, len(store), store.dropped) == (0, 0, 10)
+
+
+def test_add_event_reports_memory():
+    changes = []
+    session = AttackSession(
+        protocol=None,
+        source_ip=None,
+        source_port=None,
+        destination_ip=None,
+        destination_port=None,
+        log_queue=LogQueueFake(),
+        max_events=1,
+        on_memory=lambda session, delta: changes.append(delta),
+    )
+
+    session.add_event({"foo": "bar"})
+    session.add_event({"foo": "baz"})
+
+    assert changes == [size_of({"foo": "bar"}), 0]
+    assert session.memory == size_of({"foo": "baz"})
+    assert list(session.data.values()) == [{"foo": "baz"}]
+
+
+def test_session_mode_logs_summary_on_end():
+    log_queue = LogQueueFake()
+    session = AttackSession(
+        protocol="testing",
+        source_ip="1.2.3.4",
+        source_port=11,
+        destination_ip="5.6.7.8",
+        destination_port=22,
+        log_queue=log_queue,
+        max_events=2,
+        log_mode="session",
+    )
+
+    with freeze_time("2000-01-01") as frozen_time:
+        session.add_event({"type": "NEW_CONNECTION"})
+        frozen_time.tick(timedelta(seconds=1))
+        session.add_event({"request": "x" * 1000, "response": "pong"})
+        frozen_time.tick(timedelta(seconds=1))
+        session.add_event({"type": "CONNECTION_LOST"})
+    assert log_queue.events == []
+
+    session.set_ended()
+    (logged,) = log_queue.events
+    assert logged["data"]["type"] == "SESSION_SUMMARY"
+    summary = logged["data"]["session"]
+    assert summary["first_event"] == datetime(2000, 1, 1)
+    assert summary["last_event"] == datetime(2000, 1, 1, 0, 0, 2)
+    assert summary["event_count"] == 3
+    assert summary["events_dropped"] == 1
+    assert summary["event_types"] == {
+        "NEW_CONNECTION": 1,
+        "REQUEST": 1,
+        "CONNECTION_LOST": 1,
+    }
+    request, lost = summary["events"]
+    assert len(request["request"]) == AttackSession.summary_value_limit
+    assert lost == {"type": "CONNECTION_LOST", "elapsed_ms": lost["elapsed_ms"]}
+
+    # nothing new, nothing to summarize
+    session.set_ended()
+    assert len(log_queue.events) == 1
+    assert session.memory == 0
+
+
+def test_hybrid_mode_streams_live_events():
+    log_queue = LogQueueFake()
+    session = AttackSession(
+        protocol=None,
+        source_ip=None,
+        source_port=None,
+        destination_ip=None,
+        destination_port=None,
+        log_queue=log_queue,
+        log_mode="hybrid",
+        live_events=["NEW_CONNECTION"],
+    )
+
+    session.add_event({"type": "NEW_CONNECTION"})
+    session.add_event({"request": "ping"})
+    session.set_ended()
+
+    assert [event["data"]["type"] for event in log_queue.events] == [
+        "NEW_CONNECTION",
+        "SESSION_SUMMARY",
+    ]
+    assert log_queue.events[1]["data"]["session"]["event_count"] == 2
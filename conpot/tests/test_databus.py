@@ -0,0 +1,75 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+
+import gevent
+
+from conpot.core.databus import Databus
+
+
+class TestDatabus(unittest.TestCase):
+    def setUp(self):
+        self.databus = Databus()
+
+    def test_writes_are_coalesced(self):
+        notified = []
+        self.databus.set_value("register", 0)
+        self.databus.observe_value("register", notified.append)
+        for i in range(10):
+            self.databus.set_value("register", i)
+        gevent.sleep(0.01)
+        self.assertEqual(notified, ["register"])
+        stats = self.databus.notification_stats()
+        self.assertEqual(stats["issued"], 1)
+        self.assertEqual(stats["coalesced"], 9)
+
+        self.databus.set_value("register", 10)
+        gevent.sleep(0.01)
+        self.assertEqual(notified, ["register", "register"])
+
+    def test_deltas(self):
+        batches = []
+        self.databus.set_value("a", 1)
+        self.databus.set_value("b", 2)
+        self.databus.observe_value("a", batches.append, deltas=True)
+        self.databus.observe_value("b", batches.append, deltas=True)
+        self.databus.set_value("a", 3)
+        self.databus.set_value("a", 4)
+        self.databus.set_value("b", 5)
+        gevent.sleep(0.01)
+        self.assertEqual(batches, [[("a", 1, 4), ("b", 2, 5)]])
+
+    def test_bounded_pool(self):
+        databus = Databus(pool_size=2)
+        running = []
+        peak = []
+
+        def slow(key):
+            running.append(key)
+            peak.append(len(running))
+            gevent.sleep(0.01)
+            running.remove(key)
+
+        for i in range(5):
+            key = "key{}".format(i)
+            databus.set_value(key, i)
+            databus.observe_value(key, slow)
+            databus.set_value(key, i + 1)
+        gevent.sleep(0.1)
+        self.assertEqual(len(peak), 5)
+        self.assertEqual(max(peak), 2)
@@ -0,0 +1,154 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+
+import gevent
+
+from conpot.core.databus import Databus
+from conpot.core.databus_backends import (
+    DatabusServer,
+    MmapBackend,
+    SocketBackend,
+    dumps,
+    loads,
+    private_dir,
+)
+
+
+class TestDatabusBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "databus")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_mmap(self):
+        first = Databus(backend=MmapBackend(self.path, create=True))
+        second = Databus(backend=MmapBackend(self.path, poll_interval=0.01))
+        first.set_value("register", 1)
+        self.assertEqual(second.get_value("register"), 1)
+
+        changes = []
+        second.observe_value("register", changes.append, deltas=True)
+        first.set_value("register", 2)
+        gevent.sleep(0.1)
+        self.assertEqual(changes, [[("register", 1, 2)]])
+
+        # objects stay in their process
+        first.set_value("sensor", lambda: 42)
+        self.assertEqual(first.get_value("sensor"), 42)
+        self.assertFalse("sensor" in second._data)
+
+        second.set_value("register", 3)
+        self.assertEqual(first.get_value("register"), 3)
+        first._data.close()
+        second._data.close()
+
+    def test_mmap_updates_single_keys(self):
+        first = MmapBackend(self.path, create=True, size=64 * 1024, max_keys=8)
+        second = MmapBackend(self.path, poll_interval=60)
+        changes = []
+        second.subscribe(lambda *change: changes.append(change))
+        first["a"] = 1
+        first["b"] = array("H", [1, 2])
+        second._refresh()
+        del changes[:]
+        # outgrows its slot and moves
+        first["b"] = array("H", range(100))
+        second._refresh()
+        self.assertEqual(changes, [("b", array("H", [1, 2]), array("H", range(100)))])
+        self.assertEqual(second["a"], 1)
+        for key in "cdefgh":
+            first[key] = key
+        with self.assertRaises(ValueError):
+            first["i"] = 0
+        first.close()
+        second.close()
+
+    def test_mmap_rejects_symlinks(self):
+        target = os.path.join(self.tmp_dir, "target")
+        open(target, "w").close()
+        os.symlink(target, self.path)
+        with self.assertRaises(OSError):
+            MmapBackend(self.path, create=True)
+
+    def test_mmap_rejects_writable_by_others(self):
+        MmapBackend(self.path, create=True).close()
+        os.chmod(self.path, 0o666)
+        with self.assertRaises(PermissionError):
+            MmapBackend(self.path)
+
+    def test_private_dir(self):
+        path = os.path.join(self.tmp_dir, "private")
+        os.mkdir(path, 0o777)
+        os.chmod(path, 0o777)
+        private_dir(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+        os.symlink(path, path + "-link")
+        with self.assertRaises(PermissionError):
+            private_dir(path + "-link")
+
+    def test_plain_values_only(self):
+        values = [1, "a", [1.5, None], {"k": True}, b"\x00", bytearray(b"\x01")]
+        values.append(array("H", [1, 65535]))
+        for value in values:
+            decoded = loads(dumps(value))
+            self.assertEqual(decoded, value)
+            self.assertIs(type(decoded), type(value))
+        with self.assertRaises(TypeError):
+            dumps(object())
+
+    def test_socket(self):
+        served = Databus()
+        served.set_value("register", 1)
+        server = DatabusServer(self.path, served)
+        greenlet = gevent.spawn(server.start)
+        client = Databus(backend=SocketBackend(self.path))
+        other = Databus(backend=SocketBackend(self.path))
+        try:
+            notified = []
+            other.observe_value("register", notified.append)
+            self.assertEqual(client.get_value("register"), 1)
+
+            client.set_value("register", 2)
+            gevent.sleep(0.1)
+            self.assertEqual(served.get_value("register"), 2)
+            self.assertEqual(other.get_value("register"), 2)
+            self.assertEqual(notified, ["register"])
+
+            served.set_value("register", 3)
+            gevent.sleep(0.1)
+            self.assertEqual(client.get_value("register"), 3)
+
+            client.set_value("block", array("H", [7]))
+            gevent.sleep(0.1)
+            self.assertEqual(served.get_value("block"), array("H", [7]))
+        finally:
+            client._data.close()
+            other._data.close()
+            server.stop()
+            greenlet.join()
+        self.assertFalse(os.path.exists(self.path))
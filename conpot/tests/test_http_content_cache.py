@@ -0,0 +1,108 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+
+from freezegun import freeze_time
+
+import conpot.core as conpot_core
+from conpot.protocols.http.content_cache import (
+    ContentCache,
+    content_length,
+    split_template,
+)
+
+
+class TestContentCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        conpot_core.get_databus().set_value("unittest_key", "VALUE")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, name, data):
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(data)
+
+    def test_split_template(self):
+        segments = split_template(
+            'a<condata source="databus" key="k" />b<condata source="eval" key="1+1"/>'
+        )
+        self.assertEqual(
+            segments,
+            [
+                "a",
+                ("databus", "k", '<condata source="databus" key="k" />'),
+                "b",
+                ("eval", "1+1", '<condata source="eval" key="1+1"/>'),
+            ],
+        )
+
+    def test_render(self):
+        self._write(
+            "page.html",
+            b'<p><condata source="databus" key="unittest_key" /> '
+            b'<condata source="eval" key="6*7" /></p>',
+        )
+        cache = ContentCache(self.root)
+        cached = cache.get("page.html")
+        self.assertEqual(cached.render(), "<p>VALUE 42</p>")
+        conpot_core.get_databus().set_value("unittest_key", "CHANGED")
+        self.assertEqual(cached.render(), "<p>CHANGED 42</p>")
+
+    def test_missing_file(self):
+        cache = ContentCache(self.root)
+        self.assertIsNone(cache.get("missing.html"))
+        # not remembered, a file added later is found
+        self._write("missing.html", b"found")
+        self.assertEqual(cache.get("missing.html").payload, b"found")
+
+    def test_content_length(self):
+        self._write("static.html", "<p>\u00e9t\u00e9</p>".encode())
+        self._write(
+            "page.html",
+            '<p>\u00e9<condata source="databus" key="unittest_key" /></p>'.encode(),
+        )
+        cache = ContentCache(self.root)
+        static = cache.get("static.html")
+        self.assertTrue(static.static)
+        self.assertEqual(content_length(static, static.render()), 12)
+        self.assertEqual(content_length(static, static.payload), 12)
+        page = cache.get("page.html")
+        self.assertFalse(page.static)
+        conpot_core.get_databus().set_value("unittest_key", "\u00fc")
+        # bytes, not characters
+        self.assertEqual(content_length(page, page.render()), 11)
+        self.assertEqual(content_length(None, ""), 0)
+
+    def test_reload(self):
+        with freeze_time("2000-01-01") as frozen_time:
+            self._write("page.html", b"old")
+            cache = ContentCache(self.root, reload_interval=5)
+            self.assertEqual(cache.get("page.html").payload, b"old")
+
+            self._write("page.html", b"new")
+            os.utime(os.path.join(self.root, "page.html"), (0, 0))
+            self.assertEqual(cache.get("page.html").payload, b"old")
+
+            frozen_time.tick(timedelta(seconds=6))
+            self.assertEqual(cache.get("page.html").payload, b"new")
@@ -24,6 +24,7 @@ import conpot
 import os
 from lxml import etree
 import requests
+import http.client
 from gevent import socket, sleep
 from conpot.protocols.http import web_server
 from conpot.utils.greenlet import spawn_test_server, teardown_test_server
@@ -216,3 +217,39 @@ class TestHTTPServer(unittest.TestCase):
             data=payload,
         )
         self.assertEqual(ret.status_code, 501)
+
+    def test_alias(self):
+        """
+        Objective: an aliased node is served with the payload of its target
+        """
+        ret = requests.get(
+            "http://127.0.0.1:{0}/index.htm".format(self.http_server.server_port)
+        )
+        self.assertEqual(ret.status_code, 200)
+        self.assertEqual(ret.headers["Last-Modified"], "Tue, 19 May 1993 09:00:00 GMT")
+
+    def test_path_is_not_evaluated(self):
+        """
+        Objective: request paths are matched literally and can not be used to inject XPath
+        """
+        ret = requests.get(
+            'http://127.0.0.1:{0}/tests/unittest_base.html"] | //node[@name="/'.format(
+                self.http_server.server_port
+            )
+        )
+        self.assertEqual(ret.status_code, 404)
+
+    def test_keep_alive(self):
+        """
+        Objective: several requests can be served over one persistent connection
+        """
+        conn = http.client.HTTPConnection("127.0.0.1", self.http_server.server_port)
+        conn.request("GET", "/tests/unittest_base.html")
+        first = conn.getresponse()
+        self.assertIn(b"ONLINE", first.read())
+        sock = conn.sock
+        conn.request("GET", "/tests/unittest_base.html")
+        second = conn.getresponse()
+        self.assertIn(b"ONLINE", second.read())
+        self.assertIs(sock, conn.sock)
+        conn.close()
@@ -0,0 +1,112 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+
+from conpot.protocols.IEC104 import codec, frames
+
+
+class TestIEC104Codec(unittest.TestCase):
+    def test_defaults_match_scapy(self):
+        for type_id in codec.INFO_OBJECTS:
+            infobj = getattr(frames, "asdu_infobj_{}".format(type_id))
+            expected = (
+                frames.i_frame(SendSeq=4, RecvSeq=6)
+                / frames.asdu_head(PN=1, COT=3, COA=0x1234)
+                / infobj()
+            ).build()
+            asdu = codec.encode_asdu(type_id, [{}], pn=1, cot=3, coa=0x1234)
+            self.assertEqual(codec.encode_i_frame(asdu, 4, 6), expected, type_id)
+
+    def test_values_match_scapy(self):
+        expected = (
+            frames.i_frame()
+            / frames.asdu_head(SQ=0, COT=20, NoO=2)
+            / frames.asdu_infobj_1(IOA=0x0A0B0C, SIQ=frames.SIQ(SPI=1, IV=1))
+            / frames.asdu_infobj_1(IOA=5, SIQ=frames.SIQ(SPI=1))
+        ).build()
+        objects = [{"IOA": 0x0A0B0C, "SPI": 1, "IV": 1}, {"IOA": 5, "SPI": 1}]
+        asdu = codec.encode_asdu(1, objects, cot=20)
+        self.assertEqual(codec.encode_i_frame(asdu), expected)
+
+        expected = (
+            frames.i_frame()
+            / frames.asdu_head(COT=7)
+            / frames.asdu_infobj_36(
+                IOA=0x141600,
+                FPNumber=-1.5,
+                CP56Time=frames.CP56Time(Ms=59999, Min=59, Hour=23, Day=31, Year=20),
+            )
+        ).build()
+        obj = {"IOA": 0x141600, "FPNumber": -1.5, "Ms": 59999, "Min": 59}
+        obj.update({"Hour": 23, "Day": 31, "Year": 20})
+        asdu = codec.encode_asdu(36, [obj], cot=7)
+        self.assertEqual(codec.encode_i_frame(asdu), expected)
+
+    def test_decode(self):
+        frame = (
+            frames.i_frame(SendSeq=2, RecvSeq=8)
+            / frames.asdu_head(COT=6, COA=0x1E28)
+            / frames.asdu_infobj_46(IOA=0x141600, DCS=2, QOC=1)
+        ).build()
+        decoded = codec.decode_i_frame(frame)
+        self.assertEqual(decoded["format"], "i")
+        self.assertEqual((decoded["SendSeq"], decoded["RecvSeq"]), (2, 8))
+        self.assertEqual((decoded["TypeID"], decoded["COT"]), (46, 6))
+        self.assertEqual(decoded["COA"], 0x1E28)
+        self.assertEqual(decoded["objects"], [{"IOA": 0x141600, "QOC": 1, "DCS": 2}])
+
+    def test_u_and_s_frames(self):
+        self.assertEqual(
+            codec.encode_u_frame(codec.TESTFR_ACT), frames.TESTFR_act.build()
+        )
+        self.assertEqual(codec.encode_s_frame(12), frames.s_frame(RecvSeq=12).build())
+        self.assertEqual(
+            codec.decode_apci(frames.STARTDT_con.build())["Type"], codec.STARTDT_CON
+        )
+        self.assertEqual(codec.decode_apci(codec.encode_s_frame(12))["RecvSeq"], 12)
+
+    def test_i_frame_from_packet(self):
+        packets = [
+            frames.i_frame(SendSeq=4, RecvSeq=6)
+            / frames.asdu_head(PN=1, COT=7, COA=0x1E28)
+            / frames.asdu_infobj_45(IOA=0x141600, SCS=1),
+            frames.i_frame()
+            / frames.asdu_head(COT=3)
+            / frames.asdu_infobj_13(IOA=0x0A0B0C, FPNumber=2.5),
+            frames.i_frame()
+            / frames.asdu_head(COT=10)
+            / frames.asdu_infobj_100(QOI=20),
+        ]
+        for packet in packets:
+            frame = codec.IFrame.from_packet(packet)
+            self.assertEqual(frame.build(), packet.build())
+
+        # sequences of objects are left to scapy
+        packet = frames.i_frame() / frames.asdu_head(SQ=1) / frames.asdu_infobj_1()
+        self.assertIsNone(codec.IFrame.from_packet(packet))
+
+    def test_i_frame(self):
+        frame = codec.IFrame(1, [{"IOA": 5, "SPI": 1}], cot=20)
+        frame.SendSeq, frame.RecvSeq, frame.COA = 2, 4, 0x1E28
+        expected = (
+            frames.i_frame(SendSeq=2, RecvSeq=4)
+            / frames.asdu_head(COT=20, COA=0x1E28)
+            / frames.asdu_infobj_1(IOA=5, SIQ=frames.SIQ(SPI=1))
+        ).build()
+        self.assertEqual(frame.build(), expected)
+        self.assertEqual(frame.getfieldval("SendSeq"), 2)
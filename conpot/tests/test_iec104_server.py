@@ -22,7 +22,7 @@ import time
 import unittest
 from unittest.mock import patch
 import conpot.core as conpot_core
-from conpot.protocols.IEC104 import IEC104_server, frames
+from conpot.protocols.IEC104 import IEC104_server, codec, frames
 from conpot.utils.greenlet import spawn_test_server, teardown_test_server
 
 
@@ -61,6 +61,42 @@ class TestIEC104Server(unittest.TestCase):
         data = s.recv(6)
         self.assertEqual(data, frames.TESTFR_con.build())
 
+    def test_interrogation(self):
+        """
+        Objective: Test if a general interrogation is confirmed, answered with the
+        values of the registers and terminated
+        """
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(1)
+        s.connect(("127.0.0.1", 2404))
+        s.send(frames.STARTDT_act.build())
+        s.recv(6)
+
+        s.send(
+            (
+                frames.i_frame()
+                / frames.asdu_head(COA=self.coa, COT=6)
+                / frames.asdu_infobj_100(QOI=20)
+            ).build()
+        )
+        replies = []
+        data = b""
+        while not replies or replies[-1]["COT"] != 10:
+            data += s.recv(4096)
+            while len(data) >= 2 and len(data) >= data[1] + 2:
+                frame, data = data[: data[1] + 2], data[data[1] + 2 :]
+                if codec.decode_apci(frame)["format"] == "i":
+                    replies.append(codec.decode_i_frame(frame))
+        s.close()
+
+        self.assertEqual(replies[0]["COT"], 7)
+        self.assertEqual([reply["SendSeq"] for reply in replies][:2], [0, 2])
+        values = [reply for reply in replies if reply["COT"] == 20]
+        self.assertTrue(values)
+        for reply in values:
+            self.assertEqual(reply["COA"], self.coa)
+            self.assertEqual(reply["NoO"], len(reply["objects"]))
+
     def test_write_for_non_existing(self):
         """
         Objective: Test answer for a command to a device that doesn't exist
@@ -204,7 +240,7 @@ class TestIEC104Server(unittest.TestCase):
         )
         self.assertSequenceEqual(data, act_conf.build())
 
-    @patch("conpot.protocols.IEC104.IEC104_server.gevent._socket3.socket.recv")
+    @patch("conpot.protocols.IEC104.IEC104_server.gevent._socket3.socket.recv_into")
     def test_failing_connection_connection_lost_event(self, mock_timeout):
         """
         Objective: Test if correct exception is executed when a socket.error
@@ -22,8 +22,14 @@ import unittest
 import tempfile
 import shutil
 import json
+import glob
+import gzip
+import os
+
+import gevent
 
 from conpot.core.loggers.json_log import JsonLogger
+from conpot.core.loggers.file_writer import RotatingFileWriter
 
 
 class TestJsonLogger(unittest.TestCase):
@@ -57,6 +63,7 @@ class TestJsonLogger(unittest.TestCase):
                 "data": {"request": request, "response": response},
             }
         )
+        json_logger.close()
 
         with open(filename, "r") as logfile:
             e = json.load(logfile)
@@ -71,3 +78,40 @@ class TestJsonLogger(unittest.TestCase):
             self.assertEqual(e["request"], request)
             self.assertEqual(e["response"], response)
             self.assertEqual(e["event_type"], None)
+
+            self.assertEqual(e["public_ip"], public_ip)
+
+    def test_buffered_until_flush(self):
+        filename = path.join(self.logging_dir, "test.log")
+        writer = RotatingFileWriter(filename, flush_interval=0.1)
+        writer.write(b"first\n")
+        self.assertEqual(os.path.getsize(filename), 0)
+        gevent.sleep(0.3)
+        with open(filename, "rb") as logfile:
+            self.assertEqual(logfile.read(), b"first\n")
+        writer.write(b"second\n")
+        writer.close()
+        with open(filename, "rb") as logfile:
+            self.assertEqual(logfile.read(), b"first\nsecond\n")
+        self.assertEqual(writer.stats()["lines_written"], 2)
+
+    def test_rotation(self):
+        filename = path.join(self.logging_dir, "test.log")
+        writer = RotatingFileWriter(
+            filename, buffer_size=100, max_bytes=1000, fsync="rotate"
+        )
+        lines = [b"%04d %s\n" % (i, b"x" * 50) for i in range(100)]
+        for line in lines:
+            writer.write(line)
+        writer.close()
+
+        segments = sorted(glob.glob(filename + ".*.gz"))
+        self.assertEqual(len(segments), writer.rotations)
+        self.assertGreater(len(segments), 3)
+        data = b""
+        for segment in segments:
+            with gzip.open(segment) as logfile:
+                data += logfile.read()
+        with open(filename, "rb") as logfile:
+            data += logfile.read()
+        self.assertEqual(sorted(data.splitlines(True)), lines)
@@ -0,0 +1,84 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import unittest
+
+import gevent
+import gevent.event
+
+from conpot.core.loggers.sink_worker import SinkWorker
+
+
+class TestSinkWorker(unittest.TestCase):
+    def test_drop_oldest(self):
+        logged = []
+        sink = SinkWorker("test", logged.append, maxsize=3, overflow="drop_oldest")
+        for i in range(5):
+            sink.put(i)
+        sink.start()
+        sink.stop()
+        self.assertEqual(logged, [2, 3, 4])
+        self.assertEqual(sink.dropped, 2)
+        self.assertEqual(sink.processed, 3)
+
+    def test_spill_keeps_order(self):
+        logged = []
+        sink = SinkWorker("test", logged.append, maxsize=2, overflow="spill")
+        spill_path = sink.spill_path
+        for i in range(6):
+            sink.put({"n": i})
+        self.assertEqual(sink.spilled, 4)
+        self.assertEqual(sink.queue_depth, 6)
+        sink.start()
+        gevent.sleep(0.1)
+        self.assertEqual([e["n"] for e in logged], list(range(6)))
+        self.assertEqual(os.path.getsize(spill_path), 0)
+        sink.stop()
+        self.assertFalse(os.path.exists(spill_path))
+
+    def test_slow_sink_does_not_delay_others(self):
+        release = gevent.event.Event()
+        fast = []
+
+        def slow_log(event):
+            release.wait()
+
+        slow_sink = SinkWorker("slow", slow_log, maxsize=2, overflow="drop_oldest")
+        fast_sink = SinkWorker("fast", fast.append)
+        slow_sink.start()
+        fast_sink.start()
+        for i in range(10):
+            slow_sink.put(i)
+            fast_sink.put(i)
+        gevent.sleep(0.1)
+        self.assertEqual(fast, list(range(10)))
+        self.assertGreater(slow_sink.stats()["dropped"], 0)
+        release.set()
+        slow_sink.stop()
+        fast_sink.stop()
+
+    def test_sink_errors_are_counted(self):
+        def broken_log(event):
+            raise RuntimeError("sink down")
+
+        sink = SinkWorker("broken", broken_log)
+        sink.start()
+        sink.put(1)
+        sink.stop()
+        self.assertEqual(sink.errors, 1)
+        self.assertEqual(sink.processed, 0)
@@ -0,0 +1,119 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from os import path
+from unittest import mock
+
+import unittest
+import tempfile
+import shutil
+import sqlite3
+
+import gevent
+
+from conpot.core.loggers.sqlite_log import SQLiteLogger
+
+
+def make_event(i):
+    return {
+        "id": "session-{}".format(i),
+        "remote": ("127.0.0.1", 2048 + i),
+        "data_type": "unittest",
+        "data": {"request": "ping {}".format(i), "response": "pong"},
+    }
+
+
+@mock.patch.object(SQLiteLogger, "_chown_db", lambda self, path: None)
+class TestSQLiteLogger(unittest.TestCase):
+    def setUp(self):
+        self.logging_dir = tempfile.mkdtemp()
+        self.db_path = path.join(self.logging_dir, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.logging_dir)
+
+    def _count_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_batch_committed_when_full(self):
+        sqlite_logger = SQLiteLogger(self.db_path, batch_size=10, max_latency=60)
+        for i in range(25):
+            sqlite_logger.log(make_event(i))
+        gevent.sleep(0.2)
+        self.assertEqual(sqlite_logger.commits, 3)
+        self.assertEqual(sqlite_logger.events_logged, 25)
+        self.assertEqual(sqlite_logger.queue_depth, 0)
+        self.assertEqual(self._count_rows(), 25)
+        sqlite_logger.close()
+
+    def test_batch_committed_after_max_latency(self):
+        sqlite_logger = SQLiteLogger(self.db_path, batch_size=500, max_latency=0.05)
+        sqlite_logger.log(make_event(0))
+        self.assertEqual(sqlite_logger.queue_depth, 1)
+        gevent.sleep(0.3)
+        self.assertEqual(sqlite_logger.queue_depth, 0)
+        self.assertEqual(self._count_rows(), 1)
+        sqlite_logger.close()
+
+    def _log_with_failures(self, sqlite_logger, failures):
+        write_rows = sqlite_logger._write_rows
+        errors = [sqlite3.OperationalError("database is locked")] * failures
+
+        def flaky_write_rows(rows):
+            if errors:
+                raise errors.pop()
+            write_rows(rows)
+
+        with mock.patch.object(sqlite_logger, "_write_rows", flaky_write_rows):
+            sqlite_logger.log(make_event(0))
+            sqlite_logger.flush()
+
+    def test_failed_commit_retried_once(self):
+        sqlite_logger = SQLiteLogger(self.db_path, batch_size=500, max_latency=60)
+        self._log_with_failures(sqlite_logger, 1)
+        self.assertEqual(sqlite_logger.events_logged, 1)
+        self.assertEqual(sqlite_logger.events_dropped, 0)
+        self.assertEqual(self._count_rows(), 1)
+        sqlite_logger.close()
+
+    def test_batch_dropped_after_retry(self):
+        sqlite_logger = SQLiteLogger(self.db_path, batch_size=500, max_latency=60)
+        self._log_with_failures(sqlite_logger, 2)
+        self.assertEqual(sqlite_logger.events_dropped, 1)
+        self.assertEqual(sqlite_logger.queue_depth, 0)
+        self.assertEqual(self._count_rows(), 0)
+        sqlite_logger.close()
+
+    def test_close_flushes_pending_events(self):
+        sqlite_logger = SQLiteLogger(self.db_path, batch_size=500, max_latency=60)
+        for i in range(5):
+            sqlite_logger.log(make_event(i))
+        sqlite_logger.close()
+        self.assertEqual(self._count_rows(), 5)
+
+        conn = sqlite3.connect(self.db_path)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        row = conn.execute(
+            "SELECT session, protocol, request, response FROM events ORDER BY id"
+        ).fetchone()
+        conn.close()
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(row, ("session-0", "unittest", "ping 0", "pong"))
@@ -0,0 +1,240 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import socket
+import unittest
+import urllib.request
+from configparser import ConfigParser
+
+import gevent
+from gevent.server import StreamServer
+
+import conpot.core as conpot_core
+from conpot.core.admission import AdmissionControl, Limit
+from conpot.core.databus import Databus
+from conpot.core.log_worker import LogWorker
+from conpot.core.metrics import (
+    CONTENT_TYPE,
+    CoreCollector,
+    MetricFamily,
+    MetricsServer,
+    ProtocolMetrics,
+    Registry,
+    serve_metrics,
+)
+from conpot.core.pools import Pools
+from conpot.core.session_manager import SessionManager
+from conpot.core.tarpit import Tarpit
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("test_total", "Things", ("protocol",))
+        counter.labels("modbus").inc()
+        counter.labels("modbus").inc(2)
+        counter.labels("s7comm").inc()
+        gauge = self.registry.gauge("test_depth", "Depth")
+        gauge.set(5)
+        gauge.dec()
+        lines = self.registry.exposition().splitlines()
+        self.assertIn("# TYPE test_total counter", lines)
+        self.assertIn('test_total{protocol="modbus"} 3', lines)
+        self.assertIn('test_total{protocol="s7comm"} 1', lines)
+        self.assertIn("# HELP test_depth Depth", lines)
+        self.assertIn("test_depth 4", lines)
+        # registering again returns the same metric
+        self.assertIs(
+            counter, self.registry.counter("test_total", "Things", ("protocol",))
+        )
+        with self.assertRaises(ValueError):
+            self.registry.gauge("test_total", "Things")
+        with self.assertRaises(ValueError):
+            counter.labels()
+
+    def test_histogram(self):
+        histogram = self.registry.histogram("test_seconds", "Time", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        lines = self.registry.exposition().splitlines()
+        self.assertIn('test_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("test_seconds_sum 2.65", lines)
+        self.assertIn("test_seconds_count 4", lines)
+
+    def test_label_values_escaped(self):
+        self.registry.counter("test_total", "Things", ("path",)).labels(
+            'a"b\\c\n'
+        ).inc()
+        self.assertIn('test_total{path="a\\"b\\\\c\\n"} 1', self.registry.exposition())
+
+    def test_collectors(self):
+        stats = {"queued": 3}
+        self.registry.add_collector(
+            lambda: [
+                MetricFamily(
+                    "test_queued_total",
+                    "counter",
+                    "Queued",
+                    [({"sink": "json"}, stats["queued"])],
+                )
+            ]
+        )
+        self.registry.add_collector(lambda: 1 / 0)
+        stats["queued"] = 7
+        lines = self.registry.exposition().splitlines()
+        # read on every scrape, a failing collector is left out
+        self.assertIn('test_queued_total{sink="json"} 7', lines)
+
+
+class TestProtocolMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.metrics = ProtocolMetrics(self.registry)
+
+    def test_instrument(self):
+        def handle(fail):
+            if fail:
+                raise ValueError("broken")
+            return "done"
+
+        handle = self.metrics.instrument("modbus", handle)
+        self.assertEqual(handle(False), "done")
+        with self.assertRaises(ValueError):
+            handle(True)
+        self.assertEqual(self.metrics.connections.value("modbus"), 2)
+        self.assertEqual(self.metrics.errors.value("modbus"), 1)
+        self.assertEqual(self.metrics.active.value("modbus"), 0)
+        self.assertEqual(self.metrics.latency.labels("modbus").count, 2)
+
+    def test_wrapped_server(self):
+        admission = AdmissionControl()
+        admission.limits["modbus"] = Limit(0.001, 1, 0, 0)
+
+        def handle(sock, address):
+            sock.sendall(b"hello")
+
+        server = StreamServer(
+            ("127.0.0.1", 0),
+            admission.wrap_handler("modbus", self.metrics.instrument("modbus", handle)),
+        )
+        server.start()
+        try:
+            for _ in range(2):
+                client = socket.create_connection(("127.0.0.1", server.server_port))
+                client.recv(5)
+                client.close()
+            gevent.sleep(0.1)
+        finally:
+            server.stop()
+        # the second connection is turned away before it reaches the handler
+        self.assertEqual(self.metrics.connections.value("modbus"), 1)
+
+
+class TestCoreMetrics(unittest.TestCase):
+    def test_requests_per_protocol(self):
+        session_manager = SessionManager()
+        session = session_manager.get_session("modbus", "10.0.0.1", 502)
+        session.add_event({"type": "NEW_CONNECTION"})
+        session.add_event({"function_code": 3})
+        session.add_event({"function_code": 3})
+        session.add_event({"type": "CONNECTION_LOST"})
+        self.assertEqual(session_manager.requests, {"modbus": 2})
+
+    def test_core_collector(self):
+        exposition = conpot_core.get_metrics().exposition()
+        for name in (
+            "conpot_log_queue_depth",
+            "conpot_sessions",
+            "conpot_greenlets",
+            "conpot_databus_notifications_total",
+            "conpot_tarpit_connections",
+        ):
+            self.assertIn("# TYPE {} ".format(name), exposition)
+
+    def test_greenlets_of_the_pools(self):
+        pools = Pools()
+        pool = pools.create("modbus", 2)
+        pool.spawn(gevent.sleep, 1)
+        collector = CoreCollector(
+            SessionManager(), Databus(), AdmissionControl(), pools, Tarpit()
+        )
+        try:
+            families = {family.name: family for family in collector()}
+            self.assertEqual(families["conpot_greenlets"].samples, [({}, 1)])
+        finally:
+            pool.kill()
+
+    def test_log_worker_collect(self):
+        registry = Registry()
+        forwarded = []
+        log_worker = LogWorker(
+            ConfigParser(), None, SessionManager(), None, forwarded.append
+        )
+        registry.add_collector(log_worker.collect)
+        log_worker.sinks[0].put({"type": "NEW_CONNECTION"})
+        lines = registry.exposition().splitlines()
+        self.assertIn('conpot_sink_queue_depth{sink="supervisor"} 1', lines)
+        self.assertIn(
+            'conpot_sink_events_total{outcome="queued",sink="supervisor"} 1', lines
+        )
+
+
+class TestMetricsServer(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.registry.counter("test_total", "Things").inc()
+        self.server = MetricsServer(self.registry, port=0, lag_interval=0.01)
+        self.greenlet = gevent.spawn(self.server.start)
+        gevent.sleep(0.05)
+
+    def tearDown(self):
+        self.server.stop()
+        self.greenlet.get(timeout=1)
+
+    def test_scrape(self):
+        url = "http://127.0.0.1:{}/metrics".format(self.server.server_port)
+        with urllib.request.urlopen(url, timeout=2) as response:
+            self.assertEqual(response.headers["Content-Type"], CONTENT_TYPE)
+            body = response.read().decode()
+        self.assertIn("test_total 1", body)
+        self.assertIn("conpot_hub_lag_seconds ", body)
+
+    def test_not_found(self):
+        url = "http://127.0.0.1:{}/other".format(self.server.server_port)
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(url, timeout=2)
+        self.assertEqual(cm.exception.code, 404)
+
+    def test_serve_metrics(self):
+        config = ConfigParser()
+        config.read_dict({"metrics": {"enabled": "False"}})
+        self.assertIsNone(serve_metrics(config, self.registry))
+        config.read_dict({"metrics": {"enabled": "True", "port": "0"}})
+        server = serve_metrics(config, self.registry)
+        self.assertIsInstance(server, MetricsServer)
+        server.server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
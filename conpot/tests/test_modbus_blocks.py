@@ -0,0 +1,102 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import struct
+import unittest
+from array import array
+
+import gevent
+from modbus_tk import defines
+from modbus_tk.modbus import OverlapModbusBlockError
+
+import conpot.core as conpot_core
+from conpot.protocols.modbus.slave import MBSlave
+
+
+class TestModbusBlocks(unittest.TestCase):
+    def setUp(self):
+        self.databus = conpot_core.get_databus()
+        self.databus.reset()
+        self.slave = MBSlave(1, None)
+        self.databus.set_value("coils", [0] * 20)
+        self.databus.set_value("registers", list(range(10)))
+        self.databus.set_value("more_registers", [7] * 10)
+        self.slave.add_block("coils", defines.COILS, 0, 20)
+        self.slave.add_block("more_registers", defines.HOLDING_REGISTERS, 100, 10)
+        self.slave.add_block("registers", defines.HOLDING_REGISTERS, 10, 10)
+
+    def tearDown(self):
+        self.databus.reset()
+
+    def request(self, fmt, *args):
+        response = self.slave.handle_request(struct.pack(fmt, *args))
+        # an exception response has the function code with the high bit set
+        self.assertLess(response[0], 0x80, response)
+        return response[1:]
+
+    def test_values_are_arrays(self):
+        self.assertIsInstance(self.databus.get_value("coils"), bytearray)
+        self.assertEqual(self.databus.get_value("registers"), array("H", range(10)))
+
+    def test_overlap(self):
+        for start, size in ((5, 10), (19, 1), (95, 6), (109, 20)):
+            with self.assertRaises(OverlapModbusBlockError):
+                self.databus.set_value("overlap", [0] * size)
+                self.slave.add_block("overlap", defines.HOLDING_REGISTERS, start, size)
+        self.databus.set_value("gap", [0] * 80)
+        self.slave.add_block("gap", defines.HOLDING_REGISTERS, 20, 80)
+
+    def test_lookup(self):
+        block, offset = self.slave._get_block_and_offset(
+            defines.HOLDING_REGISTERS, 103, 7
+        )
+        self.assertEqual((block.databus_key, offset), ("more_registers", 3))
+        self.slave.remove_block("more_registers")
+        response = self.slave.handle_request(struct.pack(">BHH", 3, 103, 1))
+        self.assertEqual(response, struct.pack(">BB", 0x83, 2))
+
+    def test_registers(self):
+        self.assertEqual(
+            self.request(">BHH", 3, 12, 3), struct.pack(">BHHH", 6, 2, 3, 4)
+        )
+        self.request(">BHHBHH", 16, 18, 2, 4, 0xBEEF, 1)
+        self.assertEqual(
+            self.databus.get_value("registers")[8:], array("H", [0xBEEF, 1])
+        )
+        # a write across the end of the block
+        response = self.slave.handle_request(struct.pack(">BHHBHH", 16, 19, 2, 4, 0, 0))
+        self.assertEqual(response, struct.pack(">BB", 0x90, 2))
+
+    def test_coils(self):
+        self.request(">BHHBBB", 15, 2, 10, 2, 0b10100101, 0b10)
+        self.assertEqual(
+            list(self.databus.get_value("coils")[:14]),
+            [0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0, 0],
+        )
+        self.assertEqual(self.request(">BHH", 1, 2, 10), bytes([2, 0b10100101, 0b10]))
+
+    def test_writes_are_observed(self):
+        changes = []
+        self.databus.observe_value("registers", changes.append)
+        self.request(">BHH", 6, 11, 42)
+        gevent.sleep(0.1)
+        self.assertEqual(changes, ["registers"])
+        self.assertEqual(self.databus.get_value("registers")[1], 42)
+
+    def test_replaced_value(self):
+        self.databus.set_value("registers", [5] * 10)
+        self.assertEqual(self.request(">BHH", 3, 10, 1), struct.pack(">BH", 2, 5))
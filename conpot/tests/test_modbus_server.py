@@ -192,3 +192,25 @@ class TestModbusServer(unittest.TestCase):
         data = s.recv(1024)
         s.close()
         self.assertTrue(b"SIMATIC" in data and b"Siemens" in data)
+
+    def test_tarpit_hand_off(self):
+        tarpit = conpot_core.get_tarpit()
+        tarpit.configure(after_requests=1, hold=0.5)
+        # the tarpit is shared with the tests of the other protocols
+        parked = tarpit.stats()["parked"]
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.connect((self.host, self.port))
+            s.settimeout(2)
+            s.sendall(b"\x00\x00\x00\x00\x00\x02\x01\x11")
+            self.assertEqual(s.recv(1024)[:8], b"\x00\x00\x00\x00\x00\x06\x01\x11")
+            # held open, then closed
+            s.settimeout(0.2)
+            with self.assertRaises(socket.timeout):
+                s.recv(1024)
+            s.settimeout(2)
+            self.assertEqual(s.recv(1024), b"")
+            s.close()
+            self.assertEqual(tarpit.stats()["parked"], parked + 1)
+        finally:
+            tarpit.configure(after_requests=0, hold=0)
@@ -0,0 +1,107 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import socket
+import unittest
+
+import gevent
+from gevent.event import Event
+from gevent.server import StreamServer
+from lxml import etree
+
+from conpot.core.pools import Pools, PoolSettings
+from conpot.core.tarpit import Tarpit
+
+
+class TestPools(unittest.TestCase):
+    def setUp(self):
+        self.tarpit = Tarpit(tick=0.05)
+        self.pools = Pools(self.tarpit)
+        self.release = Event()
+        self.handled = []
+
+    def tearDown(self):
+        self.release.set()
+        self.server.stop()
+        self.tarpit.close()
+
+    def start(self, overflow, tarpit_hold=60):
+        self.pools.configure(PoolSettings(1, overflow), tarpit_hold)
+        self.server = StreamServer(
+            ("127.0.0.1", 0), self.handle, spawn=self.pools.create("modbus")
+        )
+        self.server.start()
+
+    def handle(self, sock, address):
+        self.handled.append(address)
+        self.release.wait()
+        sock.sendall(b"done")
+
+    def connect(self):
+        client = socket.create_connection(("127.0.0.1", self.server.server_port))
+        client.settimeout(0.5)
+        gevent.sleep(0.05)
+        return client
+
+    def test_refuse(self):
+        self.start("refuse")
+        first = self.connect()
+        second = self.connect()
+        self.assertEqual(second.recv(4), b"")
+        self.assertEqual(len(self.handled), 1)
+        self.assertEqual(self.pools.stats(), {"modbus": {"in_use": 1, "rejected": 1}})
+        self.release.set()
+        self.assertEqual(first.recv(4), b"done")
+
+    def test_queue(self):
+        self.start("queue")
+        first = self.connect()
+        second = self.connect()
+        self.assertEqual(len(self.handled), 1)
+        self.release.set()
+        self.assertEqual(first.recv(4), b"done")
+        self.assertEqual(second.recv(4), b"done")
+        self.assertEqual(self.pools.stats()["modbus"]["rejected"], 0)
+
+    def test_tarpit(self):
+        self.start("tarpit", tarpit_hold=1)
+        self.connect()
+        second = self.connect()
+        # held open, not handled
+        with self.assertRaises(socket.timeout):
+            second.recv(4)
+        self.assertEqual(len(self.handled), 1)
+        second.settimeout(2)
+        self.assertEqual(second.recv(4), b"")
+        self.assertEqual(self.pools.stats()["modbus"]["rejected"], 1)
+
+
+def test_template_settings():
+    dom = etree.fromstring(
+        b'<core><limits><protocol name="http" concurrency="5"/></limits></core>'
+    )
+    pools = Pools()
+    pools.configure(PoolSettings(100, "queue"))
+    pools.load_template(etree.ElementTree(dom))
+    assert pools.create("http").size == 5
+    assert pools.create("http").overflow == "queue"
+    assert pools.create("modbus").size == 100
+    # max_connections of the http template wins
+    assert pools.create("http", 7).size == 7
@@ -0,0 +1,122 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import os
+import signal
+import socket
+import sys
+import unittest
+
+import gevent
+import gevent.queue
+
+from conpot.core.databus import Databus
+from conpot.core.prefork import Channel, Supervisor
+
+WORKER = """
+import sys
+from gevent import monkey
+
+monkey.patch_all()
+import gevent
+from conpot.core.databus import Databus
+from conpot.core.prefork import WorkerLink
+
+databus = Databus()
+link = WorkerLink(int(sys.argv[sys.argv.index("--worker-fd") + 1]), databus, 0.1)
+greenlet = gevent.spawn(link.start)
+gevent.sleep(0.5)
+link.forward_event({"shared": databus.get_value("shared")})
+databus.set_value("counter", databus.get_value("counter") + 1)
+try:
+    greenlet.join()
+except KeyboardInterrupt:
+    link.stop()
+"""
+
+HUNG_WORKER = """
+import time
+
+time.sleep(60)
+"""
+
+
+def wait_for(condition, timeout=10):
+    with gevent.Timeout(timeout):
+        while not condition():
+            gevent.sleep(0.05)
+
+
+class TestPrefork(unittest.TestCase):
+    def test_channel_roundtrip(self):
+        a, b = socket.socketpair()
+        sender, receiver = Channel(a), Channel(b)
+        sender.send("event", {"data": b"\x00" * 10000})
+        sender.send("heartbeat")
+        sender.close()
+        self.assertEqual(
+            list(receiver), [("event", {"data": b"\x00" * 10000}), ("heartbeat",)]
+        )
+        receiver.close()
+
+    def test_supervisor(self):
+        databus = Databus()
+        databus.set_value("shared", "from the supervisor")
+        databus.set_value("counter", 0)
+        events = gevent.queue.Queue()
+        supervisor = Supervisor(
+            1, [sys.executable, "-c", WORKER], databus, events, backoff=0.1
+        )
+        greenlet = gevent.spawn(supervisor.start)
+        try:
+            # the worker sees the state of the supervisor and reports back
+            self.assertEqual(events.get(timeout=10), {"shared": "from the supervisor"})
+            wait_for(lambda: databus.get_value("counter") == 1)
+
+            # a crashed worker is replaced, and starts from the current state
+            first = supervisor.processes[0].process
+            os.kill(first.pid, signal.SIGKILL)
+            wait_for(
+                lambda: 0 in supervisor.processes
+                and supervisor.processes[0].process is not first
+            )
+            self.assertEqual(supervisor.restarts, 1)
+            wait_for(lambda: databus.get_value("counter") == 2)
+        finally:
+            supervisor.stop()
+            greenlet.join()
+        self.assertEqual(supervisor.processes, {})
+
+    def test_worker_without_heartbeat_is_restarted(self):
+        supervisor = Supervisor(
+            1,
+            [sys.executable, "-c", HUNG_WORKER],
+            Databus(),
+            gevent.queue.Queue(),
+            heartbeat_timeout=0.5,
+            backoff=0.1,
+            startup_grace=0.5,
+        )
+        greenlet = gevent.spawn(supervisor.start)
+        try:
+            wait_for(lambda: supervisor.restarts >= 1)
+        finally:
+            supervisor.stop()
+            greenlet.join()
@@ -15,6 +15,9 @@
 # Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
+import subprocess
+import sys
+
 import pytest
 
 from conpot import protocols
@@ -41,3 +44,14 @@ def test_protocols_serve_forever(name):
 
     server.stop()
     greenlet.join(0.2)
+
+
+def test_protocols_are_imported_on_demand():
+    # run in a fresh interpreter, other tests have imported everything already
+    code = (
+        "import sys; from conpot import protocols; "
+        "protocols.get_server_class('modbus'); "
+        "print(sorted(m for m in ('scapy', 'pysnmp', 'bacpypes') if m in sys.modules))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    assert output.decode().strip().splitlines()[-1] == "[]"
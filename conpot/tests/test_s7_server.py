@@ -19,7 +19,11 @@ from gevent import monkey
 
 monkey.patch_all()
 import unittest
+from struct import pack, unpack
+from gevent import socket, sleep
 from conpot.protocols.s7comm.s7_server import S7Server
+from conpot.protocols.s7comm.s7 import S7
+import conpot.core as conpot_core
 from conpot.tests.helpers import s7comm_client
 from conpot.utils.greenlet import spawn_test_server, teardown_test_server
 
@@ -85,3 +89,65 @@ class TestS7Server(unittest.TestCase):
             except AssertionError:
                 print((sec, item, val))
                 raise
+
+    def test_pipelined_requests(self):
+        """
+        Objective: Test if connection request and PDU negotiation sent in one
+        segment are both answered.
+        """
+        connection_request = s7comm_client.TPKTPacket(
+            s7comm_client.COTPConnectionPacket(0, 10, 0x201, 0x200, 0x0A)
+        ).pack()
+        negotiate = s7comm_client.TPKTPacket(
+            s7comm_client.COTPDataPacket(
+                s7comm_client.S7Packet(1, 0, pack("!BBHHH", 0xF0, 0, 1, 1, 480))
+            )
+        ).pack()
+        sock = socket.create_connection((self.server_host, self.server_port))
+        sock.settimeout(5)
+        # split the second request to exercise partial packet buffering
+        sock.sendall(connection_request + negotiate[:5])
+        sleep(0.1)
+        sock.sendall(negotiate[5:])
+        replies = []
+        data = b""
+        while len(replies) < 2:
+            data += sock.recv(1024)
+            while len(data) >= 4 and len(data) >= unpack("!BBH", data[:4])[2]:
+                length = unpack("!BBH", data[:4])[2]
+                replies.append(s7comm_client.TPKTPacket().unpack(data[:length]).data)
+                data = data[length:]
+        s7comm_client.COTPConnectionPacket().unpack(replies[0])
+        response = s7comm_client.S7Packet().unpack(
+            s7comm_client.COTPDataPacket().unpack(replies[1]).data
+        )
+        self.assertEqual(response.type, 3)
+        sock.close()
+
+    def test_szl_cache_follows_databus(self):
+        """
+        Objective: Test if cached SZL responses are refreshed when a databus key changes.
+        """
+        identities = s7comm_client.GetIdentity(
+            self.server_host, self.server_port, 0x100, 0x102
+        )
+        self.assertIn("28;1;Technodrome", [line.strip() for line in identities])
+        self.assertTrue(len(S7.szl_cache))
+
+        conpot_core.get_databus().set_value("SystemName", "Krang")
+        sleep(0.1)
+        identities = s7comm_client.GetIdentity(
+            self.server_host, self.server_port, 0x100, 0x102
+        )
+        self.assertIn("28;1;Krang", [line.strip() for line in identities])
+
+    def test_szl_cache_is_bounded(self):
+        """
+        Objective: Test if sweeping SSL indexes does not grow the SZL cache without bound.
+        """
+        cache = S7.szl_cache
+        for index in range(cache.max_entries * 2):
+            cache.get(28, index, lambda: (b"params", b"data"))
+        self.assertEqual(len(cache), cache.max_entries)
+        # the most recently used entries survive
+        self.assertEqual(cache.get(28, index, None), (b"params", b"data"))
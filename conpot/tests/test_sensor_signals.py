@@ -0,0 +1,72 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+from unittest import mock
+
+import conpot.core as conpot_core
+from conpot.emulators.sensors import signals
+
+
+class TestSensorSignals(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(signals, "clock", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sine(self):
+        sine = signals.Sine(10, 60, 230, 0, 0, 2)
+        self.now = 15.0
+        self.assertEqual(sine.get_value(), 240)
+        self.now = 45.0
+        self.assertEqual(sine.get_value(), 220)
+
+    def test_ramp_wraps(self):
+        ramp = signals.Ramp(2, 0, 0, 100, 0, 0)
+        self.now += 10
+        self.assertEqual(ramp.get_value(), 20)
+        self.now += 45
+        self.assertEqual(ramp.get_value(), 10)
+
+    def test_random_walk_stays_in_bounds(self):
+        walk = signals.RandomWalk(50, 20, 0, 100)
+        values = []
+        for _ in range(1000):
+            self.now += 1
+            values.append(walk.get_value())
+        self.assertTrue(all(0 <= value <= 100 for value in values))
+        self.assertGreater(len(set(values)), 1)
+        # no time passed, no change
+        self.assertEqual(walk.get_value(), values[-1])
+
+    def test_mean_reversion(self):
+        walk = signals.RandomWalk(20, 0.1, None, None, 1)
+        walk.value = 80
+        self.now += 3600
+        self.assertAlmostEqual(walk.get_value(), 20, delta=1)
+
+    def test_correlated(self):
+        databus = conpot_core.get_databus()
+        databus.set_value("power", 100)
+        current = signals.Correlated("power", 0.5, 1, 10)
+        self.assertEqual(current.get_value(), 51)
+        databus.set_value("power", 200)
+        self.now += 5
+        self.assertEqual(current.get_value(), 51)
+        self.now += 10
+        self.assertEqual(current.get_value(), 101)
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from freezegun import freeze_time
+
+from conpot.core.attack_session import size_of
+from conpot.core.session_manager import SessionManager
+
+
+def test_get_session_returns_same_session_for_source():
+    session_manager = SessionManager()
+    session = session_manager.get_session("modbus", "1.2.3.4", 1000)
+
+    assert session_manager.get_session("modbus", "1.2.3.4", 1001) is session
+    assert session_manager.get_session("s7comm", "1.2.3.4", 1002) is not session
+    assert session_manager.get_session("modbus", "1.2.3.5", 1003) is not session
+    assert len(session_manager) == 3
+
+
+def test_delete_session():
+    session_manager = SessionManager()
+    session = session_manager.get_session("modbus", "1.2.3.4", 1000)
+
+    session_manager.delete_session(session.id)
+
+    assert len(session_manager) == 0
+    assert session_manager.get_session("modbus", "1.2.3.4", 1000) is not session
+    # deleting twice is harmless
+    session_manager.delete_session(session.id)
+
+
+def test_expire_sessions_uses_last_activity():
+    session_manager = SessionManager()
+
+    with freeze_time("2000-01-01") as frozen_time:
+        idle = session_manager.get_session("modbus", "1.2.3.4", 1000)
+        active = session_manager.get_session("modbus", "1.2.3.5", 1000)
+
+        frozen_time.tick(timedelta(seconds=20))
+        active.add_event({"foo": "bar"})
+
+        frozen_time.tick(timedelta(seconds=20))
+        expired = session_manager.expire_sessions(30)
+
+        assert expired == [idle]
+        assert idle._ended
+        assert len(session_manager) == 1
+
+        frozen_time.tick(timedelta(seconds=20))
+        assert session_manager.expire_sessions(30) == [active]
+        assert len(session_manager) == 0
+
+
+def test_memory_budget_evicts_least_recently_active_sessions():
+    session_manager = SessionManager()
+    event = {"request": "x" * 1000}
+    session_manager.configure(max_events=10, memory_budget=size_of(event) * 5)
+
+    oldest = session_manager.get_session("modbus", "1.2.3.4", 1000)
+    middle = session_manager.get_session("modbus", "1.2.3.5", 1000)
+    newest = session_manager.get_session("modbus", "1.2.3.6", 1000)
+    for _ in range(2):
+        oldest.add_event(event)
+        middle.add_event(event)
+    assert session_manager.memory == size_of(event) * 4
+
+    newest.add_event(event)
+    newest.add_event(event)
+
+    assert oldest._ended and len(oldest.events) == 0
+    assert not middle._ended
+    assert session_manager.evicted == 1
+    assert len(session_manager) == 2
+    assert session_manager.memory == size_of(event) * 4
+
+    # an evicted session no longer counts against the budget
+    oldest.add_event(event)
+    assert session_manager.memory == size_of(event) * 4
+
+
+def test_memory_budget_keeps_long_lived_active_sessions():
+    session_manager = SessionManager()
+    event = {"request": "x" * 1000}
+    session_manager.configure(max_events=10, memory_budget=size_of(event) * 3)
+
+    with freeze_time("2000-01-01") as frozen_time:
+        long_lived = session_manager.get_session("modbus", "1.2.3.4", 1000)
+        idle = session_manager.get_session("modbus", "1.2.3.5", 1000)
+        long_lived.add_event(event)
+        frozen_time.tick(timedelta(seconds=1))
+        idle.add_event(event)
+        frozen_time.tick(timedelta(seconds=1))
+        long_lived.add_event(event)
+
+        frozen_time.tick(timedelta(seconds=1))
+        newest = session_manager.get_session("modbus", "1.2.3.6", 1000)
+        newest.add_event(event)
+
+    # created first, but active after idle
+    assert idle._ended
+    assert not long_lived._ended
+    assert session_manager.evicted == 1
+
+
+def test_expired_sessions_are_summarized():
+    session_manager = SessionManager()
+    session_manager.configure(log_mode="session")
+
+    with freeze_time("2000-01-01") as frozen_time:
+        session = session_manager.get_session("modbus", "1.2.3.4", 1000)
+        session.add_event({"type": "NEW_CONNECTION"})
+        assert session_manager.log_queue.empty()
+
+        frozen_time.tick(timedelta(seconds=40))
+        assert session_manager.expire_sessions(30) == [session]
+
+    summary = session_manager.log_queue.get_nowait()
+    assert summary["data"]["session"]["event_types"] == {"NEW_CONNECTION": 1}
+    assert session_manager.memory == 0
+
+
+def test_deleted_sessions_are_summarized():
+    session_manager = SessionManager()
+    session_manager.configure(log_mode="hybrid")
+    session = session_manager.get_session("modbus", "1.2.3.4", 1000)
+    session.add_event({"request": "ping"})
+
+    session_manager.delete_session(session.id)
+
+    summary = session_manager.log_queue.get_nowait()
+    assert summary["data"]["session"]["event_types"] == {"REQUEST": 1}
+    assert session_manager.log_queue.empty()
@@ -0,0 +1,72 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import socket
+import unittest
+
+import gevent
+from pysnmp.carrier.asyncio.dgram import udp
+
+from conpot.protocols.snmp.gevent_transport import (
+    GeventDispatcher,
+    GeventUdpTransport,
+)
+
+
+class TestGeventTransport(unittest.TestCase):
+    def setUp(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.transport = GeventUdpTransport(self.sock)
+        self.dispatcher = GeventDispatcher()
+        self.dispatcher.register_transport(udp.SNMP_UDP_DOMAIN, self.transport)
+        self.dispatcher.register_recv_callback(self.handle)
+        self.greenlet = gevent.spawn(self.dispatcher.run_dispatcher)
+
+    def tearDown(self):
+        self.dispatcher.stop()
+        self.greenlet.join(timeout=1)
+
+    def handle(self, dispatcher, domain, address, message):
+        if message == b"tarpitted":
+            # tarpitted, but no response is sent, e.g. for an unauthorised PDU
+            dispatcher.delay_response(address, 5)
+        else:
+            self.transport.send_message(b"response", address)
+
+    def _client(self):
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.settimeout(1)
+        self.addCleanup(client.close)
+        return client
+
+    def test_unanswered_delay_is_cleared(self):
+        tarpitted = self._client()
+        tarpitted.sendto(b"tarpitted", self.sock.getsockname())
+        gevent.sleep(0.05)
+        self.assertEqual(self.transport.delays, {})
+        # the next client gets its response right away
+        other = self._client()
+        other.sendto(b"request", self.sock.getsockname())
+        self.assertEqual(other.recv(100), b"response")
+
+
+if __name__ == "__main__":
+    unittest.main()
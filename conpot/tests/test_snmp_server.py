@@ -59,6 +59,16 @@ class TestSNMPServer(unittest.TestCase):
         client.get_command(oid, callback=self.mock_callback)
         self.assertEqual("Siemens, SIMATIC, S7-200", self.result)
 
+    def test_snmp_get_follows_databus(self):
+        """
+        Objective: Test if dynamic OIDs are answered from the databus on every request
+        """
+        client = snmp_client.SNMPClient(self.host, self.port)
+        oid = ((1, 3, 6, 1, 2, 1, 1, 1, 0), None)
+        conpot_core.get_databus().set_value("SystemDescription", "changed")
+        client.get_command(oid, callback=self.mock_callback)
+        self.assertEqual("changed", self.result)
+
     def test_snmp_set(self):
         """
         Objective: Test if we can set data via snmp_set
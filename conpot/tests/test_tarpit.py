@@ -0,0 +1,113 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from gevent import monkey
+
+monkey.patch_all()
+import socket
+import time
+import unittest
+
+import gevent
+from gevent.server import StreamServer
+
+from conpot.core.tarpit import Tarpit, delay_of
+
+
+class TestTarpit(unittest.TestCase):
+    def setUp(self):
+        self.tarpit = Tarpit(tick=0.02, drip_interval=0.05)
+        self.park = {}
+        self.server = StreamServer(("127.0.0.1", 0), self.handle)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tarpit.close()
+
+    def handle(self, sock, address):
+        self.tarpit.park(sock, **self.park)
+
+    def connect(self):
+        client = socket.create_connection(("127.0.0.1", self.server.server_port))
+        client.settimeout(2)
+        return client
+
+    def receive_all(self, client):
+        chunks = []
+        while True:
+            chunk = client.recv(1024)
+            if not chunk:
+                return chunks
+            chunks.append(chunk)
+
+    def test_delayed_response(self):
+        self.park = {"data": b"response", "delay": 0.2}
+        start = time.monotonic()
+        client = self.connect()
+        self.assertEqual(self.receive_all(client), [b"response"])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(self.tarpit.stats()["in_tarpit"], 0)
+
+    def test_drip(self):
+        self.park = {"data": b"abcdef", "drip_size": 2}
+        client = self.connect()
+        chunks = self.receive_all(client)
+        self.assertEqual(b"".join(chunks), b"abcdef")
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(self.tarpit.stats()["sent"], 6)
+
+    def test_hold(self):
+        self.park = {"hold": 0.5}
+        client = self.connect()
+        client.settimeout(0.2)
+        with self.assertRaises(socket.timeout):
+            client.recv(1)
+        self.assertEqual(self.tarpit.stats()["in_tarpit"], 1)
+        client.settimeout(2)
+        self.assertEqual(client.recv(1), b"")
+
+    def test_max_connections(self):
+        self.tarpit.configure(max_connections=1)
+        self.park = {"hold": 10}
+        first = self.connect()
+        second = self.connect()
+        self.assertEqual(second.recv(1), b"")
+        self.assertEqual(self.tarpit.stats()["refused"], 1)
+        first.close()
+
+    def test_call_later(self):
+        called = []
+        self.tarpit.call_later(0.1, called.append, 1)
+        gevent.sleep(0.05)
+        self.assertEqual(called, [])
+        gevent.sleep(0.2)
+        self.assertEqual(called, [1])
+
+
+def test_delay_of():
+    assert delay_of(None) == 0
+    assert delay_of("1.5") == 1.5
+    assert 1 <= delay_of("1;2") <= 2
+
+
+def test_should_hand_off():
+    tarpit = Tarpit()
+    assert not tarpit.should_hand_off(100)
+    tarpit.configure(after_requests=3)
+    assert not tarpit.should_hand_off(2)
+    assert tarpit.should_hand_off(3)
@@ -0,0 +1,68 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import socket
+import struct
+import unittest
+
+from conpot.utils.framing import FrameReader, MBAP, APCI, TPKT
+
+
+def mbap(transaction_id, pdu):
+    return struct.pack(">HHHB", transaction_id, 0, len(pdu) + 1, 1) + pdu
+
+
+class TestFrameReader(unittest.TestCase):
+    def setUp(self):
+        self.client, self.server = socket.socketpair()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_pipelined_frames(self):
+        first, second = mbap(1, b"\x03\x00\x00\x00\x01"), mbap(2, b"\x01\x00\x00")
+        self.client.sendall(first + second)
+        reader = FrameReader(self.server, MBAP)
+        self.assertEqual(reader.read_frame(), first)
+        self.assertEqual(reader.pending, len(second))
+        self.assertEqual(reader.read_frame(), second)
+        self.assertEqual(reader.pending, 0)
+
+    def test_split_frame(self):
+        frame = b"\x68\x04\x07\x00\x00\x00"
+        reader = FrameReader(self.server, APCI)
+        self.client.sendall(frame[:1])
+        self.client.sendall(frame[1:3])
+        self.client.sendall(frame[3:])
+        self.assertEqual(reader.read_frame(), frame)
+
+    def test_buffer_grows_for_large_frames(self):
+        payload = bytes(range(256)) * 40
+        frame = struct.pack(">BBH", 3, 0, len(payload) + 4) + payload
+        reader = FrameReader(self.server, TPKT, bufsize=16)
+        self.client.sendall(frame + frame)
+        self.assertEqual(reader.read_frame(), frame)
+        self.assertEqual(reader.read_frame(), frame)
+
+    def test_incomplete_frame_on_close(self):
+        frame = mbap(1, b"\x03\x00\x00\x00\x01")
+        self.client.sendall(frame + frame[:4])
+        self.client.close()
+        reader = FrameReader(self.server, MBAP)
+        self.assertEqual(list(reader), [frame, frame[:4]])
+        self.assertEqual(reader.read_frame(), b"")
@@ -0,0 +1,59 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from freezegun import freeze_time
+
+from conpot.utils import networking
+
+
+class TestInterfaceIP(unittest.TestCase):
+    def setUp(self):
+        networking.clear_interface_ip_cache()
+
+    def tearDown(self):
+        networking.clear_interface_ip_cache()
+
+    def test_loopback(self):
+        self.assertEqual(networking.get_interface_ip("127.0.0.1"), "127.0.0.1")
+
+    @mock.patch.object(networking, "_probe_interface_ip", return_value="10.0.0.1")
+    def test_bound_address_skips_probe(self, probe):
+        self.assertEqual(
+            networking.get_interface_ip("192.0.2.10", "10.0.0.2"), "10.0.0.2"
+        )
+        probe.assert_not_called()
+
+    @mock.patch.object(networking, "_probe_interface_ip", return_value="10.0.0.1")
+    def test_probe_is_cached_per_subnet(self, probe):
+        with freeze_time("2000-01-01") as frozen_time:
+            for host in range(1, 10):
+                self.assertEqual(
+                    networking.get_interface_ip("192.0.2.{}".format(host), "0.0.0.0"),
+                    "10.0.0.1",
+                )
+            self.assertEqual(probe.call_count, 1)
+
+            networking.get_interface_ip("198.51.100.1")
+            self.assertEqual(probe.call_count, 2)
+
+            frozen_time.tick(timedelta(seconds=networking.INTERFACE_IP_CACHE_TTL + 1))
+            networking.get_interface_ip("192.0.2.1")
+            self.assertEqual(probe.call_count, 3)
@@ -0,0 +1,102 @@
+# Copyright (C) 2026  MushMush Foundation
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+from collections import namedtuple
+
+# header_size: bytes needed to know the frame length
+# length: callable(header) -> total length of the frame, header included
+FrameFormat = namedtuple("FrameFormat", ["header_size", "length"])
+
+# Modbus TCP: transaction id, protocol id, length of unit id + PDU
+MBAP = FrameFormat(6, lambda header: 6 + ((header[4] << 8) | header[5]))
+# IEC 60870-5-104: start byte 0x68, length of the APDU following it
+APCI = FrameFormat(2, lambda header: 2 + header[1])
+# RFC 1006: version, reserved, length of the whole packet
+TPKT = FrameFormat(4, lambda header: (header[2] << 8) | header[3])
+
+
+class FrameReader(object):
+    """
+    Reads length-prefixed frames from a stream socket. Data is received with
+    recv_into into one buffer per connection, so several pipelined frames
+    arriving in a single segment cost a single syscall.
+    :param sock: connected socket
+    :param frame_format: FrameFormat of the protocol, e.g. MBAP, APCI or TPKT
+    :param bufsize: initial size of the receive buffer, grows for larger frames
+    """
+
+    def __init__(self, sock, frame_format, bufsize=4096):
+        self.sock = sock
+        self.header_size, self.frame_length = frame_format
+        self._buffer = bytearray(bufsize)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    @property
+    def pending(self):
+        """Number of received bytes not yet returned as a frame."""
+        return self._end - self._start
+
+    def _fill(self, needed):
+        """Receive until at least needed bytes are buffered. Returns False on EOF."""
+        while self._end - self._start < needed:
+            if self._start + needed > len(self._buffer):
+                pending = self._end - self._start
+                if needed > len(self._buffer):
+                    buffer = bytearray(max(needed, 2 * len(self._buffer)))
+                    buffer[:pending] = self._view[self._start : self._end]
+                    self._buffer = buffer
+                    self._view = memoryview(buffer)
+                else:
+                    self._buffer[:pending] = self._buffer[self._start : self._end]
+                self._start = 0
+                self._end = pending
+            received = self.sock.recv_into(self._view[self._end :])
+            if not received:
+                return False
+            self._end += received
+        return True
+
+    def _take(self, length):
+        frame = bytes(self._view[self._start : self._start + length])
+        self._start += length
+        if self._start == self._end:
+            self._start = self._end = 0
+        return frame
+
+    def read_frame(self):
+        """
+        Read the next complete frame.
+        :return: frame as bytes. If the peer closes the connection mid-frame the
+        incomplete rest is returned, b"" once nothing is left.
+        """
+        if not self._fill(self.header_size):
+            return self._take(self.pending)
+        length = self.frame_length(self._view[self._start : self._end])
+        # a corrupt length field must not stall the reader
+        length = max(length, self.header_size)
+        if not self._fill(length):
+            return self._take(self.pending)
+        return self._take(length)
+
+    def __iter__(self):
+        while True:
+            frame = self.read_frame()
+            if not frame:
+                return
+            yield frame
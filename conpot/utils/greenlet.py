@@ -68,7 +68,7 @@ def teardown_test_server(server, greenlet):
 
 # this is really a test helper but start_protocol.py wants to use it too
 def init_test_server_by_name(name, port=0):
-    server_class = protocols.name_mapping[name]
+    server_class = protocols.get_server_class(name)
 
     template = {
         "guardian_ast": "guardian_ast",
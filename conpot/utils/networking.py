@@ -1,4 +1,6 @@
+import ipaddress
 import socket
+import time
 from datetime import datetime
 
 from slugify import slugify
@@ -75,10 +77,53 @@ def fix_sslwrap():
         _ssl.sslwrap = new_sslwrap
 
 
-def get_interface_ip(destination_ip: str):
-    # returns interface ip from socket in case direct udp socket access not possible
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.connect((destination_ip, 80))
-    socket_ip = s.getsockname()[0]
-    s.close()
+# (address family, peer subnet) -> (local ip, expiry)
+_interface_ip_cache = {}
+INTERFACE_IP_CACHE_TTL = 60
+INTERFACE_IP_CACHE_SIZE = 4096
+
+
+def _probe_interface_ip(destination_ip: str, family=socket.AF_INET):
+    s = socket.socket(family, socket.SOCK_DGRAM)
+    try:
+        s.connect((destination_ip, 80))
+        return s.getsockname()[0]
+    finally:
+        s.close()
+
+
+def get_interface_ip(destination_ip: str, local_ip: str = None):
+    """
+    Get the local address used to talk to destination_ip.
+    :param destination_ip: address of the peer
+    :param local_ip: address the server socket is bound to. If it is a concrete address it is
+    returned as is, without probing the routing table.
+    """
+    try:
+        if local_ip and not ipaddress.ip_address(local_ip).is_unspecified:
+            return local_ip
+        peer = ipaddress.ip_address(destination_ip)
+    except ValueError:
+        return _probe_interface_ip(destination_ip)
+
+    # returns interface ip from socket in case direct udp socket access not possible.
+    # Peers in the same subnet share a route, so probe once per subnet and remember it for a while.
+    if peer.version == 4:
+        family, prefix = socket.AF_INET, 24
+    else:
+        family, prefix = socket.AF_INET6, 64
+    key = (family, ipaddress.ip_network((peer, prefix), strict=False))
+    now = time.monotonic()
+    cached = _interface_ip_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    socket_ip = _probe_interface_ip(destination_ip, family)
+    if len(_interface_ip_cache) >= INTERFACE_IP_CACHE_SIZE:
+        _interface_ip_cache.clear()
+    _interface_ip_cache[key] = (socket_ip, now + INTERFACE_IP_CACHE_TTL)
     return socket_ip
+
+
+def clear_interface_ip_cache():
+    _interface_ip_cache.clear()